@@ -0,0 +1,372 @@
+"""
+Time the simulator's hot paths against a bundled word list and flag
+statistically significant regressions against a saved JSON baseline.
+
+Sample use:
+    python benchmarks/run_benchmarks.py --save     # record a baseline
+    python benchmarks/run_benchmarks.py            # compare against it
+"""
+
+import json
+import math
+import pathlib
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import fire
+import numpy as np
+
+from wordle_benchmark.agent import Agent, EntropyAgent
+from wordle_benchmark.benchmarker import Benchmark
+from wordle_benchmark.dictionary import Dictionary
+from wordle_benchmark.game import FeedbackMatrix, Game, GuessWord, TargetWord
+from wordle_benchmark.game.wordle_feedback import pattern_code
+
+BENCHMARKS_DIR = pathlib.Path(__file__).parent
+FIXTURE_PATH = BENCHMARKS_DIR / "words.txt"
+DEFAULT_BASELINE_PATH = BENCHMARKS_DIR / "baseline.json"
+
+BASELINE_VERSION = 1
+N_TARGETS = 100
+OPENER = "raise"
+
+# setup returns the state a run needs, the run returns how many operations it did
+Case = Tuple[Callable[[], Any], Callable[[Any], int]]
+
+
+class FirstCandidateAgent(Agent):  # pylint: disable=too-few-public-methods
+    """ Guess the first word that is still possible, isolating engine cost """
+
+    def play(self, game: "Game") -> str:
+        return game.candidate_view[0]
+
+
+def _load_fixture() -> List[str]:
+    """ Bundled offline five letter word list. """
+
+    return FIXTURE_PATH.read_text(encoding="utf-8").split()
+
+
+def _build_cases(words: List[str], cache_dir: pathlib.Path) -> Dict[str, Case]:
+    """
+    Args:
+        words: fixture word list.
+        cache_dir: scratch directory for feedback tables.
+    Returns:
+        Setup and run callables by case name.
+    """
+
+    dictionary = Dictionary(word_list=words, word_len=5, seed=0)
+    targets = dictionary.word_list[:N_TARGETS]
+    pairs = [(guess, target) for guess in targets for target in targets]
+    probes = words + [word[::-1] for word in words]
+
+    def compare_to(word_pairs: List[Tuple[str, str]]) -> int:
+        for guess, target in word_pairs:
+            GuessWord(guess).compare_to(TargetWord(target))
+        return len(word_pairs)
+
+    def score(word_pairs: List[Tuple[str, str]]) -> int:
+        for guess, target in word_pairs:
+            pattern_code(guess, target)
+        return len(word_pairs)
+
+    def guessed_games() -> List[Game]:
+        games = []
+        for target in targets:
+            game = Game(target, dictionary=dictionary)
+            session = game.start_game()
+            next(session)
+            session.send(OPENER)
+            games.append(game)
+        return games
+
+    def possible_words(games: List[Game]) -> int:
+        for game in games:
+            game.possible_words  # pylint: disable=pointless-statement
+        return len(games)
+
+    def candidate_view(games: List[Game]) -> int:
+        for game in games:
+            len(game.candidate_view)
+            game.candidate_view.ids  # pylint: disable=pointless-statement
+        return len(games)
+
+    def dictionary_init(_) -> int:
+        for seed in range(10):
+            Dictionary(word_list=words, word_len=5, seed=seed)
+        return 10
+
+    def dictionary_contains(_) -> int:
+        for probe in probes:
+            probe in dictionary  # pylint: disable=pointless-statement
+        return len(probes)
+
+    def run_games(kwargs: Dict[str, Any]) -> int:
+        Benchmark(
+            target_words=list(targets), dictionary=dictionary, **kwargs
+        ).run_games()
+        return len(targets)
+
+    def entropy_agent() -> Dict[str, Any]:
+        feedback = FeedbackMatrix(dictionary, cache_dir=cache_dir)
+        agent = EntropyAgent(cache_dir=cache_dir)
+        agent.opener(dictionary, feedback)
+        return {"agent": agent, "feedback": feedback}
+
+    return {
+        "compare_to": (lambda: pairs, compare_to),
+        "pattern_code": (lambda: pairs, score),
+        "possible_words": (guessed_games, possible_words),
+        "candidate_view": (guessed_games, candidate_view),
+        "dictionary_init": (lambda: None, dictionary_init),
+        "dictionary_contains": (lambda: None, dictionary_contains),
+        "run_games_first_candidate": (
+            lambda: {"agent": FirstCandidateAgent()},
+            run_games,
+        ),
+        "run_games_entropy": (entropy_agent, run_games),
+    }
+
+
+def _time_case(case: Case, repeats: int) -> List[float]:
+    """
+    Args:
+        case: setup and run callables, setup is not timed.
+        repeats: number of timed runs, after one warm up run.
+    Returns:
+        Seconds per operation of each run.
+    """
+
+    setup, run = case
+    run(setup())
+
+    samples = []
+
+    for _ in range(repeats):
+        state = setup()
+        start = time.perf_counter()
+        n_ops = run(state)
+        samples.append((time.perf_counter() - start) / n_ops)
+
+    return samples
+
+
+def _betainc(a: float, b: float, x: float) -> float:
+    """ Regularized incomplete beta function, by continued fraction. """
+
+    if x <= 0.0:
+        return 0.0
+
+    if x >= 1.0:
+        return 1.0
+
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _betainc(b, a, 1.0 - x)
+
+    log_front = (
+        math.lgamma(a + b)
+        - math.lgamma(a)
+        - math.lgamma(b)
+        + a * math.log(x)
+        + b * math.log(1.0 - x)
+    )
+    tiny = 1e-300
+
+    # modified Lentz's method
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    fraction = d
+
+    for m in range(1, 200):
+        for numerator in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            fraction *= c * d
+
+        if abs(c * d - 1.0) < 1e-12:
+            break
+
+    return math.exp(log_front) * fraction / a
+
+
+def welch_t_test(baseline: List[float], current: List[float]) -> Tuple[float, float]:
+    """
+    One sided Welch's t-test that the current samples are slower.
+
+    Args:
+        baseline: baseline seconds per operation, at least two samples.
+        current: current seconds per operation, at least two samples.
+    Returns:
+        t statistic and p value.
+    """
+
+    n_base, n_cur = len(baseline), len(current)
+    var_base = statistics.variance(baseline) / n_base
+    var_cur = statistics.variance(current) / n_cur
+    difference = statistics.mean(current) - statistics.mean(baseline)
+
+    if var_base + var_cur == 0.0:
+        return math.copysign(math.inf, difference), 0.0 if difference > 0 else 1.0
+
+    t_stat = difference / math.sqrt(var_base + var_cur)
+    dof = (var_base + var_cur) ** 2 / (
+        var_base ** 2 / (n_base - 1) + var_cur ** 2 / (n_cur - 1)
+    )
+
+    # survival function of Student's t distribution
+    tail = 0.5 * _betainc(dof / 2, 0.5, dof / (dof + t_stat ** 2))
+
+    return t_stat, tail if t_stat > 0 else 1.0 - tail
+
+
+def _environment() -> Dict[str, str]:
+    """ Interpreter and machine the samples were taken on. """
+
+    return {
+        "machine": platform.platform(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+    }
+
+
+def _compare(
+    results: Dict[str, List[float]],
+    baseline_cases: Dict[str, Any],
+    alpha: float,
+    min_change: float,
+) -> List[str]:
+    """
+    Print each case against its baseline samples, if any.
+
+    Args:
+        results: case name -> seconds per operation of this run.
+        baseline_cases: case name -> baseline entry.
+        alpha: significance level of the one sided Welch's t-test.
+        min_change: smallest relative slowdown worth flagging.
+    Returns:
+        Names of the significantly slower cases.
+    """
+
+    regressions = []
+    print(
+        f"{'case':<28}{'baseline':>12}{'current':>12}{'ops/s':>12}{'change':>9}{'p':>9}"
+    )
+
+    for name, samples in results.items():
+
+        mean = statistics.mean(samples)
+        row = f"{name:<28}{'':>12}{mean:>12.3g}{1 / mean:>12.4g}"
+        baseline_samples = baseline_cases.get(name, {}).get("samples")
+
+        if baseline_samples:
+            baseline_mean = statistics.mean(baseline_samples)
+            change = mean / baseline_mean - 1
+            _, p_value = welch_t_test(baseline_samples, samples)
+            flagged = p_value < alpha and change > min_change
+            row = (
+                f"{name:<28}{baseline_mean:>12.3g}{mean:>12.3g}{1 / mean:>12.4g}"
+                f"{change:>+9.1%}{p_value:>9.3g}{'  REGRESSION' if flagged else ''}"
+            )
+
+            if flagged:
+                regressions.append(name)
+
+        print(row)
+
+    return regressions
+
+
+def _save_baseline(
+    baseline_path: pathlib.Path, kept: Dict[str, Any], results: Dict[str, List[float]]
+) -> None:
+    """
+    Args:
+        baseline_path: baseline JSON path, overwritten.
+        kept: case name -> baseline entry of cases this run did not time.
+        results: case name -> seconds per operation of this run.
+    """
+
+    cases = dict(kept)
+    cases.update(
+        {
+            name: {"unit": "seconds per operation", "samples": samples}
+            for name, samples in results.items()
+        }
+    )
+    baseline_path.write_text(
+        json.dumps(
+            {
+                "version": BASELINE_VERSION,
+                "environment": _environment(),
+                "cases": cases,
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    print(f"Saved baseline to {baseline_path}")
+
+
+def run_benchmarks(  # pylint: disable=too-many-arguments
+    baseline: str = str(DEFAULT_BASELINE_PATH),
+    save: bool = False,
+    repeats: int = 15,
+    alpha: float = 0.01,
+    min_change: float = 0.05,
+    only: Optional[Union[str, Sequence[str]]] = None,
+) -> None:
+    """
+    Run every case and compare with the baseline, if any.
+    Exits with status 1 when a case is significantly slower.
+
+    Args:
+        baseline: baseline JSON path.
+        save: whether to overwrite the baseline with this run. With only,
+            the other cases keep their baseline samples.
+        repeats: timed runs per case.
+        alpha: significance level of the one sided Welch's t-test.
+        min_change: smallest relative slowdown worth flagging.
+        only: optional comma separated case names to run.
+    """
+
+    baseline_path = pathlib.Path(baseline)
+    previous: Dict[str, Any] = {}
+
+    if baseline_path.exists():
+        previous = json.loads(baseline_path.read_text(encoding="utf-8"))
+
+        if previous.get("environment") != _environment():
+            print(f"Warning: baseline was recorded on {previous.get('environment')}")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cases = _build_cases(_load_fixture(), pathlib.Path(cache_dir))
+        # fire parses "a,b" into a tuple
+        names = list(cases) if only is None else only
+        names = names.split(",") if isinstance(names, str) else list(names)
+        results = {name: _time_case(cases[name], repeats) for name in names}
+
+    regressions = _compare(results, previous.get("cases", {}), alpha, min_change)
+
+    if save:
+        # a partial run only replaces the cases it timed
+        kept = previous.get("cases", {}) if only is not None else {}
+        _save_baseline(baseline_path, kept, results)
+
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    fire.Fire(run_benchmarks)
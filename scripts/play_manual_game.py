@@ -6,7 +6,7 @@ import logging
 
 import fire
 
-from wordle_benchmark.game import Game
+from wordle_benchmark.game import Game, LoggingObserver
 
 logging.basicConfig()
 logging.getLogger().setLevel(logging.INFO)
@@ -20,7 +20,7 @@ def play_manual_games(word: str) -> None:
         word: target word.
     """
 
-    game = Game(word)
+    game = Game(word, observers=[LoggingObserver()])
 
     session = game.start_game()
     next(session)
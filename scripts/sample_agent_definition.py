@@ -3,20 +3,30 @@ Simple demo of the ABC interface of the sample agent.
 """
 
 import logging
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Any, Dict, List
 
 import fire
 import wordfreq
 
 from wordle_benchmark.agent import Agent
 from wordle_benchmark.benchmarker import Benchmark
+from wordle_benchmark.game import LoggingObserver
 
 if TYPE_CHECKING:
+    from wordle_benchmark.dictionary import Dictionary
     from wordle_benchmark.game import Game
 
 logging.basicConfig()
 logging.getLogger().setLevel(logging.INFO)
 
+FREQUENCY_COLUMN = "zipf_en"
+
+
+def _zipf_frequency(word: str) -> float:
+    """ Zipf frequency of an English word, 0 for unknown words. """
+
+    return wordfreq.zipf_frequency(word, "en")
+
 
 class SampleSimpleAgent(Agent):  # pylint: disable=too-few-public-methods
     """ Basic example of a Wordle agent. """
@@ -47,15 +57,23 @@ class SampleSimpleAgent(Agent):  # pylint: disable=too-few-public-methods
             Predicted word.
         """
 
-        possible_words = game.possible_words
-        words_with_freqs = [
-            (word, wordfreq.zipf_frequency(word, "en")) for word in possible_words
-        ]
-        word_with_highest_freq: str = sorted(
-            words_with_freqs, key=lambda x: x[1], reverse=True
-        )[0][0]
+        # frequencies are scored once per dictionary and cached on disk
+        game.dictionary.attach_column(FREQUENCY_COLUMN, _zipf_frequency)
+
+        return game.candidate_view.top_k(FREQUENCY_COLUMN)[0]
+
+    def prepare(self, dictionary: "Dictionary", game_config: Dict[str, Any]) -> None:
+        """
+        Score the dictionary before the first game.
+
+        Args:
+            dictionary: Wordle dictionary of the games to come.
+            game_config: Game config keyword arguments, e.g. max_guesses.
+        """
+
+        del game_config
 
-        return word_with_highest_freq
+        dictionary.attach_column(FREQUENCY_COLUMN, _zipf_frequency)
 
     def play(self, game: "Game") -> str:
         """
@@ -82,7 +100,9 @@ def play_custom_agents_games(target_words: List[str]) -> None:
         target_words: list of target words.
     """
 
-    benchmark = Benchmark(SampleSimpleAgent(), target_words=target_words)
+    benchmark = Benchmark(
+        SampleSimpleAgent(), target_words=target_words, observers=[LoggingObserver()]
+    )
     benchmark_results = benchmark.run_games()
 
     print(benchmark_results)
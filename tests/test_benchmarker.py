@@ -0,0 +1,990 @@
+"""
+Logic to check that agent benchmarking behaves as expected.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import random
+import time
+import tracemalloc
+from collections import Counter
+from typing import List, Set
+
+import numpy as np
+import pytest
+
+from wordle_benchmark.agent import (
+    Agent,
+    AsyncAgent,
+    BatchAgent,
+    CachingAgent,
+    EntropyAgent,
+    MultiAgent,
+)
+from wordle_benchmark.benchmarker import (
+    AsyncBenchmark,
+    Benchmark,
+    Coordinator,
+    DecisionTree,
+    JsonlSink,
+    PrepareTimeout,
+    ResultsAggregator,
+    run_worker,
+)
+from wordle_benchmark.dictionary import Dictionary
+from wordle_benchmark.game import Game, GameObserver, GuessWord, TargetWord
+from wordle_benchmark.game.wordle_game import MAX_ILLEGAL_GUESSES
+from wordle_benchmark.instrumentation import Instrumentation, MemoryInstrumentation
+
+WORD_LIST = [
+    "abbey",
+    "abide",
+    "babes",
+    "cause",
+    "coals",
+    "crane",
+    "eerie",
+    "erase",
+    "geese",
+    "kebab",
+    "other",
+    "plate",
+    "speed",
+    "state",
+    "those",
+    "train",
+]
+
+
+class RandomCandidateAgent(Agent):  # pylint: disable=too-few-public-methods
+    """ Guess a random word that is still possible """
+
+    def play(self, game):
+        return random.choice(game.possible_words)
+
+
+class FirstCandidateAgent(Agent):  # pylint: disable=too-few-public-methods
+    """ Guess the first word that is still possible """
+
+    def play(self, game):
+        return game.possible_words[0]
+
+
+class CountingAgent(FirstCandidateAgent):  # pylint: disable=too-few-public-methods
+    """ Guess the first possible word, counting decisions """
+
+    def __init__(self) -> None:
+        self.n_calls = 0
+
+    def play(self, game):
+        self.n_calls += 1
+        return super().play(game)
+
+
+class ExploringAgent(Agent):  # pylint: disable=too-few-public-methods
+    """ Walk the dictionary in normal mode, guess the first candidate in hard mode """
+
+    def __init__(self) -> None:
+        self.n_calls = 0
+
+    def play(self, game):
+        self.n_calls += 1
+
+        if game.hard_mode:
+            return game.possible_words[0]
+
+        return game.dictionary.word(game.n_guesses)
+
+
+class StubbornAgent(Agent):  # pylint: disable=too-few-public-methods
+    """ Repeat a guess that is not in the dictionary """
+
+    def play(self, game):
+        return "xxxxx"
+
+
+class FirstCandidateBatchAgent(BatchAgent):  # pylint: disable=too-few-public-methods
+    """ Guess the first word that is still possible in every game at once """
+
+    def play_batch(self, batch):
+        return np.argmax(batch.candidates[batch.active], axis=1)
+
+
+class StubbornBatchAgent(BatchAgent):  # pylint: disable=too-few-public-methods
+    """ Repeat an illegal guess in the first game, guess candidates elsewhere """
+
+    def play_batch(self, batch):
+        active = batch.active
+        guesses = np.argmax(batch.candidates[active], axis=1).tolist()
+
+        return ["xxxxx" if game == 0 else guess for game, guess in zip(active, guesses)]
+
+
+class FirstCandidateMultiAgent(MultiAgent):  # pylint: disable=too-few-public-methods
+    """ Guess the first word still possible on the first unsolved board """
+
+    def play(self, game):
+        return int(np.argmax(game.candidates[game.active[0]]))
+
+
+class SinkBatchAgent(BatchAgent):  # pylint: disable=too-few-public-methods
+    """ Guess the first candidates, noting how many records the sink holds """
+
+    def __init__(self, sink_path) -> None:
+        self.sink_path = sink_path
+        self.n_written: Set[int] = set()
+
+    def play_batch(self, batch):
+        self.n_written.add(len(self.sink_path.read_text().splitlines()))
+        return np.argmax(batch.candidates[batch.active], axis=1)
+
+
+class SinkMultiAgent(MultiAgent):  # pylint: disable=too-few-public-methods
+    """ Guess the first candidates, noting how many records the sink holds """
+
+    def __init__(self, sink_path) -> None:
+        self.sink_path = sink_path
+        self.n_written: Set[int] = set()
+
+    def play(self, game):
+        self.n_written.add(len(self.sink_path.read_text().splitlines()))
+        return int(np.argmax(game.candidates[game.active[0]]))
+
+
+class StubbornAsyncAgent(AsyncAgent):  # pylint: disable=too-few-public-methods
+    """ Repeat a guess that is not in the dictionary, without blocking """
+
+    async def play(self, game):
+        await asyncio.sleep(0)
+        return "xxxxx"
+
+
+class RemoteFirstCandidateAgent(AsyncAgent):  # pylint: disable=too-few-public-methods
+    """ Ask a line protocol agent server for each guess """
+
+    def __init__(self, port: int) -> None:
+        self.port = port
+        self.n_in_flight = 0
+        self.max_in_flight = 0
+
+    async def play(self, game):
+        self.n_in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.n_in_flight)
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(json.dumps(game.possible_words).encode() + b"\n")
+        guess = (await reader.readline()).decode().strip()
+        writer.close()
+
+        self.n_in_flight -= 1
+        return guess
+
+
+async def _serve_first_candidate(reader, writer):
+    """ Stand-in agent server answering with the first possible word. """
+
+    possible_words = json.loads(await reader.readline())
+    await asyncio.sleep(0.01)
+    writer.write(possible_words[0].encode() + b"\n")
+    await writer.drain()
+    writer.close()
+
+
+def test_parallel_results_match_serial():
+    """
+    Verify that seeded aggregates do not depend on the worker count.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=1)
+
+    results = [
+        Benchmark(
+            RandomCandidateAgent(),
+            target_words=WORD_LIST,
+            n_workers=n_workers,
+            seed=7,
+            shard_size=3,
+            dictionary=dictionary,
+        ).run_games()
+        for n_workers in (1, 3)
+    ]
+
+    serial, parallel = results
+
+    assert serial.average_n_turns == parallel.average_n_turns
+    assert serial.percent_successes == parallel.percent_successes
+
+
+def test_batch_results_match_serial():
+    """
+    Verify that lockstep batches play the same games as one at a time.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+
+    serial = Benchmark(
+        FirstCandidateAgent(), target_words=WORD_LIST, dictionary=dictionary
+    ).run_games()
+    batched = Benchmark(
+        FirstCandidateBatchAgent(), target_words=WORD_LIST, dictionary=dictionary
+    ).run_batch_games(batch_size=5)
+
+    assert serial.average_n_turns == batched.average_n_turns
+    assert serial.percent_successes == batched.percent_successes
+
+    for unsupported in ({"hard_mode": True}, {"observers": []}):
+        with pytest.raises(ValueError):
+            Benchmark(FirstCandidateBatchAgent(), target_words=WORD_LIST, **unsupported)
+
+    with pytest.raises(TypeError):
+        Benchmark(FirstCandidateBatchAgent(), target_words=WORD_LIST).run_games()
+
+
+def test_async_results_match_serial(tmp_path):
+    """
+    Verify that concurrent async games play the same games as one at a time
+    and record every guess and feedback.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+
+    serial_benchmark = Benchmark(
+        FirstCandidateAgent(), target_words=WORD_LIST, dictionary=dictionary
+    )
+    serial_records = list(serial_benchmark.iter_games())
+    serial = serial_benchmark.run_games()
+
+    async def _run_against_server():
+        server = await asyncio.start_server(_serve_first_candidate, "127.0.0.1", 0)
+        agent = RemoteFirstCandidateAgent(server.sockets[0].getsockname()[1])
+
+        with JsonlSink(tmp_path / "async.jsonl") as sink:
+            async with server:
+                results = await AsyncBenchmark(
+                    agent,
+                    target_words=WORD_LIST,
+                    concurrency=4,
+                    sink=sink,
+                    dictionary=dictionary,
+                ).run_games_async()
+
+        return agent, results
+
+    agent, concurrent = asyncio.run(_run_against_server())
+
+    assert serial.average_n_turns == concurrent.average_n_turns
+    assert serial.percent_successes == concurrent.percent_successes
+    assert serial.n_turns_histogram == concurrent.n_turns_histogram
+    assert agent.max_in_flight == 4, "Concurrency limit not reached or exceeded"
+
+    concurrent_records = {
+        record.target_word: record
+        for record in JsonlSink.read(tmp_path / "async.jsonl")
+    }
+
+    assert len(concurrent_records) == len(serial_records)
+
+    for record in serial_records:
+        concurrent_record = concurrent_records[record.target_word]
+        assert concurrent_record.guesses == record.guesses
+        assert concurrent_record.feedback_codes == record.feedback_codes
+
+
+def test_async_illegal_guesses_forfeit_games():
+    """
+    Verify that an async agent repeating an illegal guess forfeits its games
+    without aborting the other games in flight.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    result = AsyncBenchmark(
+        StubbornAsyncAgent(),
+        target_words=WORD_LIST[:5],
+        concurrency=2,
+        dictionary=dictionary,
+    ).run_games()
+
+    assert result.n_games == 5
+    assert result.n_forfeits == 5
+    assert result.average_n_turns == 7
+
+
+def test_instrumented_phase_latencies():
+    """
+    Verify that every phase of every turn is timed, in process and in workers.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    samples = []
+
+    results = [
+        Benchmark(
+            FirstCandidateAgent(),
+            target_words=WORD_LIST,
+            n_workers=n_workers,
+            instrumentation=Instrumentation(
+                sampler=lambda *sample: samples.append(sample)
+            ),
+            dictionary=dictionary,
+        ).run_games()
+        for n_workers in (1, 2)
+    ]
+
+    for result in results:
+
+        n_turns = round(result.average_n_turns * len(WORD_LIST))
+        phases = result.phase_latencies
+
+        assert set(phases) == {"agent", "validation", "scoring", "filtering", "turn"}
+        assert all(summary.count == n_turns for summary in phases.values())
+        assert phases["turn"].p50 <= phases["turn"].p99 <= phases["turn"].max
+        assert result.turn_latencies["turn"][0].count == len(WORD_LIST)
+
+    assert len(samples) == 5 * n_turns, "Sampler should only run in process"
+
+
+def test_streamed_records_match_results(tmp_path):
+    """
+    Verify that streamed records, the sink and the aggregate results agree.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    sink_path = tmp_path / "records.jsonl"
+
+    with JsonlSink(sink_path) as sink:
+        benchmark = Benchmark(
+            FirstCandidateAgent(),
+            target_words=WORD_LIST,
+            n_workers=2,
+            shard_size=3,
+            sink=sink,
+            dictionary=dictionary,
+        )
+        records = list(benchmark.iter_games())
+
+    assert [record.target_word for record in records] == WORD_LIST
+    assert all(record.guesses[-1] == record.target_word for record in records)
+    assert list(JsonlSink.read(sink_path)) == records
+
+    results = ResultsAggregator().add_all(records).results()
+
+    assert results.n_games == len(WORD_LIST)
+    assert sum(results.n_turns_histogram.values()) == len(WORD_LIST)
+    assert results.average_n_turns == pytest.approx(
+        np.mean([record.n_turns for record in records])
+    )
+
+
+def test_caching_agent_reuses_decisions(tmp_path):
+    """
+    Verify that cached decisions match the agent's and persist across runs.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    expected = Benchmark(
+        FirstCandidateAgent(), target_words=WORD_LIST, dictionary=dictionary
+    ).run_games()
+
+    inner = CountingAgent()
+    agent = CachingAgent(inner, agent_version="first-1", cache_dir=tmp_path)
+    result = Benchmark(agent, target_words=WORD_LIST, dictionary=dictionary).run_games()
+
+    assert result.average_n_turns == expected.average_n_turns
+    assert result.percent_successes == expected.percent_successes
+    assert inner.n_calls == agent.misses == len(agent) < len(WORD_LIST) * 2
+    assert agent.hits > 0
+
+    agent.save()
+
+    reloaded_inner = CountingAgent()
+    reloaded = CachingAgent(reloaded_inner, agent_version="first-1", cache_dir=tmp_path)
+    Benchmark(reloaded, target_words=WORD_LIST, dictionary=dictionary).run_games()
+
+    assert reloaded_inner.n_calls == 0
+
+    bounded = CachingAgent(CountingAgent(), maxsize=2)
+    Benchmark(bounded, target_words=WORD_LIST, dictionary=dictionary).run_games()
+
+    assert len(bounded) == 2
+
+
+def test_caching_agent_keys_hard_mode(tmp_path):
+    """
+    Verify that decisions cached in normal mode are not replayed in hard mode.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    expected = Benchmark(
+        ExploringAgent(), target_words=WORD_LIST, dictionary=dictionary, hard_mode=True
+    ).run_games()
+
+    agent = CachingAgent(
+        ExploringAgent(), agent_version="explore-1", cache_dir=tmp_path
+    )
+    Benchmark(agent, target_words=WORD_LIST, dictionary=dictionary).run_games()
+    agent.save()
+
+    for hard_agent in (
+        agent,
+        CachingAgent(ExploringAgent(), agent_version="explore-1", cache_dir=tmp_path),
+    ):
+        result = Benchmark(
+            hard_agent, target_words=WORD_LIST, dictionary=dictionary, hard_mode=True
+        ).run_games()
+
+        assert result.n_forfeits == 0
+        assert result.average_n_turns == expected.average_n_turns
+        assert result.percent_successes == expected.percent_successes
+
+
+def test_repeated_illegal_guesses_forfeit_games(tmp_path):
+    """
+    Verify that an agent repeating an illegal guess forfeits instead of
+    stalling the benchmark, and that trees are not replayed across modes.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    result = Benchmark(
+        StubbornAgent(), target_words=WORD_LIST[:3], dictionary=dictionary
+    ).run_games()
+
+    assert result.n_forfeits == 3
+    assert result.percent_successes == 0
+
+    tree = Benchmark(
+        FirstCandidateAgent(), target_words=WORD_LIST, dictionary=dictionary
+    ).build_decision_tree()
+    tree.save(tmp_path / "tree.json")
+
+    with pytest.raises(ValueError):
+        Benchmark(
+            FirstCandidateAgent(),
+            target_words=WORD_LIST,
+            dictionary=dictionary,
+            hard_mode=True,
+        ).run_decision_tree(DecisionTree.load(tmp_path / "tree.json"))
+
+
+def test_repeated_illegal_batch_guesses_forfeit_games(tmp_path):
+    """
+    Verify that a batch agent repeating an illegal guess forfeits that game
+    instead of stalling the batch, while the other games play on.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    sink_path = tmp_path / "records.jsonl"
+
+    with JsonlSink(sink_path) as sink:
+        result = Benchmark(
+            StubbornBatchAgent(),
+            target_words=WORD_LIST,
+            sink=sink,
+            dictionary=dictionary,
+        ).run_batch_games()
+
+    records = list(JsonlSink.read(sink_path))
+
+    assert result.n_forfeits == 1
+    assert records[0].forfeit and records[0].n_turns == 7 and not records[0].guesses
+    assert len(records[0].turn_times) == MAX_ILLEGAL_GUESSES
+    assert all(record.success for record in records[1:])
+
+
+def test_decision_tree_matches_serial(tmp_path):
+    """
+    Verify that exploring and replaying the decision tree scores every target
+    like playing each game, with one agent call per distinct state.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    serial_agent = CountingAgent()
+    expected = list(
+        Benchmark(
+            serial_agent, target_words=WORD_LIST, dictionary=dictionary
+        ).iter_games()
+    )
+
+    tree_agent = CountingAgent()
+    benchmark = Benchmark(tree_agent, target_words=WORD_LIST, dictionary=dictionary)
+    tree = benchmark.build_decision_tree()
+
+    assert tree_agent.n_calls == len(tree) < serial_agent.n_calls
+
+    tree.save(tmp_path / "tree.json")
+    replayed = DecisionTree.load(tmp_path / "tree.json")
+    records = list(replayed.records(WORD_LIST, dictionary))
+
+    for record, expected_record in zip(records, expected):
+        assert record.guesses == expected_record.guesses
+        assert record.feedback_codes == expected_record.feedback_codes
+        assert record.success == expected_record.success
+
+    result = benchmark.run_decision_tree(replayed)
+
+    assert tree_agent.n_calls == len(tree), "Replay should not call the agent"
+    assert result.average_n_turns == pytest.approx(
+        np.mean([record.n_turns for record in expected])
+    )
+
+
+def test_entropy_agent_opener_and_results(tmp_path):
+    """
+    Verify that the entropy agent opens with the most informative guess and
+    does not lose to the first candidate baseline.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+
+    def bucket_cost(guess):
+        buckets = Counter(
+            tuple(state for _, state in GuessWord(guess).compare_to(TargetWord(target)))
+            for target in WORD_LIST
+        )
+        return sum(size * np.log2(size) for size in buckets.values())
+
+    agent = EntropyAgent(cache_dir=tmp_path, shortlist_size=4)
+
+    assert bucket_cost(agent.opener(dictionary)) == pytest.approx(
+        min(bucket_cost(guess) for guess in WORD_LIST)
+    )
+
+    result = Benchmark(agent, target_words=WORD_LIST, dictionary=dictionary).run_games()
+    baseline = Benchmark(
+        FirstCandidateAgent(), target_words=WORD_LIST, dictionary=dictionary
+    ).run_games()
+
+    assert result.percent_successes == 1.0
+    assert result.average_n_turns <= baseline.average_n_turns
+
+
+def test_entropy_agent_plays_legal_hard_mode_guesses(tmp_path):
+    """
+    Verify that the entropy agent only guesses candidates in hard mode, even
+    when a word ruled out by the revealed letters splits them better.
+    """
+
+    word_list = [first + "ater" for first in "cdhlmprw"] + ["dhlmp"]
+    dictionary = Dictionary(word_list=word_list, word_len=5)
+    agent = EntropyAgent(cache_dir=tmp_path)
+
+    for hard_mode in (False, True):
+
+        game = Game("water", dictionary=dictionary, hard_mode=hard_mode)
+        session = game.start_game()
+        next(session)
+        session.send("cater")
+
+        assert (agent.play(game) in game.candidate_view) == hard_mode
+
+    result = Benchmark(
+        agent, target_words=word_list, dictionary=dictionary, hard_mode=True
+    ).run_games()
+
+    assert result.n_forfeits == 0
+    assert result.percent_successes == 1.0
+
+
+def test_multi_board_results(tmp_path):
+    """
+    Verify that multi board games record every board and solve them all.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    sink_path = tmp_path / "records.jsonl"
+
+    with JsonlSink(sink_path) as sink:
+        result = Benchmark(
+            FirstCandidateMultiAgent(),
+            target_words=WORD_LIST,
+            sink=sink,
+            dictionary=dictionary,
+        ).run_multi_games(n_boards=4)
+
+    records = list(JsonlSink.read(sink_path))
+
+    assert result.n_games == len(WORD_LIST)
+    assert result.percent_successes == 1.0
+    assert [record.target_word for record in records] == WORD_LIST
+    assert all(record.guesses[-1] == record.target_word for record in records)
+
+    with pytest.raises(TypeError):
+        Benchmark(FirstCandidateAgent(), target_words=WORD_LIST).run_multi_games()
+
+    with pytest.raises(ValueError):
+        Benchmark(FirstCandidateMultiAgent(), target_words=WORD_LIST, hard_mode=True)
+
+
+class StubbornMultiAgent(MultiAgent):  # pylint: disable=too-few-public-methods
+    """ Solve the first board, then repeat an illegal guess """
+
+    def play(self, game):
+        if game.solved_at[0] >= 0:
+            return "xxxxx"
+
+        return int(np.argmax(game.candidates[0]))
+
+
+def test_repeated_illegal_multi_guesses_forfeit_boards():
+    """
+    Verify that a multi board agent repeating an illegal guess forfeits the
+    unsolved boards instead of stalling the game.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    result = Benchmark(
+        StubbornMultiAgent(), target_words=WORD_LIST[:8], dictionary=dictionary
+    ).run_multi_games(n_boards=4)
+
+    assert result.n_games == 8
+    assert result.n_forfeits == 6
+    assert result.percent_successes == 2 / 8
+
+
+def test_adversarial_worst_case():
+    """
+    Verify that the adversary never needs more guesses than the agent's worst
+    target and that the result reports the worst case.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    benchmark = Benchmark(
+        FirstCandidateAgent(), target_words=WORD_LIST, dictionary=dictionary
+    )
+
+    worst_case = benchmark.run_games().max_n_turns
+    result = benchmark.run_adversarial_games()
+
+    assert result.n_games == 1
+    assert 1 < result.max_n_turns <= worst_case
+
+
+def _outcomes(records):
+    """ Records without their timings. """
+
+    return [(record.target_word, record.guesses, record.success) for record in records]
+
+
+def _run_workers(coordinator, n_workers, dictionary):
+    """
+    Play a coordinator's shards with local worker processes.
+
+    Args:
+        coordinator: benchmark coordinator.
+        n_workers: number of worker processes.
+        dictionary: Wordle dictionary.
+    Returns:
+        Merged benchmark results.
+    """
+
+    address = coordinator.start()
+    workers = [
+        multiprocessing.Process(
+            target=run_worker,
+            args=(address, FirstCandidateAgent, coordinator.authkey),
+            kwargs={"dictionary": dictionary},
+        )
+        for _ in range(n_workers)
+    ]
+
+    for worker in workers:
+        worker.start()
+
+    results = coordinator.run()
+
+    for worker in workers:
+        worker.join(timeout=10)
+
+    return results
+
+
+def test_coordinator_resumes_from_checkpoints(tmp_path):
+    """
+    Verify that worker processes play every shard, that a resumed run only
+    plays the shards without a checkpoint and refuses workers of another
+    config, and that listening beyond localhost needs an authkey.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+
+    serial = list(
+        Benchmark(
+            FirstCandidateAgent(), target_words=WORD_LIST, dictionary=dictionary
+        ).iter_games()
+    )
+
+    coordinator = Coordinator(WORD_LIST, tmp_path, shard_size=3)
+    results = _run_workers(coordinator, 3, dictionary)
+
+    assert _outcomes(coordinator.records()) == _outcomes(serial)
+    assert results.n_turns_histogram == (
+        ResultsAggregator().add_all(serial).results().n_turns_histogram
+    )
+
+    for shard_path in sorted(tmp_path.glob("shard-*.jsonl"))[1:3]:
+        shard_path.unlink()
+
+    resumed = Coordinator(WORD_LIST, tmp_path, shard_size=3)
+
+    assert resumed.n_remaining == 2
+
+    with pytest.raises(ValueError):
+        run_worker(
+            resumed.start(),
+            FirstCandidateAgent,
+            resumed.authkey,
+            dictionary=dictionary,
+            hard_mode=True,
+        )
+
+    assert _run_workers(resumed, 1, dictionary).n_games == len(WORD_LIST)
+    assert _outcomes(resumed.records()) == _outcomes(serial)
+
+    with pytest.raises(ValueError):
+        Coordinator(WORD_LIST, tmp_path, shard_size=4)
+
+    with pytest.raises(ValueError):
+        Coordinator(WORD_LIST, tmp_path / "remote", address=("0.0.0.0", 0))
+
+
+class StallingAgent(Agent):  # pylint: disable=too-few-public-methods
+    """ Guess the first word that is still possible, stalling on the second turn """
+
+    def __init__(self, stall):
+        self._stall = stall
+
+    def play(self, game):
+        if game.n_guesses == 1:
+            time.sleep(self._stall)
+        return game.possible_words[0]
+
+
+def test_turn_timeouts_forfeit_games():
+    """
+    Verify that isolated agents are preempted when a turn runs out of time,
+    that in process agents forfeit once they answer late, and that games
+    within budget are unaffected.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    target_words = [dictionary.word_list[0], "those", "train"]
+
+    expected = list(
+        Benchmark(
+            FirstCandidateAgent(), target_words=target_words, dictionary=dictionary
+        ).iter_games()
+    )
+
+    for stall, isolate in ((60.0, True), (0.3, False)):
+
+        start = time.perf_counter()
+        records = list(
+            Benchmark(
+                StallingAgent(stall),
+                target_words=target_words,
+                turn_timeout=0.2,
+                isolate=isolate,
+                dictionary=dictionary,
+            ).iter_games()
+        )
+
+        assert time.perf_counter() - start < 10
+
+        solved, *forfeited = records
+
+        assert not solved.forfeit and solved.guesses == expected[0].guesses
+
+        for record in forfeited:
+            assert record.forfeit and not record.success
+            assert record.n_turns == 7 and len(record.guesses) == 1
+
+        assert ResultsAggregator().add_all(records).results().n_forfeits == 2
+
+
+class EndCountingObserver(GameObserver):
+    """ Count finished games and whether each was won """
+
+    def __init__(self) -> None:
+        self.ends: List[bool] = []
+
+    def on_game_end(self, game, target_word):
+        self.ends.append(game.success)
+
+
+def test_turn_timeouts_notify_observers():
+    """
+    Verify that observers see a game forfeited on time end like any other.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    observer = EndCountingObserver()
+
+    Benchmark(
+        StallingAgent(0.3),
+        target_words=[dictionary.word_list[0], "those"],
+        turn_timeout=0.2,
+        dictionary=dictionary,
+        observers=[observer],
+    ).run_games()
+
+    assert observer.ends == [True, False]
+
+
+class SlowStartAgent(StallingAgent):  # pylint: disable=too-few-public-methods
+    """ Stalling agent with a slow setup """
+
+    def __init__(self, stall, prepare_stall):
+        super().__init__(stall)
+        self._prepare_stall = prepare_stall
+
+    def prepare(self, dictionary, game_config):
+        time.sleep(self._prepare_stall)
+
+
+def test_isolated_agent_restarts_off_the_clock():
+    """
+    Verify that a preempted subprocess is replaced before the next game, not
+    within the timed out turn, and that a hung prepare is preempted too.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    target_words = ["those", "train", "erase"]
+
+    records = list(
+        Benchmark(
+            SlowStartAgent(60.0, 0.5),
+            target_words=target_words,
+            turn_timeout=0.2,
+            isolate=True,
+            dictionary=dictionary,
+        ).iter_games()
+    )
+
+    for record in records:
+        assert record.forfeit
+        assert record.turn_times[-1] < 0.45, "Restart charged to the turn"
+
+    start = time.perf_counter()
+
+    with pytest.raises(PrepareTimeout):
+        Benchmark(
+            SlowStartAgent(0.0, 60.0),
+            target_words=target_words,
+            isolate=True,
+            prepare_timeout=0.5,
+            dictionary=dictionary,
+        ).run_games()
+
+    assert time.perf_counter() - start < 10
+
+
+class PreparingAgent(FirstCandidateAgent):  # pylint: disable=too-few-public-methods
+    """ Guess the first word that is still possible after a slow setup """
+
+    def __init__(self):
+        self.prepared = []
+
+    def prepare(self, dictionary, game_config):
+        time.sleep(0.05)
+        self.prepared.append((dictionary.content_hash, game_config))
+
+
+def test_prepare_is_timed_separately():
+    """
+    Verify that the agent is prepared once before any game, and that setup,
+    cold and warm latencies are reported apart.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    agent = PreparingAgent()
+    benchmark = Benchmark(
+        agent, target_words=WORD_LIST, dictionary=dictionary, max_guesses=5
+    )
+
+    results = benchmark.run_games()
+    records = list(benchmark.iter_games())
+
+    assert agent.prepared == [(dictionary.content_hash, {"max_guesses": 5})]
+    assert results.setup_time >= 0.05
+    assert results.cold_turn_time > 0 and results.std_warm_turn_time >= 0
+    assert not any(record.cold_start for record in records)
+
+    parallel = Benchmark(
+        PreparingAgent(),
+        target_words=WORD_LIST,
+        n_workers=2,
+        shard_size=4,
+        dictionary=dictionary,
+    ).run_games()
+
+    assert parallel.setup_time >= 0.05
+    assert parallel.n_games == len(WORD_LIST)
+    assert parallel.cold_turn_time > 0
+
+
+class HoardingAgent(FirstCandidateAgent):  # pylint: disable=too-few-public-methods
+    """ Guess the first word that is still possible, keeping garbage each turn """
+
+    def __init__(self):
+        self.hoard = []
+
+    def play(self, game):
+        self.hoard.append(bytearray(100_000))
+        return super().play(game)
+
+
+def test_memory_instrumentation_attributes_allocations():
+    """
+    Verify that memory mode reports per game peaks and per turn block counts,
+    and attributes retained memory to the agent's allocation site.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    memory = MemoryInstrumentation(top_n=3)
+    benchmark = Benchmark(
+        HoardingAgent(), target_words=WORD_LIST, memory=memory, dictionary=dictionary
+    )
+
+    records = list(benchmark.iter_games())
+    summary = memory.summary()
+
+    assert not tracemalloc.is_tracing()
+    assert all(
+        len(record.agent_blocks) == len(record.engine_blocks) == record.n_turns
+        for record in records
+    )
+    assert all(record.peak_memory >= 100_000 for record in records)
+    assert summary.peak_traced >= summary.steady_traced
+    assert summary.steady_traced >= 100_000 * sum(record.n_turns for record in records)
+
+    top_agent_site = summary.top_sites["agent"][0]
+
+    assert "test_benchmarker.py" in top_agent_site.location
+    assert top_agent_site.count >= sum(record.n_turns for record in records)
+    assert len(summary.top_sites["engine"]) <= 3
+
+    with pytest.raises(ValueError):
+        Benchmark(HoardingAgent(), target_words=WORD_LIST, n_workers=2, memory=memory)
+
+
+def test_batch_and_multi_records_are_written_as_games_finish(tmp_path):
+    """
+    Verify that batch and multi board runs write each batch or game's records
+    to the sink before playing the next one.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5, seed=3)
+    batch_agent = SinkBatchAgent(tmp_path / "batch.jsonl")
+    multi_agent = SinkMultiAgent(tmp_path / "multi.jsonl")
+
+    with JsonlSink(batch_agent.sink_path) as sink:
+        Benchmark(
+            batch_agent, target_words=WORD_LIST, sink=sink, dictionary=dictionary
+        ).run_batch_games(batch_size=4)
+
+    with JsonlSink(multi_agent.sink_path) as sink:
+        Benchmark(
+            multi_agent, target_words=WORD_LIST, sink=sink, dictionary=dictionary
+        ).run_multi_games(n_boards=4)
+
+    assert batch_agent.n_written == multi_agent.n_written == {0, 4, 8, 12}
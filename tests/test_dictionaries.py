@@ -2,7 +2,17 @@
 Logic to check that the Wordle dictionary representations work as expected.
 """
 
-from wordle_benchmark.dictionary import RemoteDictionary
+import pickle
+
+import pytest
+
+from wordle_benchmark.dictionary import (
+    CustomDictionary,
+    Dictionary,
+    LocalDictionary,
+    RemoteDictionary,
+    write_packed_dictionary,
+)
 
 
 def test_remote_dictionary_connection():
@@ -22,3 +32,187 @@ def test_remote_dictionary_connection():
     assert last_word == "zymic"
 
     assert len(all_words) == 6278
+
+
+def test_dictionary_word_ids():
+    """
+    Verify that word IDs, membership and read-only views agree.
+    """
+
+    word_list = ["plate", "train", "crane", "robin", "at", "longer"]
+    dictionary = Dictionary(word_list=word_list, word_len=5, seed=42)
+
+    assert len(dictionary) == 4
+    assert "crane" in dictionary
+    assert "at" not in dictionary
+
+    for word_id, word in zip(dictionary.word_ids, dictionary.word_list):
+        assert dictionary.word_id(word) == word_id
+        assert dictionary.word(word_id) == word
+
+    copied = dictionary.copy_word_list()
+    copied.append("extra")
+
+    assert "extra" not in dictionary, "Copy should not alias the store"
+    assert list(dictionary) == copied[:-1]
+
+
+class _FakeResponse:  # pylint: disable=too-few-public-methods
+    """ Minimal stand-in for a requests response """
+
+    def __init__(self, status_code: int, text: str = "") -> None:
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode()
+        self.headers = {"ETag": '"v1"'}
+
+    def raise_for_status(self) -> None:
+        """ Successful and not-modified responses never raise. """
+
+
+def test_remote_dictionary_cache(tmp_path, monkeypatch):
+    """
+    Verify that downloads are cached, revalidated and reused offline.
+    """
+
+    import requests  # pylint: disable=import-outside-toplevel
+
+    from wordle_benchmark.dictionary import (  # pylint: disable=import-outside-toplevel
+        wordle_dictionary,
+    )
+
+    remote_source = "https://example.com/words.json"
+    requests_seen = []
+
+    def _get(url, headers, timeout):  # pylint: disable=unused-argument
+        requests_seen.append(headers)
+
+        if len(requests_seen) == 1:
+            return _FakeResponse(200, '{"plate": 1, "crane": 1, "no-no": 1}')
+
+        if len(requests_seen) == 2:
+            return _FakeResponse(304)
+
+        raise requests.ConnectionError("offline")
+
+    session = requests.Session()
+    monkeypatch.setattr(session, "get", _get)
+    monkeypatch.setattr(wordle_dictionary, "_get_session", lambda: session)
+
+    for _ in range(3):
+        dictionary = RemoteDictionary(remote_source, word_len=5, cache_dir=tmp_path)
+        assert list(dictionary) == ["crane", "plate"]
+
+    assert requests_seen[1] == {"If-None-Match": '"v1"'}, "Cache not revalidated"
+
+
+def test_local_dictionary_matches_custom(tmp_path):
+    """
+    Verify that packed dictionaries keep word order, seeds and columns.
+    """
+
+    word_list = ["plate", "at", "train", "crâne", "robin", "longer", "state"]
+    frequencies = [float(ind) for ind in range(len(word_list))]
+
+    packed_path = tmp_path / "words.pack"
+    write_packed_dictionary(
+        iter(word_list), packed_path, seed=42, columns={"frequency": frequencies}
+    )
+
+    for seed in (None, 42, 7):
+
+        local = LocalDictionary(packed_path, word_len=5, seed=seed)
+        custom = CustomDictionary(word_list=word_list, word_len=5, seed=seed)
+
+        assert list(local) == list(custom)
+        assert local.content_hash == custom.content_hash
+
+        for word, frequency in zip(local, local.column("frequency")):
+            assert frequencies[word_list.index(word)] == frequency
+
+    for bad_frequencies in (frequencies[:-1], frequencies + [0.0]):
+        with pytest.raises(ValueError, match="frequency"):
+            write_packed_dictionary(
+                iter(word_list),
+                tmp_path / "bad.pack",
+                columns={"frequency": bad_frequencies},
+            )
+
+    assert not (tmp_path / "bad.pack").exists()
+
+
+def test_pickled_dictionary_keeps_only_filtered_words():
+    """
+    Verify that pickles sent to workers round trip without the words of
+    other lengths.
+    """
+
+    dictionary = CustomDictionary(
+        word_list=["plate", "at", "longer", "state"], word_len=5, seed=3
+    )
+    pickled = pickle.dumps(dictionary)
+
+    assert b"longer" not in pickled
+    assert list(pickle.loads(pickled)) == list(dictionary)
+
+
+def test_local_dictionary_resolves_words_from_packed_store(tmp_path):
+    """
+    Verify that packed lookups and encodings match a CustomDictionary without
+    decoding the word list, including duplicates and non-ASCII groups.
+    """
+
+    word_list = ["plate", "train", "robin", "plate", "state", "crâne", "stare"]
+
+    for words, seed in ((word_list[:5], 42), (word_list, 7), (word_list, None)):
+
+        custom = CustomDictionary(word_list=words, word_len=5, seed=seed)
+        packed_path = tmp_path / f"{seed}.pack"
+        write_packed_dictionary(iter(words), packed_path, seed=42)
+        local = LocalDictionary(packed_path, word_len=5, seed=seed)
+
+        for word in words + ["cigar", "at", "crane"]:
+            assert (word in local) == (word in custom)
+
+            if word in custom:
+                assert local.word_id(word) == custom.word_id(word)
+
+        assert [local.word(ind) for ind in range(len(local))] == list(custom)
+        assert local._decoded_words is None  # pylint: disable=protected-access
+
+        assert local.content_hash == custom.content_hash
+        assert local.alphabet == custom.alphabet
+        assert (local.encoded == custom.encoded).all()
+        assert local.word_list == custom.word_list
+
+
+def test_attached_columns_are_cached_and_ranked(tmp_path):
+    """
+    Verify that score columns are computed once per dictionary and that
+    top_k ranks a subset by score, breaking ties by word ID.
+    """
+
+    word_list = ["plate", "train", "robin", "state", "crane", "stare"]
+    scores = {"plate": 1.0, "train": 3.0, "robin": 3.0, "state": 0.5, "crane": 2.0}
+    n_calls = []
+
+    def score(word):
+        n_calls.append(word)
+        return scores.get(word, 0.0)
+
+    for _ in range(2):
+        dictionary = CustomDictionary(word_list=word_list, word_len=5)
+        values = dictionary.attach_column("score", score, cache_dir=tmp_path)
+
+        assert "score" in dictionary.column_names
+        assert values.tolist() == [scores.get(word, 0.0) for word in word_list]
+
+    assert len(n_calls) == len(word_list), "Cached column scored again"
+
+    top = dictionary.top_k("score", 3).tolist()
+    assert [dictionary.word(word_id) for word_id in top] == ["train", "robin", "crane"]
+
+    subset = dictionary.top_k("score", 5, word_ids=[0, 3, 5]).tolist()
+    assert subset == [0, 3, 5]
+
+    assert dictionary.top_k("score", 0).tolist() == []
@@ -0,0 +1,261 @@
+"""
+Logic to check that Wordle game play behaves as expected.
+"""
+
+from collections import Counter
+from typing import Any, List, Tuple
+
+import pytest
+
+from wordle_benchmark.dictionary import Dictionary
+from wordle_benchmark.game import (
+    AdversarialGame,
+    FeedbackMatrix,
+    Game,
+    GameObserver,
+    GuessWord,
+    MultiGame,
+    TargetWord,
+)
+from wordle_benchmark.game.wordle_feedback import pattern_code
+from wordle_benchmark.game.wordle_game import IllegalGuessError
+
+WORD_LIST = [
+    "abbey",
+    "abide",
+    "babes",
+    "cause",
+    "coals",
+    "eerie",
+    "erase",
+    "geese",
+    "kebab",
+    "other",
+    "speed",
+    "those",
+]
+
+
+def _play(game: Game, guesses):
+    """
+    Send guesses to a game until it finishes.
+
+    Args:
+        game: Wordle game.
+        guesses: Guess words to send in order.
+    """
+
+    session = game.start_game()
+    next(session)
+
+    for guess in guesses:
+        try:
+            session.send(guess)
+        except StopIteration:
+            break
+
+
+def test_possible_words_consistent_with_feedback():
+    """
+    Verify that candidates are exactly the words matching every guess so far.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5)
+
+    for target in WORD_LIST:
+
+        game = Game(target, dictionary=dictionary)
+        _play(game, ["geese", "babes"])
+
+        expected = [
+            word
+            for word in WORD_LIST
+            if all(
+                GuessWord(guess).compare_to(TargetWord(word))
+                == GuessWord(guess).compare_to(TargetWord(target))
+                for guess in ("geese", "babes")
+            )
+        ]
+
+        assert game.possible_words == expected, f"Bad candidates for {target}"
+
+
+def test_candidate_view_matches_possible_words():
+    """
+    Verify that the lazy candidate view agrees with the materialized list and
+    is not changed by later guesses.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5)
+    game = Game("those", dictionary=dictionary)
+    session = game.start_game()
+    next(session)
+    session.send("geese")
+
+    view = game.candidate_view
+    possible_words = game.possible_words
+
+    assert len(view) == len(possible_words) == view.mask.sum()
+    assert list(view) == possible_words == [view[ind] for ind in range(len(view))]
+    assert view.ids.tolist() == [dictionary.word_id(word) for word in possible_words]
+    assert all(word in view and dictionary.word_id(word) in view for word in view)
+    assert "geese" not in view and "xxxxx" not in view and -1 not in view
+
+    session.send("babes")
+
+    assert list(view) == possible_words
+    assert game.candidate_view is not view
+
+
+def test_candidate_view_top_k_ranks_candidates(tmp_path):
+    """
+    Verify that the candidate view ranks only the remaining candidates.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5)
+    dictionary.attach_column("n_letters", lambda word: len(set(word)), tmp_path)
+
+    game = Game("those", dictionary=dictionary)
+    session = game.start_game()
+    next(session)
+    session.send("geese")
+
+    expected = sorted(
+        game.possible_words,
+        key=lambda word: (-len(set(word)), dictionary.word_id(word)),
+    )
+
+    assert game.candidate_view.top_k("n_letters", 3) == expected[:3]
+
+
+def test_hard_mode_rejects_guesses_ignoring_revealed_letters():
+    """
+    Verify that hard mode requires revealed greens in place and enough copies
+    of revealed letters, and that normal mode does not.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5)
+
+    game = Game("erase", dictionary=dictionary, hard_mode=True)
+    _play(game, ["geese", "speed", "those", "cause"])
+
+    assert game.n_guesses == 1, "Illegal hard mode guesses should be ignored"
+
+    for guess in ("speed", "those", "cause"):
+        with pytest.raises(IllegalGuessError):
+            game.check_guess(GuessWord(guess))
+
+    game.check_guess(GuessWord("erase"))
+
+    normal_game = Game("erase", dictionary=dictionary)
+    _play(normal_game, ["geese", "speed", "those", "cause"])
+
+    assert normal_game.n_guesses == 4
+
+
+class RecordingObserver(GameObserver):
+    """ Keep every event in order """
+
+    def __init__(self) -> None:
+        self.events: List[Tuple[Any, ...]] = []
+
+    def on_game_start(self, game, target_word):
+        self.events.append(("start", target_word))
+
+    def on_guess(self, game, guess):
+        self.events.append(("guess", guess))
+
+    def on_feedback(self, game, guess, code):
+        self.events.append(("feedback", guess, code))
+
+    def on_game_end(self, game, target_word):
+        self.events.append(("end", game.success))
+
+
+def test_observer_receives_game_events():
+    """
+    Verify that observers see each event once, in order.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5)
+    observer = RecordingObserver()
+
+    game = Game("those", dictionary=dictionary, observers=[observer])
+    _play(game, ["geese", "xxxxx", "those"])
+
+    assert observer.events == [
+        ("start", "those"),
+        ("guess", "geese"),
+        ("feedback", "geese", game.history[0][1]),
+        ("guess", "xxxxx"),
+        ("guess", "those"),
+        ("feedback", "those", 3 ** 5 - 1),
+        ("end", True),
+    ]
+
+
+def test_multi_game_boards_match_single_games(tmp_path):
+    """
+    Verify that each board of a multi board game tracks the same candidates
+    and outcome as a single game, with and without a feedback table.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5)
+    targets = ["those", "erase", "kebab", "abide"]
+    guesses = ["geese", "babes", "those", "erase", "abide", "kebab"]
+
+    for feedback in (None, FeedbackMatrix(dictionary, cache_dir=tmp_path)):
+
+        multi_game = MultiGame(targets, dictionary=dictionary, feedback=feedback)
+
+        for guess in guesses:
+            multi_game.step(guess)
+
+        assert multi_game.success and multi_game.finished
+        assert multi_game.solved_at.tolist() == [3, 4, 6, 5]
+
+        for board, target in enumerate(targets):
+
+            game = Game(target, dictionary=dictionary)
+            _play(game, guesses[: multi_game.solved_at[board]])
+
+            assert multi_game.possible_words(board) == game.possible_words
+            assert multi_game.feedback_codes[: game.n_guesses, board].tolist() == [
+                code for _, code in game.history
+            ]
+
+
+def test_adversarial_game_keeps_largest_bucket(tmp_path):
+    """
+    Verify that adversarial feedback keeps the largest group of candidates
+    sharing one pattern, with and without a feedback table, and that no
+    target is reported before the first guess.
+    """
+
+    dictionary = Dictionary(word_list=WORD_LIST, word_len=5)
+    guesses = ["geese", "babes", "coals"]
+
+    for feedback in (None, FeedbackMatrix(dictionary, cache_dir=tmp_path)):
+
+        observer = RecordingObserver()
+        game = AdversarialGame(
+            dictionary=dictionary, feedback=feedback, observers=[observer]
+        )
+        session = game.start_game()
+        next(session)
+
+        assert observer.events == [("start", "?????")]
+
+        for guess in guesses:
+
+            candidates = game.possible_words
+            session.send(guess)
+            _, code = game.history[-1]
+
+            buckets = Counter(pattern_code(guess, word) for word in candidates)
+
+            assert buckets[code] == max(buckets.values())
+            assert game.possible_words == [
+                word for word in candidates if pattern_code(guess, word) == code
+            ]
+            assert game.candidates.sum() == len(game.possible_words)
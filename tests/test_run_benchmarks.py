@@ -0,0 +1,118 @@
+"""
+Logic to check that the benchmark regression test gives textbook p values.
+"""
+
+import importlib.util
+import json
+import math
+import pathlib
+
+import pytest
+
+BENCHMARKS_PATH = (
+    pathlib.Path(__file__).parent.parent / "benchmarks" / "run_benchmarks.py"
+)
+
+_spec = importlib.util.spec_from_file_location("run_benchmarks", BENCHMARKS_PATH)
+assert _spec is not None and _spec.loader is not None
+run_benchmarks = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(run_benchmarks)
+
+# one sided critical values of Student's t distribution, (dof, t, p)
+T_TABLE = [
+    (1, 6.314, 0.05),
+    (2, 2.920, 0.05),
+    (5, 2.015, 0.05),
+    (5, 3.365, 0.01),
+    (10, 1.372, 0.10),
+    (10, 1.812, 0.05),
+    (10, 2.764, 0.01),
+    (30, 1.697, 0.05),
+    (30, 3.385, 0.001),
+    (120, 1.980, 0.025),
+]
+
+
+def _t_survival(t_stat, dof):
+    """ Student's t survival function through the tested incomplete beta. """
+
+    # pylint: disable=protected-access
+    tail = 0.5 * run_benchmarks._betainc(dof / 2, 0.5, dof / (dof + t_stat ** 2))
+
+    return tail if t_stat > 0 else 1.0 - tail
+
+
+def test_t_distribution_matches_tables():
+    """
+    Verify the survival function against tabulated critical values and the
+    closed forms for one and two degrees of freedom.
+    """
+
+    for dof, t_stat, p_value in T_TABLE:
+        assert _t_survival(t_stat, dof) == pytest.approx(p_value, rel=5e-3)
+        assert _t_survival(-t_stat, dof) == pytest.approx(1 - p_value, rel=5e-3)
+
+    for t_stat in (0.1, 0.5, 1.0, 3.0, 25.0):
+        cauchy = 0.5 - math.atan(t_stat) / math.pi
+        two_dof = 0.5 - t_stat / (2 * math.sqrt(2 + t_stat ** 2))
+
+        assert _t_survival(t_stat, 1) == pytest.approx(cauchy, rel=1e-9)
+        assert _t_survival(t_stat, 2) == pytest.approx(two_dof, rel=1e-9)
+
+
+def test_welch_t_test_p_values():
+    """
+    Verify Welch's statistic, degrees of freedom and one sided p value on
+    samples worked by hand, and the constant sample edge cases.
+    """
+
+    # equal variances 1, Welch's degrees of freedom are 4
+    t_stat, p_value = run_benchmarks.welch_t_test([1.0, 2.0, 3.0], [4.0, 5.0, 6.0])
+    expected_t = 3 / math.sqrt(2 / 3)
+    # closed form cumulative distribution for four degrees of freedom
+    ratio = expected_t / math.sqrt(4 + expected_t ** 2)
+    expected_p = 0.5 - 0.75 * ratio + 0.25 * ratio ** 3
+
+    assert t_stat == pytest.approx(expected_t, rel=1e-12)
+    assert p_value == pytest.approx(expected_p, rel=1e-9)
+
+    t_stat, p_value = run_benchmarks.welch_t_test([4.0, 5.0, 6.0], [1.0, 2.0, 3.0])
+
+    assert t_stat == pytest.approx(-expected_t, rel=1e-12)
+    assert p_value == pytest.approx(1 - expected_p, rel=1e-9)
+
+    assert run_benchmarks.welch_t_test([1.0, 1.0], [2.0, 2.0]) == (math.inf, 0.0)
+    assert run_benchmarks.welch_t_test([2.0, 2.0], [1.0, 1.0]) == (-math.inf, 1.0)
+
+
+def test_partial_save_keeps_other_baseline_cases(tmp_path, monkeypatch):
+    """
+    Verify that saving a run restricted with only replaces the timed cases
+    and keeps the others, while a full run replaces the whole baseline.
+    """
+
+    samples = {"fast": [1.0, 1.0], "slow": [2.0, 2.0], "gone": [3.0, 3.0]}
+    monkeypatch.setattr(run_benchmarks, "_load_fixture", list)
+    monkeypatch.setattr(
+        run_benchmarks, "_build_cases", lambda words, cache_dir: {n: n for n in samples}
+    )
+    monkeypatch.setattr(
+        run_benchmarks, "_time_case", lambda case, repeats: list(samples[case])
+    )
+
+    baseline = tmp_path / "baseline.json"
+
+    for name in samples:
+        run_benchmarks.run_benchmarks(str(baseline), save=True, only=name)
+
+    samples["fast"] = [0.5, 0.5]
+    run_benchmarks.run_benchmarks(str(baseline), save=True, only="fast")
+    cases = json.loads(baseline.read_text(encoding="utf-8"))["cases"]
+
+    assert {name: case["samples"] for name, case in cases.items()} == samples
+
+    del samples["gone"]
+    run_benchmarks.run_benchmarks(str(baseline), save=True)
+    cases = json.loads(baseline.read_text(encoding="utf-8"))["cases"]
+
+    assert sorted(cases) == ["fast", "slow"]
@@ -2,7 +2,16 @@
 Logic to check that the Wordle word representations work as expected.
 """
 
-from wordle_benchmark.game import GuessWord, LetterState, TargetWord, Word
+from wordle_benchmark.dictionary import Dictionary
+from wordle_benchmark.game import (
+    FeedbackMatrix,
+    GuessWord,
+    LetterState,
+    TargetWord,
+    Word,
+    encode_pattern,
+    pattern_code,
+)
 
 
 def test_word_iter():
@@ -44,3 +53,54 @@ def test_word_comparison():
     ]
 
     assert matches == expected_matches, "Match logic broken"
+
+
+def test_word_comparison_repeated_letters():
+    """
+    Verify that extra copies of a letter are not all marked yellow.
+    """
+
+    matches = GuessWord("speed").compare_to(TargetWord("abide"))
+    expected_matches = [
+        ("s", LetterState.BLACK),
+        ("p", LetterState.BLACK),
+        ("e", LetterState.YELLOW),
+        ("e", LetterState.BLACK),
+        ("d", LetterState.YELLOW),
+    ]
+
+    assert matches == expected_matches, "Repeated letter logic broken"
+
+    matches = GuessWord("geese").compare_to(TargetWord("those"))
+    letter_states = [letter_state for _, letter_state in matches]
+
+    assert letter_states == [
+        LetterState.BLACK,
+        LetterState.BLACK,
+        LetterState.BLACK,
+        LetterState.GREEN,
+        LetterState.GREEN,
+    ], "Green should consume the only copy of a letter"
+
+
+def test_feedback_matrix_matches_compare_to(tmp_path):
+    """
+    Verify that table lookups and scalar codes agree with letter by letter
+    comparison.
+    """
+
+    word_list = ["abide", "speed", "geese", "those", "eerie", "kebab", "abbey"]
+    dictionary = Dictionary(word_list=word_list, word_len=5, seed=0)
+    feedback = FeedbackMatrix(dictionary, cache_dir=tmp_path)
+
+    for guess in word_list:
+        for target in word_list:
+            matches = GuessWord(guess).compare_to(TargetWord(target))
+            expected_code = encode_pattern([state for _, state in matches])
+
+            assert feedback.pattern(guess, target) == expected_code
+            assert pattern_code(guess, target) == expected_code
+
+    reloaded = FeedbackMatrix(dictionary, cache_dir=tmp_path)
+
+    assert (reloaded.table == feedback.table).all(), "Persisted table differs"
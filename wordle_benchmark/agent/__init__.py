@@ -1,2 +1,4 @@
 # pylint: disable=missing-module-docstring
-from .wordle_agent import Agent
+from .wordle_agent import Agent, AsyncAgent, BatchAgent, MultiAgent
+from .wordle_caching_agent import CachingAgent
+from .wordle_entropy_agent import EntropyAgent
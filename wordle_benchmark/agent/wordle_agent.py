@@ -3,10 +3,11 @@ Classes to represent Wordle playing agents.
 """
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Dict, Sequence, Union
 
 if TYPE_CHECKING:
-    from wordle_benchmark.game import Game
+    from wordle_benchmark.dictionary import Dictionary
+    from wordle_benchmark.game import BatchGame, Game, MultiGame
 
 
 class Agent(ABC):  # pylint: disable=too-few-public-methods
@@ -22,3 +23,64 @@ class Agent(ABC):  # pylint: disable=too-few-public-methods
         """
 
         ...
+
+    def prepare(self, dictionary: "Dictionary", game_config: Dict[str, Any]) -> None:
+        """
+        Optional one off setup, e.g. building indexes or loading models,
+        called and timed by Benchmark before any game. Does nothing by default.
+
+        Args:
+            dictionary: Wordle dictionary of the games to come.
+            game_config: Game config keyword arguments, e.g. max_guesses.
+        """
+
+
+class AsyncAgent(ABC):  # pylint: disable=too-few-public-methods
+    """ Wordle agent awaited by asyncio game sessions, e.g. for remote models """
+
+    @abstractmethod
+    async def play(self, game: "Game") -> str:
+        """
+        Args:
+            game: Game with game state information.
+        Returns:
+            String of guess word.
+        """
+
+        ...
+
+
+class BatchAgent(ABC):  # pylint: disable=too-few-public-methods
+    """ Wordle agent that plays a batch of games at once """
+
+    @abstractmethod
+    def play_batch(self, batch: "BatchGame") -> Sequence[Union[str, int]]:
+        """
+        Args:
+            batch: Batch of games with array game state information.
+        Returns:
+            Guess word or word ID for each game in batch.active, in order.
+        """
+
+        ...
+
+    def prepare(self, dictionary: "Dictionary", game_config: Dict[str, Any]) -> None:
+        """ Optional one off setup before any game, see Agent.prepare. """
+
+
+class MultiAgent(ABC):  # pylint: disable=too-few-public-methods
+    """ Wordle agent that plays one guess across several boards at once """
+
+    @abstractmethod
+    def play(self, game: "MultiGame") -> Union[str, int]:
+        """
+        Args:
+            game: Multi board game with per board state information.
+        Returns:
+            Guess word or word ID, scored against every unsolved board.
+        """
+
+        ...
+
+    def prepare(self, dictionary: "Dictionary", game_config: Dict[str, Any]) -> None:
+        """ Optional one off setup before any game, see Agent.prepare. """
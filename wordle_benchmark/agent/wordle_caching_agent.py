@@ -0,0 +1,172 @@
+"""
+Classes to memoize deterministic Wordle agent decisions.
+"""
+
+import hashlib
+import json
+import logging
+import pathlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set, Tuple
+
+from wordle_benchmark.agent.wordle_agent import Agent
+from wordle_benchmark.cache import atomic_write_bytes, get_cache_dir
+
+if TYPE_CHECKING:
+    from wordle_benchmark.dictionary import Dictionary
+    from wordle_benchmark.game import Game
+
+log = logging.getLogger(__name__)
+
+StateKey = Tuple[str, Tuple[int, bool, Tuple[Tuple[str, int], ...]]]
+
+# version of the persisted decision format, part of each file's key
+_FORMAT_VERSION = 2
+
+
+class CachingAgent(Agent):  # pylint: disable=too-many-instance-attributes
+    """ Wrap a deterministic agent, replaying its guess for already seen states """
+
+    def __init__(
+        self,
+        agent: Agent,
+        maxsize: Optional[int] = 1_000_000,
+        agent_version: Optional[str] = None,
+        cache_dir: Optional[pathlib.Path] = None,
+    ) -> None:
+        """
+        Args:
+            agent: Deterministic Wordle playing agent, its guess may only
+                depend on the game state.
+            maxsize: max number of cached decisions, least recently used are
+                evicted first. None is unbounded.
+            agent_version: identifies the agent's behavior. When given,
+                decisions are loaded from and saved to disk per dictionary.
+                Change it whenever the agent changes.
+            cache_dir: directory of persisted decisions, see get_cache_dir.
+        """
+
+        self._agent = agent
+        self._maxsize = maxsize
+        self._agent_version = agent_version
+        self._cache_dir = cache_dir
+
+        self._decisions: "OrderedDict[StateKey, str]" = OrderedDict()
+        self._loaded: Set[str] = set()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._decisions)
+
+    @property
+    def hits(self) -> int:  # pylint: disable=missing-function-docstring
+        return self._hits
+
+    @property
+    def misses(self) -> int:  # pylint: disable=missing-function-docstring
+        return self._misses
+
+    def play(self, game: "Game") -> str:
+        """
+        Args:
+            game: Game with game state information.
+        Returns:
+            String of guess word.
+        """
+
+        content_hash = game.dictionary.content_hash
+
+        if self._agent_version is not None and content_hash not in self._loaded:
+            self._load(content_hash)
+
+        key = (content_hash, game.state_key)
+        guess = self._decisions.get(key)
+
+        if guess is not None:
+            self._hits += 1
+            self._decisions.move_to_end(key)
+            return guess
+
+        self._misses += 1
+        guess = self._agent.play(game)
+        self._store(key, guess)
+
+        return guess
+
+    def prepare(self, dictionary: "Dictionary", game_config: Dict[str, Any]) -> None:
+        """
+        Prepare the wrapped agent and load persisted decisions, if any.
+
+        Args:
+            dictionary: Wordle dictionary of the games to come.
+            game_config: Game config keyword arguments, e.g. max_guesses.
+        """
+
+        self._agent.prepare(dictionary, game_config)
+
+        content_hash = dictionary.content_hash
+
+        if self._agent_version is not None and content_hash not in self._loaded:
+            self._load(content_hash)
+
+    def save(self) -> None:
+        """ Persist cached decisions, one file per dictionary. """
+
+        if self._agent_version is None:
+            raise ValueError("Persisting decisions needs an agent_version")
+
+        by_dictionary: Dict[str, list] = {}
+
+        for (content_hash, state_key), guess in self._decisions.items():
+            max_guesses, hard_mode, history = state_key
+            by_dictionary.setdefault(content_hash, []).append(
+                [max_guesses, hard_mode, history, guess]
+            )
+
+        for content_hash, entries in by_dictionary.items():
+            atomic_write_bytes(self._path(content_hash), json.dumps(entries).encode())
+
+    def _load(self, content_hash: str) -> None:
+        """
+        Load persisted decisions of one dictionary, if any.
+
+        Args:
+            content_hash: dictionary content hash.
+        """
+
+        self._loaded.add(content_hash)
+        path = self._path(content_hash)
+
+        if not path.exists():
+            return
+
+        entries: Any = json.loads(path.read_text(encoding="utf-8"))
+
+        for max_guesses, hard_mode, history, guess in entries:
+            state_key = (
+                max_guesses,
+                hard_mode,
+                tuple((word, code) for word, code in history),
+            )
+            self._store((content_hash, state_key), guess)
+
+        log.info("Loaded %d cached decisions from %s", len(entries), path)
+
+    def _path(self, content_hash: str) -> pathlib.Path:
+        """ Decision file of this agent version and a dictionary. """
+
+        key = hashlib.sha256(
+            f"{_FORMAT_VERSION}\n{self._agent_version}\n{content_hash}".encode()
+        )
+
+        return get_cache_dir(self._cache_dir) / f"decisions-{key.hexdigest()}.json"
+
+    def _store(self, key: StateKey, guess: str) -> None:
+        """ Insert a decision, evicting the least recently used if full. """
+
+        self._decisions[key] = guess
+        self._decisions.move_to_end(key)
+
+        if self._maxsize is not None and len(self._decisions) > self._maxsize:
+            self._decisions.popitem(last=False)
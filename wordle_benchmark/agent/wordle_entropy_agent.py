@@ -0,0 +1,319 @@
+"""
+Reference Wordle agent maximizing expected information.
+"""
+
+import logging
+import pathlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from wordle_benchmark.agent.wordle_agent import Agent
+from wordle_benchmark.game.wordle_feedback import PATTERN_BASE, FeedbackMatrix
+
+if TYPE_CHECKING:
+    from wordle_benchmark.dictionary import Dictionary
+    from wordle_benchmark.game import Game
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class _DictionaryCache:
+    """ What the agent computed for one dictionary, built on first use """
+
+    feedback: Optional[FeedbackMatrix] = None
+    pool_ids: Optional[np.ndarray] = None
+    letter_sets: Optional[np.ndarray] = None
+    opener: Optional[str] = None
+
+
+class EntropyAgent(Agent):
+    """ Guess the word whose feedback splits the remaining candidates the most """
+
+    def __init__(
+        self,
+        guess_pool: Optional[Sequence[str]] = None,
+        candidates_only: bool = False,
+        shortlist_size: Optional[int] = 256,
+        cache_dir: Optional[pathlib.Path] = None,
+        chunk_elements: int = 1 << 22,
+    ) -> None:
+        """
+        Args:
+            guess_pool: optional words the agent may guess, the whole
+                dictionary by default. Words outside the dictionary are ignored.
+            candidates_only: only guess words that are still possible.
+                Overrides guess_pool after the opener. Always applies in
+                hard mode games, where candidates are the legal guesses.
+            shortlist_size: after the opener, only the guesses ranked highest
+                by letter frequency split are scored exactly. None scores the
+                whole pool.
+            cache_dir: directory of the feedback table built when the game has
+                none, see get_cache_dir.
+            chunk_elements: max guess x candidate codes histogrammed at a time.
+        """
+
+        self._guess_pool = None if guess_pool is None else list(guess_pool)
+        self._candidates_only = candidates_only
+        self._shortlist_size = shortlist_size
+        self._cache_dir = cache_dir
+        self._chunk_elements = chunk_elements
+
+        # per dictionary content hash
+        self._caches: Dict[str, _DictionaryCache] = {}
+
+    def play(self, game: "Game") -> str:
+        """
+        Args:
+            game: Game with game state information.
+        Returns:
+            String of guess word.
+        """
+
+        dictionary = game.dictionary
+
+        if game.n_guesses == 0:
+            return self.opener(dictionary, game.feedback)
+
+        candidate_ids = np.flatnonzero(game.candidates)
+
+        if len(candidate_ids) == 0:
+            # target outside the dictionary, nothing left to learn from
+            return dictionary.word(int(self._get_pool_ids(dictionary)[0]))
+
+        # with two or fewer left, guessing a candidate is never worse
+        if len(candidate_ids) <= 2:
+            return dictionary.word(int(candidate_ids[0]))
+
+        # every candidate keeps the revealed letters, so is legal in hard mode
+        pool_ids = (
+            candidate_ids
+            if self._candidates_only or game.hard_mode
+            else self._get_pool_ids(dictionary)
+        )
+
+        shortlist_size = self._shortlist_size
+
+        if shortlist_size is not None and len(pool_ids) > shortlist_size:
+            pool_ids = self._shortlist(
+                dictionary, pool_ids, candidate_ids, shortlist_size
+            )
+
+        return dictionary.word(
+            self._best_guess(
+                dictionary, game.feedback, pool_ids, candidate_ids, game.candidates
+            )
+        )
+
+    def prepare(self, dictionary: "Dictionary", game_config: Dict[str, Any]) -> None:
+        """
+        Build the feedback table, letter sets and opener ahead of the first game.
+
+        Args:
+            dictionary: Wordle dictionary of the games to come.
+            game_config: Game config keyword arguments, e.g. feedback.
+        """
+
+        self._get_letter_sets(dictionary)
+        self.opener(dictionary, game_config.get("feedback"))
+
+    def opener(
+        self, dictionary: "Dictionary", feedback: Optional[FeedbackMatrix] = None
+    ) -> str:
+        """
+        Best first guess, computed once per dictionary.
+
+        Args:
+            dictionary: Wordle dictionary.
+            feedback: optional precomputed feedback table for the dictionary.
+        Returns:
+            String of guess word.
+        """
+
+        cache = self._get_cache(dictionary)
+
+        if cache.opener is None:
+            cache.opener = dictionary.word(
+                self._best_guess(
+                    dictionary,
+                    feedback,
+                    self._get_pool_ids(dictionary),
+                    dictionary.word_ids,
+                    np.ones(len(dictionary), dtype=bool),
+                )
+            )
+            log.info("Opener for dictionary is %s", cache.opener)
+
+        return cache.opener
+
+    def _best_guess(  # pylint: disable=too-many-arguments
+        self,
+        dictionary: "Dictionary",
+        feedback: Optional[FeedbackMatrix],
+        pool_ids: np.ndarray,
+        candidate_ids: np.ndarray,
+        candidates: np.ndarray,
+    ) -> int:
+        """
+        Guess with the highest expected information, candidates first on ties.
+
+        Args:
+            dictionary: Wordle dictionary.
+            feedback: optional precomputed feedback table for the dictionary.
+            pool_ids: word IDs that may be guessed.
+            candidate_ids: word IDs still possible.
+            candidates: dictionary mask of the words still possible.
+        Returns:
+            Word ID of the guess.
+        """
+
+        bucket_costs = self._bucket_costs(
+            self._get_feedback(dictionary, feedback).table,
+            pool_ids,
+            candidate_ids,
+            PATTERN_BASE ** dictionary.word_len,
+        )
+
+        best = bucket_costs <= bucket_costs.min() + 1e-9
+        preferred = best & candidates[pool_ids]
+
+        return int(pool_ids[np.argmax(preferred if preferred.any() else best)])
+
+    def _bucket_costs(
+        self,
+        table: np.ndarray,
+        pool_ids: np.ndarray,
+        candidate_ids: np.ndarray,
+        n_codes: int,
+    ) -> np.ndarray:
+        """
+        Sum of k log k over the feedback buckets of each guess, lowest for the
+        most information. Feedback histograms of a chunk of guesses are
+        counted with a single bincount, offsetting each guess's codes by its row.
+
+        Args:
+            table: guess x target feedback codes of the dictionary.
+            pool_ids: word IDs that may be guessed.
+            candidate_ids: word IDs still possible.
+            n_codes: number of feedback codes.
+        Returns:
+            Cost of each guess of the pool.
+        """
+
+        n_candidates = len(candidate_ids)
+        chunk_size = max(1, self._chunk_elements // n_candidates)
+
+        # minimizing sum(k log k) over feedback buckets maximizes entropy
+        bucket_sizes = np.arange(n_candidates + 1)
+        size_costs = bucket_sizes * np.log2(np.maximum(bucket_sizes, 1))
+        bucket_costs = np.empty(len(pool_ids))
+
+        for start in range(0, len(pool_ids), chunk_size):
+
+            chunk_ids = pool_ids[start : start + chunk_size]
+            codes = table[np.ix_(chunk_ids, candidate_ids)].astype(np.intp)
+            codes += np.arange(len(chunk_ids))[:, None] * n_codes
+
+            counts = np.bincount(codes.ravel(), minlength=len(chunk_ids) * n_codes)
+            bucket_costs[start : start + chunk_size] = np.sum(
+                size_costs[counts.reshape(len(chunk_ids), n_codes)], axis=1
+            )
+
+        return bucket_costs
+
+    def _shortlist(
+        self,
+        dictionary: "Dictionary",
+        pool_ids: np.ndarray,
+        candidate_ids: np.ndarray,
+        size: int,
+    ) -> np.ndarray:
+        """
+        Guesses most likely to split the candidates, by how evenly each of
+        their letters divides the candidates by presence and by position.
+
+        Args:
+            dictionary: Wordle dictionary.
+            pool_ids: word IDs that may be guessed.
+            candidate_ids: word IDs still possible.
+            size: number of guesses kept, less than the pool size.
+        Returns:
+            size word IDs of the pool.
+        """
+
+        encoded = dictionary.encoded
+        letter_sets = self._get_letter_sets(dictionary)
+        n_letters = letter_sets.shape[1]
+
+        presence = letter_sets[candidate_ids].mean(axis=0)
+        scores = letter_sets[pool_ids] @ (presence * (1 - presence))
+
+        for pos in range(dictionary.word_len):
+            at_position = np.bincount(
+                encoded[candidate_ids, pos], minlength=n_letters
+            ) / len(candidate_ids)
+            scores += (at_position * (1 - at_position))[encoded[pool_ids, pos]]
+
+        shortlist = np.argpartition(-scores, size)
+        return pool_ids[np.sort(shortlist[:size])]
+
+    def _get_letter_sets(self, dictionary: "Dictionary") -> np.ndarray:
+        """ (n_words, n_letters) mask of the letters in each word. """
+
+        cache = self._get_cache(dictionary)
+
+        if cache.letter_sets is None:
+            encoded = dictionary.encoded
+            letter_sets = np.zeros((len(encoded), len(dictionary.alphabet)), dtype=bool)
+            letter_sets[np.arange(len(encoded))[:, None], encoded] = True
+            cache.letter_sets = letter_sets
+
+        return cache.letter_sets
+
+    def _get_feedback(
+        self, dictionary: "Dictionary", feedback: Optional[FeedbackMatrix]
+    ) -> FeedbackMatrix:
+        """ The game's feedback table, or one built and cached for the dictionary. """
+
+        if feedback is not None:
+            return feedback
+
+        cache = self._get_cache(dictionary)
+
+        if cache.feedback is None:
+            cache.feedback = FeedbackMatrix(dictionary, self._cache_dir)
+
+        return cache.feedback
+
+    def _get_pool_ids(self, dictionary: "Dictionary") -> np.ndarray:
+        """ Word IDs of the guess pool within a dictionary. """
+
+        cache = self._get_cache(dictionary)
+
+        if cache.pool_ids is None:
+
+            if self._guess_pool is None:
+                pool_ids = dictionary.word_ids
+            else:
+                pool_ids = np.array(
+                    [
+                        dictionary.word_id(word)
+                        for word in self._guess_pool
+                        if word in dictionary
+                    ],
+                    dtype=np.intp,
+                )
+
+            if len(pool_ids) == 0:
+                raise ValueError("Guess pool has no words in the dictionary")
+
+            cache.pool_ids = pool_ids
+
+        return cache.pool_ids
+
+    def _get_cache(self, dictionary: "Dictionary") -> _DictionaryCache:
+        """ What the agent computed for a dictionary, by content hash. """
+
+        return self._caches.setdefault(dictionary.content_hash, _DictionaryCache())
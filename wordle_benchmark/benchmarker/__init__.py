@@ -1,2 +1,8 @@
 # pylint: disable=missing-module-docstring
-from .wordle_benchmarker import Benchmark, BenchmarkResults
+from .wordle_async_benchmarker import AsyncBenchmark
+from .wordle_benchmarker import Benchmark, prepare_agent
+from .wordle_play import play_games
+from .wordle_decision_tree import DecisionNode, DecisionTree
+from .wordle_distributed import Coordinator, run_worker
+from .wordle_isolation import IsolatedAgent, PrepareTimeout, TimeBudget, TurnTimeout
+from .wordle_records import BenchmarkResults, GameRecord, JsonlSink, ResultsAggregator
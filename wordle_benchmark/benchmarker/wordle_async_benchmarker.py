@@ -0,0 +1,141 @@
+"""
+Classes to measure I/O bound Wordle agents with many games in flight.
+"""
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, List, Optional
+
+from wordle_benchmark.benchmarker.wordle_records import (
+    BenchmarkResults,
+    GameRecord,
+    JsonlSink,
+    ResultsAggregator,
+)
+from wordle_benchmark.game import Game
+from wordle_benchmark.game.wordle_game import IllegalGuessError
+
+if TYPE_CHECKING:
+    from wordle_benchmark.agent import AsyncAgent
+
+log = logging.getLogger(__name__)
+
+
+class AsyncBenchmark:  # pylint: disable=too-few-public-methods
+    """ Performance measuring logic for async agents """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        agent: "AsyncAgent",
+        target_words: List[str],
+        concurrency: int = 100,
+        queue_size: Optional[int] = None,
+        sink: Optional[JsonlSink] = None,
+        **game_kwargs,
+    ):
+        """
+        Args:
+            agent: Async Wordle playing agent.
+            target_words: List of target words.
+            concurrency: max number of games in flight.
+            queue_size: max number of games waiting for a free slot,
+                2 * concurrency by default.
+            sink: optional writer receiving each game record as it finishes,
+                in finishing order.
+            game_kwargs: Optional game config keyword arguments, e.g.
+                observers=[LoggingObserver()] to follow every game.
+        """
+
+        self._agent = agent
+        self._target_words = target_words
+        self._concurrency = concurrency
+        self._queue_size = queue_size or 2 * concurrency
+        self._sink = sink
+        self._game_kwargs = game_kwargs
+
+    def run_games(self) -> BenchmarkResults:
+        """ Run games against agent on a new event loop and record results """
+
+        return asyncio.run(self.run_games_async())
+
+    async def run_games_async(self) -> BenchmarkResults:
+        """ Run games against agent on the running event loop and record results """
+
+        queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=self._queue_size)
+        aggregator = ResultsAggregator()
+
+        tasks = [asyncio.ensure_future(self._produce(queue))] + [
+            asyncio.ensure_future(self._consume(queue, aggregator))
+            for _ in range(self._concurrency)
+        ]
+
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return aggregator.results(self._game_kwargs.get("instrumentation"))
+
+    async def _produce(self, queue: "asyncio.Queue[Optional[str]]"):
+        """
+        Feed target words, waiting whenever the queue is full.
+
+        Args:
+            queue: pending target words, one None per consumer marks the end.
+        """
+
+        for target_word in self._target_words:
+            await queue.put(target_word)
+
+        for _ in range(self._concurrency):
+            await queue.put(None)
+
+    async def _consume(
+        self, queue: "asyncio.Queue[Optional[str]]", aggregator: ResultsAggregator,
+    ):
+        """
+        Play queued games one at a time until the end marker. A game is
+        forfeited after MAX_ILLEGAL_GUESSES illegal guesses in a row, as with
+        Benchmark.
+
+        Args:
+            queue: pending games.
+            aggregator: reduction of the finished games.
+        """
+
+        while True:
+
+            target_word = await queue.get()
+
+            if target_word is None:
+                return
+
+            game = Game(target_word, **self._game_kwargs)
+            turn_times: List[float] = []
+            forfeit = False
+
+            try:
+                await game.play_async(self._agent, turn_times)
+            except IllegalGuessError as exception:
+                log.warning(exception)
+                forfeit = True
+
+            history = game.history
+
+            record = GameRecord(
+                target_word=target_word,
+                # a forfeit scores as a loss
+                n_turns=game.max_guesses + 1 if forfeit else game.n_guesses,
+                success=game.success,
+                turn_times=turn_times,
+                guesses=[guess for guess, _ in history],
+                feedback_codes=[code for _, code in history],
+                forfeit=forfeit,
+            )
+
+            if self._sink is not None:
+                self._sink.write(record)
+
+            aggregator.add(record)
@@ -2,86 +2,641 @@
 Classes to measure Wordle agent performance.
 """
 
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass
+import functools
+import inspect
+import itertools
 import logging
 import time
-from typing import TYPE_CHECKING, List
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-import numpy as np
+from wordle_benchmark.agent import Agent, BatchAgent, MultiAgent
+from wordle_benchmark.benchmarker.wordle_decision_tree import DecisionTree
+from wordle_benchmark.benchmarker.wordle_isolation import IsolatedAgent, TimeBudget
+from wordle_benchmark.benchmarker.wordle_play import (
+    game_seed,
+    play_batch,
+    play_game,
+    play_games,
+    play_multi,
+    seed_generators,
+)
+from wordle_benchmark.benchmarker.wordle_records import (
+    BenchmarkResults,
+    GameRecord,
+    JsonlSink,
+    ResultsAggregator,
+)
+from wordle_benchmark.game import BatchGame, MultiGame
+from wordle_benchmark.game.wordle_game import get_default_dictionary
+from wordle_benchmark.instrumentation import Instrumentation, MemoryInstrumentation
 
-from wordle_benchmark.game import Game
+log = logging.getLogger(__name__)
 
-if TYPE_CHECKING:
-    from wordle_benchmark.agent import Agent
 
-log = logging.getLogger(__name__)
+# agent and game config of a pool worker process, set by _init_worker
+_WORKER_STATE: Dict[str, Any] = {}
+
+# game keyword arguments that are not part of the config agents prepare for
+_RUNTIME_KWARGS = ("dictionary", "instrumentation", "observers")
+
+# games per lockstep batch, bounds the (batch_size, n_words) candidate masks
+DEFAULT_BATCH_SIZE = 1024
+
+
+def _check_game_kwargs(game_class: type, game_kwargs: Dict[str, Any]) -> None:
+    """
+    Refuse game keyword arguments a vectorized game does not support, e.g.
+    hard_mode or observers for BatchGame.
+
+    Args:
+        game_class: BatchGame or MultiGame.
+        game_kwargs: Game config keyword arguments.
+    Raises:
+        ValueError naming the unsupported arguments.
+    """
+
+    unsupported = sorted(
+        set(game_kwargs) - set(inspect.signature(game_class).parameters)
+    )
+
+    if unsupported:
+        raise ValueError(
+            f"{game_class.__name__} does not support {', '.join(unsupported)}"
+        )
+
+
+def prepare_agent(
+    agent: Union["Agent", "BatchAgent", "MultiAgent"], game_kwargs: Dict[str, Any]
+) -> float:
+    """
+    Let an agent set itself up for the games to come, see Agent.prepare.
+
+    Args:
+        agent: Wordle playing agent.
+        game_kwargs: Game config keyword arguments.
+    Returns:
+        Seconds the agent took.
+    """
+
+    dictionary = game_kwargs.get("dictionary") or get_default_dictionary()
+    game_config = {
+        key: value for key, value in game_kwargs.items() if key not in _RUNTIME_KWARGS
+    }
+
+    start = time.perf_counter()
+    agent.prepare(dictionary, game_config)
+
+    return time.perf_counter() - start
+
+
+def _init_worker(
+    agent_factory: Callable[[], "Agent"],
+    game_kwargs: Dict[str, Any],
+    budget: Optional[TimeBudget] = None,
+) -> None:
+    """
+    Build the agent of a pool worker process.
+
+    Args:
+        agent_factory: Picklable callable returning a Wordle playing agent.
+        game_kwargs: Game config keyword arguments.
+        budget: optional turn and game time limits.
+    """
+
+    agent = agent_factory()
+
+    _WORKER_STATE["agent"] = agent
+    _WORKER_STATE["game_kwargs"] = game_kwargs
+    _WORKER_STATE["budget"] = budget
+    _WORKER_STATE["setup_time"] = prepare_agent(agent, game_kwargs)
+
+
+def _play_shard(
+    indexed_targets: List[Tuple[int, str]], seed: Optional[int]
+) -> Tuple[List[GameRecord], Optional[Instrumentation], Optional[float]]:
+    """
+    Play a shard of games in a pool worker process. The worker's first game
+    is marked as a cold start.
+
+    Args:
+        indexed_targets: Target words with their position in the benchmark.
+        seed: optional benchmark seed.
+    Returns:
+        Game outcomes in shard order, the shard's latencies if instrumented
+        and, with the worker's first shard, the agent's setup time.
+    """
+
+    game_kwargs = _WORKER_STATE["game_kwargs"]
+    instrumentation = None
+
+    if game_kwargs.get("instrumentation") is not None:
+        instrumentation = Instrumentation()
+        game_kwargs = dict(game_kwargs, instrumentation=instrumentation)
+
+    records = play_games(
+        _WORKER_STATE["agent"],
+        indexed_targets,
+        game_kwargs,
+        seed,
+        _WORKER_STATE["budget"],
+    )
+    setup_time = _WORKER_STATE.pop("setup_time", None)
+
+    if setup_time is not None and records:
+        records[0].cold_start = True
+
+    return records, instrumentation, setup_time
+
+
+def _return_agent(agent: "Agent") -> "Agent":
+    """ Default agent factory, the agent is pickled to each worker. """
+
+    return agent
 
 
 @dataclass
-class BenchmarkResults:
-    """ Quantitative summarization of game outcomes """
+class _RunConfig:  # pylint: disable=too-many-instance-attributes
+    """ Games a Benchmark plays and how they are run and recorded """
 
-    average_n_turns: float
-    average_turn_time: float
-    percent_successes: float
-    std_turn_time: float
+    target_words: List[str]
+    game_kwargs: Dict[str, Any]
+    n_workers: int = 1
+    seed: Optional[int] = None
+    shard_size: Optional[int] = None
+    budget: Optional[TimeBudget] = None
+    instrumentation: Optional[Instrumentation] = None
+    sink: Optional[JsonlSink] = None
+    memory: Optional[MemoryInstrumentation] = None
 
 
 class Benchmark:  # pylint: disable=too-few-public-methods
     """ Performance measuring logic """
 
-    def __init__(self, agent: "Agent", target_words: List[str], **game_kwargs):
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        agent: Union["Agent", "BatchAgent", "MultiAgent"],
+        target_words: List[str],
+        n_workers: int = 1,
+        agent_factory: Optional[Callable[[], "Agent"]] = None,
+        seed: Optional[int] = None,
+        shard_size: Optional[int] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        sink: Optional[JsonlSink] = None,
+        turn_timeout: Optional[float] = None,
+        game_timeout: Optional[float] = None,
+        isolate: bool = False,
+        prepare_timeout: Optional[float] = None,
+        memory: Optional[MemoryInstrumentation] = None,
+        **game_kwargs,
+    ):
         """
         Args:
-            agent: Wordle playing agent.
+            agent: Wordle playing agent, batch agent for run_batch_games or
+                multi board agent for run_multi_games.
             target_words: List of target words.
-            game_kwargs: Optional game config keyword arguments.
+            n_workers: number of worker processes, 1 plays games in process.
+            agent_factory: optional picklable callable building the agent in
+                each worker. By default the agent itself is pickled.
+            seed: optional seed applied before each game, derived from the
+                game's position so results do not depend on n_workers.
+            shard_size: number of games handed to a worker at a time.
+            instrumentation: optional per phase latency recorder. Profiler
+                and sampler hooks only run in process, n_workers=1.
+            sink: optional writer receiving each game record as it finishes.
+            turn_timeout: optional seconds an agent may spend on one turn.
+            game_timeout: optional seconds an agent may spend on one game.
+                A game running over either budget is forfeited and scored as
+                a loss, see BenchmarkResults.n_forfeits. Applies to run_games,
+                iter_games and run_adversarial_games.
+            isolate: whether to run the agent in a subprocess, preempted as
+                soon as a budget runs out. In process agents are only checked
+                once they answer.
+            prepare_timeout: optional seconds an isolated agent may take to
+                start and prepare, raising PrepareTimeout when it runs over.
+                A subprocess preempted by a turn timeout is replaced before
+                the next game, outside the game's budget.
+            memory: optional memory recorder tracing allocations during
+                run_games, iter_games and run_adversarial_games, in process
+                only. Turn times are inflated while tracing.
+            game_kwargs: Optional game config keyword arguments, e.g.
+                observers=[LoggingObserver()] to follow every game.
         """
 
+        if memory is not None and n_workers != 1:
+            raise ValueError("Memory instrumentation only runs in process")
+
+        # agents that can only play vectorized games are checked up front
+        if not isinstance(agent, Agent):
+            if isinstance(agent, BatchAgent):
+                _check_game_kwargs(BatchGame, game_kwargs)
+            if isinstance(agent, MultiAgent):
+                _check_game_kwargs(MultiGame, game_kwargs)
+
         self._agent = agent
-        self._target_words = target_words
-        self._game_kwargs = game_kwargs
+        self._agent_factory = agent_factory
+        self._config = _RunConfig(
+            target_words=target_words,
+            game_kwargs=game_kwargs,
+            n_workers=n_workers,
+            seed=seed,
+            shard_size=shard_size,
+            budget=(
+                None
+                if turn_timeout is None and game_timeout is None
+                else TimeBudget(turn_timeout, game_timeout)
+            ),
+            instrumentation=instrumentation,
+            sink=sink,
+            memory=memory,
+        )
+
+        if isolate:
+
+            if not isinstance(agent, Agent):
+                raise TypeError("Isolated games need an agent implementing Agent")
+
+            agent_factory = agent_factory or functools.partial(_return_agent, agent)
+            self._agent = IsolatedAgent(agent_factory, prepare_timeout)
+            self._agent_factory = functools.partial(
+                IsolatedAgent, agent_factory, prepare_timeout
+            )
+
+        # setup time of the in process agent, or of the latest parallel run
+        self._setup_time: Optional[float] = None
+        self._prepared = False
+        self._warm = False
 
     def run_games(self) -> BenchmarkResults:
         """ Run games against agent and record results """
 
-        successes: List[bool] = []
-        n_turns: List[int] = []
-        turn_times: List[float] = []
+        config = self._config
+
+        return (
+            ResultsAggregator()
+            .add_all(self.iter_games())
+            .results(config.instrumentation, self._setup_time, config.memory)
+        )
+
+    def iter_games(self) -> Iterator[GameRecord]:
+        """
+        Run games against agent, yielding each record in target word order as
+        soon as it is available. Records are also written to the sink, if any.
+
+        Returns:
+            Iterator of game records.
+        """
+
+        agent = self._single_agent()
+        config = self._config
+        indexed_targets = enumerate(config.target_words)
+        game_kwargs = self._instrumented_game_kwargs()
+
+        if config.n_workers == 1:
+            records: Iterable[GameRecord] = self._iter_games_serial(
+                agent, indexed_targets, game_kwargs
+            )
+        else:
+            records = self._iter_games_parallel(agent, indexed_targets, game_kwargs)
+
+        yield from self._write_records(records)
+
+    def run_batch_games(self, batch_size: Optional[int] = None) -> BenchmarkResults:
+        """
+        Run games in lockstep batches against a batch agent and record results.
+
+        Args:
+            batch_size: games per batch, DEFAULT_BATCH_SIZE by default. Each
+                batch holds a (batch_size, n_words) candidate mask.
+        """
+
+        if not isinstance(self._agent, BatchAgent):
+            raise TypeError("Batch games need an agent implementing BatchAgent")
+
+        config = self._config
+        _check_game_kwargs(BatchGame, config.game_kwargs)
+        self._prepare()
+
+        batch_size = batch_size or DEFAULT_BATCH_SIZE
+        agent = self._agent
+        records = itertools.chain.from_iterable(
+            play_batch(
+                agent,
+                config.target_words[start : start + batch_size],
+                config.game_kwargs,
+                None if config.seed is None else game_seed(config.seed, start),
+            )
+            for start in range(0, len(config.target_words), batch_size)
+        )
+
+        return Benchmark._summarize(
+            self._write_records(records), setup_time=self._setup_time
+        )
+
+    def build_decision_tree(self) -> DecisionTree:
+        """
+        Explore every decision of a deterministic agent over the target words,
+        calling it once per distinct game state.
+
+        Returns:
+            Decision tree, reusable with run_decision_tree until the agent changes.
+        """
+
+        agent = self._single_agent()
+        self._prepare()
+
+        return DecisionTree.build(
+            agent, self._config.target_words, **self._config.game_kwargs
+        )
+
+    def run_decision_tree(
+        self, tree: Optional[DecisionTree] = None
+    ) -> BenchmarkResults:
+        """
+        Score every target word along a deterministic agent's decision tree.
+        Turn times are the agent's decision times, each measured once.
+
+        Args:
+            tree: optional tree from an earlier run, replayed without calling
+                the agent. Built with build_decision_tree by default.
+        Returns:
+            Benchmark results.
+        """
+
+        if tree is None:
+            tree = self.build_decision_tree()
+
+        config = self._config
+        game_kwargs = config.game_kwargs
+
+        if game_kwargs.get("max_guesses", tree.max_guesses) != tree.max_guesses:
+            raise ValueError("Decision tree was built for a different max guesses")
+
+        if game_kwargs.get("hard_mode", False) != tree.hard_mode:
+            raise ValueError("Decision tree was built for a different hard mode")
+
+        records = tree.records(
+            config.target_words,
+            game_kwargs.get("dictionary") or get_default_dictionary(),
+            game_kwargs.get("feedback"),
+        )
+
+        return Benchmark._summarize(
+            self._write_records(records), setup_time=self._setup_time
+        )
+
+    def run_adversarial_games(self, n_games: int = 1) -> BenchmarkResults:
+        """
+        Run adversarial games, whose feedback always keeps the largest set of
+        candidates alive, and record results. A deterministic agent plays the
+        same game every time, so max_n_turns is its worst case over the
+        dictionary. The target words are not used.
+
+        Args:
+            n_games: number of games, more than one only helps random agents.
+        """
+
+        config = self._config
+        records = self._iter_games_serial(
+            self._single_agent(),
+            ((game_ind, None) for game_ind in range(n_games)),
+            self._instrumented_game_kwargs(),
+        )
+
+        return (
+            ResultsAggregator()
+            .add_all(self._write_records(records))
+            .results(config.instrumentation, self._setup_time, config.memory)
+        )
+
+    def run_multi_games(self, n_boards: int = 4) -> BenchmarkResults:
+        """
+        Run multi board games against a multi board agent and record results,
+        one record per board. Consecutive target words share a game, the last
+        game may have fewer boards.
+
+        Args:
+            n_boards: boards per game, e.g. 4 for Quordle or 8 for Octordle.
+        """
+
+        if not isinstance(self._agent, MultiAgent):
+            raise TypeError("Multi board games need an agent implementing MultiAgent")
+
+        config = self._config
+        _check_game_kwargs(MultiGame, config.game_kwargs)
+        self._prepare()
+
+        agent = self._agent
+        records = itertools.chain.from_iterable(
+            play_multi(
+                agent,
+                config.target_words[start : start + n_boards],
+                config.game_kwargs,
+                None if config.seed is None else game_seed(config.seed, start),
+            )
+            for start in range(0, len(config.target_words), n_boards)
+        )
+
+        return Benchmark._summarize(
+            self._write_records(records), setup_time=self._setup_time
+        )
 
-        for target_word in self._target_words:
+    def _instrumented_game_kwargs(self) -> Dict[str, Any]:
+        """ Game config keyword arguments, with the instrumentation if any. """
 
-            log.info('Playing game with target word "%s"', target_word)
+        game_kwargs = self._config.game_kwargs
 
-            game = Game(target_word, **self._game_kwargs)
+        if self._config.instrumentation is not None:
+            game_kwargs = dict(
+                game_kwargs, instrumentation=self._config.instrumentation
+            )
 
-            session = game.start_game()
-            next(session)
+        return game_kwargs
 
-            while True:
+    def _iter_games_serial(
+        self,
+        agent: Agent,
+        indexed_targets: Iterable[Tuple[int, Optional[str]]],
+        game_kwargs: Dict[str, Any],
+    ) -> Iterator[GameRecord]:
+        """
+        Play games in process, one after another, tracing memory if enabled.
 
-                try:
+        Args:
+            agent: the benchmark's agent, see _single_agent.
+            indexed_targets: Target words with their position in the benchmark,
+                None for adversarial games.
+            game_kwargs: Game config keyword arguments.
+        Returns:
+            Iterator of game records in target word order.
+        """
 
-                    start = time.time()
-                    session.send(self._agent.play(game))
-                    end = time.time()
+        config = self._config
 
-                    turn_times.append(end - start)
+        if config.memory is not None:
+            config.memory.start()
 
-                except StopIteration:
-                    break
+        try:
+            self._prepare()
 
-            n_turns.append(game.n_guesses)
-            successes.append(game.success)
+            for game_ind, target_word in indexed_targets:
+                seed_generators(
+                    None if config.seed is None else game_seed(config.seed, game_ind)
+                )
+                yield self._mark_cold_start(
+                    play_game(
+                        agent, target_word, game_kwargs, config.budget, config.memory
+                    )
+                )
+        finally:
+            if config.memory is not None:
+                config.memory.stop()
 
-        average_n_turns = np.mean(n_turns)
-        average_turn_time = np.mean(turn_times)
-        percent_successes = np.sum(successes) / len(successes)
-        std_turn_time = np.std(turn_times)
+    def _iter_games_parallel(
+        self,
+        agent: Agent,
+        indexed_targets: Iterable[Tuple[int, str]],
+        game_kwargs: Dict[str, Any],
+    ) -> Iterator[GameRecord]:
+        """
+        Shard games across worker processes, keeping a bounded number of
+        shards in flight.
 
-        return BenchmarkResults(
-            average_n_turns=average_n_turns,
-            average_turn_time=average_turn_time,
-            percent_successes=percent_successes,
-            std_turn_time=std_turn_time,
+        Args:
+            agent: the benchmark's agent, pickled to each worker unless an
+                agent factory was given.
+            indexed_targets: Target words with their position in the benchmark.
+            game_kwargs: Game config keyword arguments.
+        Returns:
+            Iterator of game records in target word order.
+        """
+
+        config = self._config
+        shard_size = config.shard_size or max(
+            1, len(config.target_words) // (4 * config.n_workers)
         )
+        self._setup_time = None
+        shards = iter(lambda: list(itertools.islice(indexed_targets, shard_size)), [])
+
+        with ProcessPoolExecutor(
+            max_workers=config.n_workers,
+            initializer=_init_worker,
+            initargs=(
+                self._agent_factory or functools.partial(_return_agent, agent),
+                game_kwargs,
+                config.budget,
+            ),
+        ) as executor:
+
+            pending: Deque[Future] = deque()
+
+            for shard in itertools.chain(shards, [None]):
+
+                if shard is not None:
+                    pending.append(executor.submit(_play_shard, shard, config.seed))
+
+                # wait on the oldest shard so records come out in order
+                while pending and (
+                    shard is None or len(pending) > 2 * config.n_workers
+                ):
+
+                    (
+                        shard_records,
+                        shard_instrumentation,
+                        setup_time,
+                    ) = pending.popleft().result()
+
+                    if (
+                        shard_instrumentation is not None
+                        and config.instrumentation is not None
+                    ):
+                        config.instrumentation.merge(shard_instrumentation)
+
+                    # the slowest worker's setup delays the whole run
+                    if setup_time is not None:
+                        self._setup_time = max(self._setup_time or 0.0, setup_time)
+
+                    yield from shard_records
+
+    def _prepare(self) -> None:
+        """ Prepare the in process agent once, timing its setup. """
+
+        if not self._prepared:
+            self._setup_time = prepare_agent(self._agent, self._config.game_kwargs)
+            self._prepared = True
+
+    def _single_agent(self) -> Agent:
+        """
+        Returns:
+            The agent, for run modes playing one game at a time.
+        Raises:
+            TypeError if the agent only plays batch or multi board games.
+        """
+
+        if not isinstance(self._agent, Agent):
+            raise TypeError("Single games need an agent implementing Agent")
+
+        return self._agent
+
+    def _write_records(self, records: Iterable[GameRecord]) -> Iterator[GameRecord]:
+        """
+        Args:
+            records: game outcomes, written to the sink, if any, as each finishes.
+        Returns:
+            Iterator of the same records.
+        """
+
+        sink = self._config.sink
+
+        for record in records:
+
+            if sink is not None:
+                sink.write(record)
+
+            yield record
+
+    def _mark_cold_start(self, record: GameRecord) -> GameRecord:
+        """
+        Args:
+            record: outcome of a game played by the in process agent.
+        Returns:
+            The record, marked as a cold start if it is the agent's first game.
+        """
+
+        if not self._warm:
+            record.cold_start = True
+            self._warm = True
+
+        return record
+
+    @staticmethod
+    def _summarize(
+        records: Iterable[GameRecord],
+        instrumentation: Optional[Instrumentation] = None,
+        setup_time: Optional[float] = None,
+    ) -> BenchmarkResults:
+        """
+        Reduce game outcomes to summary statistics.
+
+        Args:
+            records: Game outcomes in target word order.
+            instrumentation: optional per phase latency recorder.
+            setup_time: optional seconds the agent took to prepare.
+        Returns:
+            Benchmark results.
+        """
+
+        return ResultsAggregator().add_all(records).results(instrumentation, setup_time)
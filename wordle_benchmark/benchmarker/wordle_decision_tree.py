@@ -0,0 +1,406 @@
+"""
+Classes to compile a deterministic agent into a decision tree over feedback.
+
+Every game of a deterministic agent follows a path from the root: the agent's
+guess at a node only depends on the guesses and feedback that led there, and
+the feedback of that guess picks the child. Exploring the tree once scores
+every target word while calling the agent once per distinct game state.
+"""
+
+import json
+import logging
+import pathlib
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    DefaultDict,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from wordle_benchmark.benchmarker.wordle_records import GameRecord
+from wordle_benchmark.game import Game, GuessWord
+from wordle_benchmark.game.wordle_feedback import all_green_code, pattern_code
+from wordle_benchmark.game.wordle_game import IllegalGuessError
+
+if TYPE_CHECKING:
+    from wordle_benchmark.agent import Agent
+    from wordle_benchmark.dictionary import Dictionary
+    from wordle_benchmark.game import FeedbackMatrix
+
+log = logging.getLogger(__name__)
+
+TREE_FORMAT_VERSION = 2
+
+
+def _score(
+    guess: str,
+    target_words: List[str],
+    dictionary: "Dictionary",
+    feedback: Optional["FeedbackMatrix"] = None,
+) -> List[int]:
+    """
+    Feedback codes of one guess against many targets, by table lookup when
+    the feedback table covers every target.
+
+    Args:
+        guess: Guess word in the dictionary.
+        target_words: Target words.
+        dictionary: Wordle dictionary.
+        feedback: optional precomputed feedback table for the dictionary.
+    Returns:
+        Pattern code per target word.
+    """
+
+    if feedback is not None and all(target in feedback for target in target_words):
+        row = feedback.row(guess)
+        return row[[dictionary.word_id(target) for target in target_words]].tolist()
+
+    return [pattern_code(guess, target) for target in target_words]
+
+
+@dataclass
+class DecisionNode:
+    """ Agent guess at one game state, with a child per continuing feedback code """
+
+    guess: str
+    seconds: float
+    children: Dict[int, "DecisionNode"] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ JSON compatible form, feedback codes become string keys. """
+
+        return {
+            "guess": self.guess,
+            "seconds": self.seconds,
+            "children": {
+                str(code): child.to_dict() for code, child in self.children.items()
+            },
+        }
+
+    @staticmethod
+    def from_dict(node_dict: Dict[str, Any]) -> "DecisionNode":
+        """
+        Args:
+            node_dict: JSON compatible form written by to_dict.
+        Returns:
+            Decision node.
+        """
+
+        return DecisionNode(
+            guess=node_dict["guess"],
+            seconds=node_dict["seconds"],
+            children={
+                int(code): DecisionNode.from_dict(child)
+                for code, child in node_dict["children"].items()
+            },
+        )
+
+
+class DecisionTree:
+    """ Every decision of a deterministic agent over a set of target words """
+
+    def __init__(
+        self,
+        root: DecisionNode,
+        content_hash: str,
+        max_guesses: int,
+        hard_mode: bool = False,
+    ):
+        """
+        Args:
+            root: opening decision.
+            content_hash: content hash of the dictionary the tree was built on.
+            max_guesses: max number guesses of the games the tree was built on.
+            hard_mode: whether the games the tree was built on were in hard mode.
+        """
+
+        self._root = root
+        self._content_hash = content_hash
+        self._max_guesses = max_guesses
+        self._hard_mode = hard_mode
+
+    def __len__(self) -> int:
+        """ Number of distinct game states, one agent call each. """
+
+        n_nodes = 0
+        nodes = [self._root]
+
+        while nodes:
+            node = nodes.pop()
+            n_nodes += 1
+            nodes.extend(node.children.values())
+
+        return n_nodes
+
+    @property
+    def content_hash(self) -> str:  # pylint: disable=missing-function-docstring
+        return self._content_hash
+
+    @property
+    def hard_mode(self) -> bool:  # pylint: disable=missing-function-docstring
+        return self._hard_mode
+
+    @property
+    def max_guesses(self) -> int:  # pylint: disable=missing-function-docstring
+        return self._max_guesses
+
+    @property
+    def root(self) -> DecisionNode:  # pylint: disable=missing-function-docstring
+        return self._root
+
+    @staticmethod
+    def build(agent: "Agent", target_words: List[str], **game_kwargs) -> "DecisionTree":
+        """
+        Explore the agent's decisions breadth first. Each game state is set up
+        once by replaying its path in a game against one of the targets that
+        reach it, the agent picks a guess, and the remaining targets are
+        partitioned by the feedback they give.
+
+        Args:
+            agent: Deterministic Wordle playing agent, its guess may only
+                depend on the game state.
+            target_words: List of target words.
+            game_kwargs: Optional game config keyword arguments.
+        Raises:
+            IllegalGuessError if the agent makes an illegal guess, a
+            deterministic agent would repeat it forever.
+        Returns:
+            Decision tree covering every target word.
+        """
+
+        targets = list(dict.fromkeys(target_words))
+
+        if not targets:
+            raise ValueError("Decision tree needs at least one target word")
+
+        # every game of the exploration shares this config
+        config = Game(targets[0], **game_kwargs)
+        root = DecisionTree._explore(agent, targets, game_kwargs)
+
+        log.info("Explored decision tree of %d targets", len(targets))
+
+        return DecisionTree(
+            root, config.dictionary.content_hash, config.max_guesses, config.hard_mode
+        )
+
+    @staticmethod
+    def _explore(
+        agent: "Agent", targets: List[str], game_kwargs: Dict[str, Any]
+    ) -> DecisionNode:
+        """
+        Breadth first search of the agent's decisions.
+
+        Args:
+            agent: Deterministic Wordle playing agent.
+            targets: Distinct target words.
+            game_kwargs: Game config keyword arguments.
+        Returns:
+            Root node.
+        """
+
+        # parent's children, feedback code leading to the state, the path's
+        # guesses and the targets reaching the state. -1 marks the root.
+        holder: Dict[int, DecisionNode] = {}
+        queue: Deque[Tuple[Dict[int, DecisionNode], int, List[str], List[str]]] = deque(
+            [(holder, -1, [], targets)]
+        )
+
+        while queue:
+
+            parent, code, path, state_targets = queue.popleft()
+
+            game = DecisionTree._replay(state_targets[0], path, game_kwargs)
+            node = DecisionTree._decide(agent, game, path)
+            parent[code] = node
+
+            # the game ends once the guesses exceed max guesses
+            if len(path) + 1 > game.max_guesses:
+                continue
+
+            for child_code, child_targets in DecisionTree._partition(
+                node.guess, state_targets, game, game_kwargs.get("feedback")
+            ):
+                queue.append(
+                    (node.children, child_code, path + [node.guess], child_targets)
+                )
+
+        return holder[-1]
+
+    @staticmethod
+    def _replay(target_word: str, path: List[str], game_kwargs: Dict[str, Any]) -> Game:
+        """
+        Args:
+            target_word: Target word reaching the game state.
+            path: Guesses leading to the game state.
+            game_kwargs: Game config keyword arguments.
+        Returns:
+            Started game in the game state.
+        """
+
+        game = Game(target_word, **game_kwargs)
+        session = game.start_game()
+        next(session)
+
+        for guess in path:
+            session.send(guess)
+
+        return game
+
+    @staticmethod
+    def _decide(agent: "Agent", game: Game, path: List[str]) -> DecisionNode:
+        """
+        Args:
+            agent: Deterministic Wordle playing agent.
+            game: Game in the state to decide.
+            path: Guesses leading to the game state.
+        Raises:
+            IllegalGuessError if the agent makes an illegal guess.
+        Returns:
+            Node of the agent's guess and decision time, without children.
+        """
+
+        start = time.perf_counter()
+        guess = agent.play(game)
+        seconds = time.perf_counter() - start
+
+        guess_word = GuessWord(guess)
+
+        try:
+            game.check_guess(guess_word)
+        except IllegalGuessError as exception:
+            raise IllegalGuessError(f"{exception} after {path}") from exception
+
+        return DecisionNode(guess=str(guess_word), seconds=seconds)
+
+    @staticmethod
+    def _partition(
+        guess: str,
+        targets: List[str],
+        game: Game,
+        feedback: Optional["FeedbackMatrix"],
+    ) -> List[Tuple[int, List[str]]]:
+        """
+        Args:
+            guess: Guess word.
+            targets: Target words reaching the game state.
+            game: Game in the state.
+            feedback: optional precomputed feedback table for the dictionary.
+        Returns:
+            Targets grouped by the feedback code they give, by code, without
+            the solved targets.
+        """
+
+        partition: DefaultDict[int, List[str]] = defaultdict(list)
+        codes = _score(guess, targets, game.dictionary, feedback)
+
+        for target, target_code in zip(targets, codes):
+            partition[target_code].append(target)
+
+        partition.pop(all_green_code(len(guess)), None)
+
+        return sorted(partition.items())
+
+    def records(
+        self,
+        target_words: List[str],
+        dictionary: "Dictionary",
+        feedback: Optional["FeedbackMatrix"] = None,
+    ) -> Iterator[GameRecord]:
+        """
+        Replay the tree against target words without calling the agent.
+        Turn times are the agent's recorded decision times.
+
+        Args:
+            target_words: List of target words.
+            dictionary: Wordle dictionary the tree was built on.
+            feedback: optional precomputed feedback table for the dictionary.
+        Raises:
+            ValueError if the tree was built on another dictionary or does not
+            cover a target.
+        Returns:
+            Iterator of game records in target word order.
+        """
+
+        if dictionary.content_hash != self._content_hash:
+            raise ValueError("Decision tree was built for a different dictionary")
+
+        for target_word in target_words:
+
+            all_green = all_green_code(len(target_word))
+            node = self._root
+            guesses: List[str] = []
+            codes: List[int] = []
+            turn_times: List[float] = []
+
+            while True:
+
+                code = _score(node.guess, [target_word], dictionary, feedback)[0]
+                guesses.append(node.guess)
+                codes.append(code)
+                turn_times.append(node.seconds)
+
+                if code == all_green or len(guesses) > self._max_guesses:
+                    break
+
+                if code not in node.children:
+                    raise ValueError(
+                        f'Decision tree does not cover target word "{target_word}"'
+                    )
+
+                node = node.children[code]
+
+            yield GameRecord(
+                target_word=target_word,
+                n_turns=len(guesses),
+                success=code == all_green,
+                turn_times=turn_times,
+                guesses=guesses,
+                feedback_codes=codes,
+            )
+
+    def save(self, path: pathlib.Path) -> None:
+        """
+        Args:
+            path: output JSON file.
+        """
+
+        tree_dict = {
+            "version": TREE_FORMAT_VERSION,
+            "content_hash": self._content_hash,
+            "max_guesses": self._max_guesses,
+            "hard_mode": self._hard_mode,
+            "root": self._root.to_dict(),
+        }
+
+        pathlib.Path(path).write_text(json.dumps(tree_dict), encoding="utf-8")
+
+    @staticmethod
+    def load(path: pathlib.Path) -> "DecisionTree":
+        """
+        Args:
+            path: JSON file written by save.
+        Returns:
+            Decision tree.
+        """
+
+        tree_dict = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+
+        if tree_dict["version"] != TREE_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported decision tree version {tree_dict['version']}"
+            )
+
+        return DecisionTree(
+            DecisionNode.from_dict(tree_dict["root"]),
+            tree_dict["content_hash"],
+            tree_dict["max_guesses"],
+            tree_dict["hard_mode"],
+        )
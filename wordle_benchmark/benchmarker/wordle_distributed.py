@@ -0,0 +1,455 @@
+"""
+Classes to spread a benchmark over worker processes on one or more hosts,
+checkpointing finished shards so an interrupted run resumes where it stopped.
+
+Trust model: the coordinator and its workers exchange pickled messages, so
+any peer that passes the authkey handshake can run code on the other side.
+The authkey authenticates peers but nothing is encrypted. Only listen beyond
+localhost on a network you trust, with a secret authkey shared only with
+your own workers.
+
+Sample use:
+    # coordinator host
+    authkey = secrets.token_bytes(32)
+    coordinator = Coordinator(
+        target_words, "sweep/", address=("0.0.0.0", 6000), authkey=authkey
+    )
+    results = coordinator.run()
+
+    # each worker host, given the same authkey
+    run_worker(("coordinator-host", 6000), MyAgent, authkey, dictionary=dictionary)
+"""
+
+import dataclasses
+import hashlib
+import inspect
+import ipaddress
+import json
+import logging
+import pathlib
+import secrets
+import threading
+from collections import deque
+from multiprocessing.connection import Client, Connection, Listener
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from wordle_benchmark.benchmarker.wordle_benchmarker import prepare_agent
+from wordle_benchmark.benchmarker.wordle_play import play_games
+from wordle_benchmark.benchmarker.wordle_records import (
+    BenchmarkResults,
+    GameRecord,
+    JsonlSink,
+    ResultsAggregator,
+)
+from wordle_benchmark.cache import atomic_write_bytes
+from wordle_benchmark.game import Game
+from wordle_benchmark.game.wordle_game import get_default_dictionary
+
+if TYPE_CHECKING:
+    from wordle_benchmark.agent import Agent
+
+log = logging.getLogger(__name__)
+
+# game keyword arguments that change game outcomes, part of a worker's config
+_OUTCOME_KWARGS = ("max_guesses", "hard_mode")
+
+Address = Tuple[str, int]
+
+
+def _is_loopback(host: str) -> bool:
+    """ Whether a host name or address only accepts local connections. """
+
+    if host == "localhost":
+        return True
+
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _worker_config(
+    agent: "Agent", agent_id: Optional[str], game_kwargs: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Everything a worker's records depend on, checked by the coordinator so
+    workers of different runs cannot share a checkpoint directory.
+
+    Args:
+        agent: Wordle playing agent.
+        agent_id: optional agent name and version, the agent's class by default.
+        game_kwargs: Game config keyword arguments.
+    Returns:
+        JSON compatible worker config.
+    """
+
+    parameters = inspect.signature(Game).parameters
+    dictionary = game_kwargs.get("dictionary") or get_default_dictionary()
+
+    return {
+        "agent": agent_id or f"{type(agent).__module__}.{type(agent).__qualname__}",
+        "dictionary": dictionary.content_hash,
+        "game": {
+            name: game_kwargs.get(name, parameters[name].default)
+            for name in _OUTCOME_KWARGS
+        },
+    }
+
+
+class Coordinator:  # pylint: disable=too-many-instance-attributes
+    """ Hand out target word shards to workers and checkpoint their records """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        target_words: List[str],
+        checkpoint_dir: pathlib.Path,
+        shard_size: int = 100,
+        seed: Optional[int] = None,
+        address: Address = ("127.0.0.1", 0),
+        authkey: Optional[bytes] = None,
+    ):
+        """
+        Args:
+            target_words: List of target words.
+            checkpoint_dir: directory of finished shards, reused to resume.
+            shard_size: number of games handed to a worker at a time.
+            seed: optional benchmark seed, as for Benchmark.
+            address: host and port to listen on, port 0 picks a free one.
+                Listen on "0.0.0.0" to accept workers from other hosts.
+            authkey: secret workers must present, see the module trust model.
+                Required beyond localhost, a random key by default otherwise.
+        Raises:
+            ValueError if listening beyond localhost without an authkey, or if
+            checkpoint_dir holds checkpoints of a different run.
+        """
+
+        if authkey is None:
+            if not _is_loopback(address[0]):
+                raise ValueError(
+                    f"Listening on {address[0]} needs an explicit secret authkey"
+                )
+
+            authkey = secrets.token_bytes(32)
+
+        self._target_words = target_words
+        self._checkpoint_dir = pathlib.Path(checkpoint_dir)
+        self._shard_size = shard_size
+        self._seed = seed
+        self._address = address
+        self._authkey = authkey
+
+        self._n_shards = -(-len(target_words) // shard_size)
+        self._listener: Optional[Listener] = None
+
+        self._condition = threading.Condition()
+        self._pending: Deque[int] = deque()
+        self._done: Set[int] = set()
+        self._worker_config: Optional[Dict[str, Any]] = None
+
+        self._checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self._check_manifest()
+
+        for shard_ind in range(self._n_shards):
+            if self._shard_path(shard_ind).exists():
+                self._done.add(shard_ind)
+            else:
+                self._pending.append(shard_ind)
+
+        if self._done:
+            log.info(
+                "Resuming with %d of %d shards done", len(self._done), self._n_shards
+            )
+
+    @property
+    def address(self) -> Address:
+        """ Address workers connect to, the bound port once started. """
+
+        if self._listener is None:
+            return self._address
+
+        return self._listener.address
+
+    @property
+    def authkey(self) -> bytes:
+        """ Secret workers must present, pass it to run_worker. """
+
+        return self._authkey
+
+    @property
+    def n_remaining(self) -> int:
+        """ Number of shards without a checkpoint. """
+
+        with self._condition:
+            return self._n_shards - len(self._done)
+
+    def start(self) -> Address:
+        """
+        Start accepting workers in the background.
+
+        Returns:
+            Address workers connect to.
+        """
+
+        if self._listener is None:
+            self._listener = Listener(self._address, authkey=self._authkey)
+            threading.Thread(
+                target=self._accept, args=(self._listener,), daemon=True
+            ).start()
+
+        return self.address
+
+    def run(self) -> BenchmarkResults:
+        """ Wait for every shard to be checkpointed, then merge the records. """
+
+        if self.n_remaining:
+
+            self.start()
+
+            with self._condition:
+                while len(self._done) < self._n_shards:
+                    self._condition.wait()
+
+            if self._listener is not None:
+                self._listener.close()
+
+        return ResultsAggregator().add_all(self.records()).results()
+
+    def records(self) -> List[GameRecord]:
+        """ Checkpointed game records in target word order. """
+
+        records: List[GameRecord] = []
+
+        for shard_ind in sorted(self._done):
+            records.extend(JsonlSink.read(self._shard_path(shard_ind)))
+
+        return records
+
+    def _accept(self, listener: Listener) -> None:
+        """
+        Serve each connecting worker on its own thread, until the listener
+        is closed.
+
+        Args:
+            listener: listener started by start.
+        """
+
+        while True:
+
+            try:
+                connection = listener.accept()
+            except OSError:
+                return
+
+            threading.Thread(
+                target=self._serve_worker, args=(connection,), daemon=True
+            ).start()
+
+    def _serve_worker(self, connection: Connection) -> None:
+        """
+        Send shards to a worker until none remain, requeueing the shard in
+        flight if the worker goes away. Workers whose config differs from
+        the run's are refused.
+
+        Args:
+            connection: worker connection.
+        """
+
+        with connection:
+
+            try:
+                _, worker_config = connection.recv()
+            except (EOFError, OSError):
+                return
+
+            refusal = self._check_worker_config(worker_config)
+
+            if refusal is not None:
+                log.warning("Refused worker: %s", refusal)
+                connection.send(("refused", refusal))
+                return
+
+            while True:
+
+                shard_ind = self._next_shard()
+
+                if shard_ind is None:
+                    connection.send(("stop",))
+                    return
+
+                start = shard_ind * self._shard_size
+                shard = list(
+                    enumerate(
+                        self._target_words[start : start + self._shard_size], start
+                    )
+                )
+
+                try:
+                    connection.send(("shard", shard, self._seed))
+                    records = connection.recv()
+                except (EOFError, OSError):
+                    log.warning("Lost worker, requeueing shard %d", shard_ind)
+                    self._requeue(shard_ind)
+                    return
+
+                self._checkpoint(shard_ind, records)
+
+    def _next_shard(self) -> Optional[int]:
+        """ Next pending shard, waiting while others are in flight. None when done. """
+
+        with self._condition:
+
+            while not self._pending and len(self._done) < self._n_shards:
+                self._condition.wait()
+
+            return self._pending.popleft() if self._pending else None
+
+    def _requeue(self, shard_ind: int) -> None:
+        """ Return a shard whose worker failed. """
+
+        with self._condition:
+            self._pending.appendleft(shard_ind)
+            self._condition.notify_all()
+
+    def _checkpoint(self, shard_ind: int, records: List[GameRecord]) -> None:
+        """ Persist a finished shard atomically. """
+
+        lines = "".join(
+            json.dumps(dataclasses.asdict(record)) + "\n" for record in records
+        )
+        atomic_write_bytes(self._shard_path(shard_ind), lines.encode())
+
+        with self._condition:
+            self._done.add(shard_ind)
+            self._condition.notify_all()
+
+        log.info("Checkpointed shard %d of %d", len(self._done), self._n_shards)
+
+    def _check_worker_config(self, worker_config: Dict[str, Any]) -> Optional[str]:
+        """
+        Record the first worker's config in the manifest, and compare every
+        later worker's against it, including workers of a resumed run.
+
+        Args:
+            worker_config: agent, dictionary and game config of a worker.
+        Returns:
+            Reason to refuse the worker, None if it belongs to the run.
+        """
+
+        with self._condition:
+
+            if self._worker_config is None:
+                self._worker_config = worker_config
+                self._write_manifest()
+                return None
+
+            if worker_config != self._worker_config:
+                return (
+                    f"worker config {worker_config} differs from the run's "
+                    f"{self._worker_config}"
+                )
+
+            return None
+
+    def _check_manifest(self) -> None:
+        """ Refuse to resume from checkpoints of a different run. """
+
+        run_key = self._run_key()
+        manifest_path = self._checkpoint_dir / "manifest.json"
+
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+            if manifest["run_key"] != run_key:
+                raise ValueError(
+                    f"{self._checkpoint_dir} holds checkpoints of a different run"
+                )
+
+            self._worker_config = manifest.get("worker_config")
+            return
+
+        self._write_manifest()
+
+    def _run_key(self) -> str:
+        """ Hash of the target words, shard size and seed. """
+
+        return hashlib.sha256(
+            json.dumps([self._target_words, self._shard_size, self._seed]).encode()
+        ).hexdigest()
+
+    def _write_manifest(self) -> None:
+        """ Persist the run key and the config of the run's workers. """
+
+        atomic_write_bytes(
+            self._checkpoint_dir / "manifest.json",
+            json.dumps(
+                {
+                    "run_key": self._run_key(),
+                    "n_shards": self._n_shards,
+                    "worker_config": self._worker_config,
+                }
+            ).encode(),
+        )
+
+    def _shard_path(self, shard_ind: int) -> pathlib.Path:
+        """ Checkpoint file of a shard. """
+
+        return self._checkpoint_dir / f"shard-{shard_ind:06d}.jsonl"
+
+
+def run_worker(
+    address: Address,
+    agent_factory: Callable[[], "Agent"],
+    authkey: bytes,
+    agent_id: Optional[str] = None,
+    **game_kwargs: Any,
+) -> int:
+    """
+    Play shards handed out by a coordinator until it has no more.
+
+    Args:
+        address: coordinator host and port.
+        agent_factory: callable building the Wordle playing agent.
+        authkey: secret of the coordinator, see Coordinator.authkey.
+        agent_id: optional agent name and version, the agent's class by
+            default. Workers of one run must agree on it.
+        game_kwargs: Optional game config keyword arguments.
+    Raises:
+        ValueError if the coordinator refuses the worker's agent or config.
+    Returns:
+        Number of shards played.
+    """
+
+    agent = agent_factory()
+    prepare_agent(agent, game_kwargs)
+    n_shards = 0
+
+    with Client(address, authkey=authkey) as connection:
+
+        connection.send(("hello", _worker_config(agent, agent_id, game_kwargs)))
+
+        while True:
+
+            try:
+                message = connection.recv()
+            except EOFError:
+                return n_shards
+
+            if message[0] == "stop":
+                return n_shards
+
+            if message[0] == "refused":
+                raise ValueError(f"Coordinator refused worker: {message[1]}")
+
+            _, shard, seed = message
+            connection.send(play_games(agent, shard, game_kwargs, seed))
+            n_shards += 1
@@ -0,0 +1,324 @@
+"""
+Classes to enforce per turn and per game time budgets, running agents in a
+subprocess that can be preempted when a turn runs out of time.
+"""
+
+import multiprocessing
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, Optional, Tuple
+
+from wordle_benchmark.agent import Agent
+from wordle_benchmark.game import Game
+
+if TYPE_CHECKING:
+    from wordle_benchmark.dictionary.wordle_dictionary import Dictionary
+    from wordle_benchmark.game.wordle_feedback import FeedbackMatrix
+
+
+class TurnTimeout(Exception):
+    """ Agent did not answer within its time budget """
+
+
+class PrepareTimeout(Exception):
+    """ Agent subprocess did not start and prepare within its time budget """
+
+
+@dataclass(frozen=True)
+class TimeBudget:
+    """ Seconds an agent may spend per turn and per game, None for no limit """
+
+    turn_timeout: Optional[float] = None
+    game_timeout: Optional[float] = None
+
+    def deadline(self, game_start: float) -> Optional[float]:
+        """
+        Args:
+            game_start: time.perf_counter() when the game started.
+        Returns:
+            time.perf_counter() by which the game must finish, if limited.
+        """
+
+        return None if self.game_timeout is None else game_start + self.game_timeout
+
+    def turn_seconds(
+        self, turn_start: float, deadline: Optional[float]
+    ) -> Optional[float]:
+        """
+        Args:
+            turn_start: time.perf_counter() when the turn started.
+            deadline: game deadline from deadline(), if any.
+        Returns:
+            Seconds the turn may take, if limited.
+        """
+
+        if deadline is None:
+            return self.turn_timeout
+
+        remaining = max(0.0, deadline - turn_start)
+
+        return (
+            remaining
+            if self.turn_timeout is None
+            else min(self.turn_timeout, remaining)
+        )
+
+
+class _MirrorGame(Game):
+    """ Copy of a game in the agent process, replaying the parent's feedback """
+
+    __slots__ = ("_next_code",)
+
+    def __init__(
+        self,
+        dictionary: "Dictionary",
+        feedback: Optional["FeedbackMatrix"],
+        max_guesses: int,
+        hard_mode: bool,
+    ):
+        """
+        Args:
+            dictionary: Wordle dictionary of the parent game.
+            feedback: optional feedback table of the parent game.
+            max_guesses: max number guesses of the parent game.
+            hard_mode: whether the parent game is in hard mode.
+        """
+
+        super().__init__(
+            dictionary.word(0),
+            dictionary=dictionary,
+            max_guesses=max_guesses,
+            feedback=feedback,
+            hard_mode=hard_mode,
+        )
+
+        self._next_code = 0
+
+    def _compare(self, guess: str) -> int:
+        return self._next_code
+
+
+def _serve_agent(agent_factory: Callable[[], Agent], connection: Connection) -> None:
+    """
+    Agent process loop, mirroring each game the parent plays and answering
+    every turn with the agent's guess.
+
+    Args:
+        agent_factory: callable building the Wordle playing agent.
+        connection: pipe to the parent process.
+    """
+
+    agent = agent_factory()
+    tables: Tuple[Any, ...] = ()
+    game: Optional[_MirrorGame] = None
+    session: Optional[Generator[None, str, None]] = None
+
+    while True:
+
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+
+        if message[0] == "tables":
+            tables = message[1:]
+            continue
+
+        if message[0] == "prepare":
+            try:
+                agent.prepare(*message[1:])
+                connection.send(("prepared", None))
+            except Exception as exception:  # pylint: disable=broad-except
+                connection.send(("error", exception))
+            continue
+
+        if message[0] == "start":
+            game = _MirrorGame(*tables, *message[1:])
+            session = game.start_game()
+            next(session)
+            continue
+
+        if game is None or session is None:
+            connection.send(("error", RuntimeError("No game was started")))
+            continue
+
+        for guess, code in message[1][game.n_guesses :]:
+            game._next_code = code  # pylint: disable=protected-access
+            session.send(guess)
+
+        try:
+            connection.send(("guess", agent.play(game)))
+        except Exception as exception:  # pylint: disable=broad-except
+            connection.send(("error", exception))
+
+
+class IsolatedAgent(Agent):
+    """ Run an agent in a subprocess, terminated when a turn runs out of time """
+
+    def __init__(
+        self,
+        agent_factory: Callable[[], Agent],
+        prepare_timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            agent_factory: callable building the Wordle playing agent in the
+                subprocess, picklable unless processes are forked.
+            prepare_timeout: optional seconds the subprocess may take to build
+                and prepare the agent, each time it starts.
+        """
+
+        self._agent_factory = agent_factory
+        self._prepare_timeout = prepare_timeout
+        self._process: Optional[multiprocessing.Process] = None
+        self._connection: Optional[Connection] = None
+        self._game: Optional[Game] = None
+        self._tables: Optional[Tuple[str, bool]] = None
+        self._preparation: Optional[Tuple["Dictionary", Dict[str, Any]]] = None
+
+    def __getstate__(self):
+        # pool workers start their own subprocess
+        return {
+            "_agent_factory": self._agent_factory,
+            "_prepare_timeout": self._prepare_timeout,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(state["_agent_factory"], state["_prepare_timeout"])
+
+    def prepare(self, dictionary: "Dictionary", game_config: Dict[str, Any]) -> None:
+        """
+        Prepare the agent in its subprocess. A subprocess replacing a
+        preempted one is prepared again before its first turn.
+
+        Args:
+            dictionary: Wordle dictionary of the games to come.
+            game_config: Game config keyword arguments, e.g. max_guesses.
+        Raises:
+            PrepareTimeout if the agent runs over prepare_timeout, the
+            subprocess is terminated.
+        """
+
+        self._preparation = (dictionary, game_config)
+
+        if self._process is None:
+            self._start()
+        else:
+            self._send_preparation(dictionary, game_config)
+
+    def start_game(self, game: "Game") -> None:
+        """
+        Get the subprocess ready for a game before its clock starts: replace
+        a preempted subprocess and send the game's tables.
+
+        Args:
+            game: Game about to start.
+        Raises:
+            PrepareTimeout if a new subprocess runs over prepare_timeout.
+        """
+
+        connection = self._connected()
+
+        if game is self._game:
+            return
+
+        # the dictionary is only sent again when it changes
+        tables = (game.dictionary.content_hash, game.feedback is None)
+
+        if tables != self._tables:
+            self._tables = tables
+            connection.send(("tables", game.dictionary, game.feedback))
+
+        self._game = game
+        connection.send(("start", game.max_guesses, game.hard_mode))
+
+    def play(self, game: "Game", timeout: Optional[float] = None) -> str:
+        """
+        Args:
+            game: Game with game state information, see start_game.
+            timeout: optional seconds to wait for the agent's answer.
+        Raises:
+            TurnTimeout if the agent does not answer in time. The subprocess
+            is terminated, the next start_game or play replaces it.
+        Returns:
+            String of guess word.
+        """
+
+        self.start_game(game)
+        connection = self._connected()
+        connection.send(("play", game.history))
+
+        if not connection.poll(timeout):
+            self.close()
+            raise TurnTimeout(f"Agent did not answer within {timeout:.3g} s")
+
+        return self._receive()
+
+    def close(self) -> None:
+        """ Terminate the agent subprocess, if running. """
+
+        if self._process is None or self._connection is None:
+            return
+
+        self._connection.close()
+        self._process.terminate()
+        self._process.join()
+
+        self._process = self._connection = self._game = self._tables = None
+
+    def _start(self) -> None:
+        """ Start the agent subprocess. """
+
+        self._connection, child_connection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve_agent,
+            args=(self._agent_factory, child_connection),
+            daemon=True,
+        )
+        self._process.start()
+        child_connection.close()
+
+        if self._preparation is not None:
+            self._send_preparation(*self._preparation)
+
+    def _connected(self) -> Connection:
+        """ Pipe to the agent subprocess, started first if not running. """
+
+        if self._connection is None:
+            self._start()
+
+        assert self._connection is not None
+
+        return self._connection
+
+    def _send_preparation(
+        self, dictionary: "Dictionary", game_config: Dict[str, Any]
+    ) -> None:
+        """
+        Prepare the agent in the subprocess, waiting up to prepare_timeout.
+
+        Args:
+            dictionary: Wordle dictionary of the games to come.
+            game_config: Game config keyword arguments.
+        """
+
+        connection = self._connected()
+        connection.send(("prepare", dictionary, game_config))
+
+        if not connection.poll(self._prepare_timeout):
+            self.close()
+            raise PrepareTimeout(
+                f"Agent did not prepare within {self._prepare_timeout:.3g} s"
+            )
+
+        self._receive()
+
+    def _receive(self) -> Any:
+        """ Next answer of the subprocess, raising the agent's exceptions. """
+
+        kind, value = self._connected().recv()
+
+        if kind == "error":
+            raise value
+
+        return value
@@ -0,0 +1,444 @@
+"""
+Functions to play single, batch and multi board games for a benchmark and
+record their outcomes.
+"""
+
+import logging
+import random
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Tuple
+
+import numpy as np
+
+from wordle_benchmark.benchmarker.wordle_isolation import (
+    IsolatedAgent,
+    TimeBudget,
+    TurnTimeout,
+)
+from wordle_benchmark.benchmarker.wordle_records import GameRecord
+from wordle_benchmark.game import AdversarialGame, BatchGame, Game, MultiGame
+from wordle_benchmark.game.wordle_game import IllegalGuessError
+from wordle_benchmark.instrumentation import Instrumentation, MemoryInstrumentation
+from wordle_benchmark.instrumentation.wordle_instrumentation import AGENT, TURN
+from wordle_benchmark.instrumentation.wordle_memory import ENGINE
+
+if TYPE_CHECKING:
+    from wordle_benchmark.agent import Agent, BatchAgent, MultiAgent
+
+log = logging.getLogger(__name__)
+
+
+def game_seed(seed: int, game_ind: int) -> int:
+    """
+    Seed for one game, independent of which process plays it.
+
+    Args:
+        seed: benchmark seed.
+        game_ind: position of the game's target in the target word list.
+    Returns:
+        32 bit seed.
+    """
+
+    return int(np.random.SeedSequence([seed, game_ind]).generate_state(1)[0])
+
+
+def seed_generators(seed: Optional[int]) -> None:
+    """
+    Args:
+        seed: optional seed applied to the random and numpy global generators.
+    """
+
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+
+
+class _TurnRecorder:  # pylint: disable=too-many-instance-attributes
+    """ Turn times, latencies and allocations of one game, as it is played """
+
+    def __init__(
+        self,
+        instrumentation: Optional[Instrumentation] = None,
+        memory: Optional[MemoryInstrumentation] = None,
+    ):
+        """
+        Args:
+            instrumentation: optional per phase latency recorder.
+            memory: optional memory recorder, already tracing.
+        """
+
+        self.turn_times: List[float] = []
+        self.agent_blocks: List[int] = []
+        self.engine_blocks: List[int] = []
+
+        self._instrumentation = instrumentation
+        self._memory = memory
+        self._turn = 0
+        self._start = 0
+        self._blocks = 0
+
+    def start_turn(self, game: Game) -> float:
+        """
+        Args:
+            game: Game about to be played a turn.
+        Returns:
+            time.perf_counter() when the turn started.
+        """
+
+        self._turn = game.n_guesses
+        self._blocks = sys.getallocatedblocks() if self._memory is not None else 0
+        self._start = time.perf_counter_ns()
+
+        return self._start / 1e9
+
+    def ask(
+        self, agent: "Agent", game: Game, timeout: Optional[float]
+    ) -> Optional[str]:
+        """
+        Ask the agent for its guess, see _ask_agent, timing it and counting
+        its allocations.
+
+        Args:
+            agent: Wordle playing agent.
+            game: Game with game state information.
+            timeout: optional seconds the agent may take.
+        Returns:
+            Guess word, None if the agent ran out of time.
+        """
+
+        instrumentation = self._instrumentation
+
+        if instrumentation is None:
+            guess = _ask_agent(agent, game, timeout)
+        else:
+            instrumentation.start_profiler()
+            guess = _ask_agent(agent, game, timeout)
+            instrumentation.stop_profiler()
+            instrumentation.record(
+                AGENT, self._turn, time.perf_counter_ns() - self._start
+            )
+
+        if self._memory is not None:
+            agent_end = sys.getallocatedblocks()
+            self.agent_blocks.append(agent_end - self._blocks)
+            self._blocks = agent_end
+
+        return guess
+
+    def end_turn(self) -> None:
+        """ Record the whole turn, agent and game engine. """
+
+        elapsed = time.perf_counter_ns() - self._start
+        self.turn_times.append(elapsed / 1e9)
+
+        if self._instrumentation is not None:
+            self._instrumentation.record(TURN, self._turn, elapsed)
+
+        if self._memory is not None:
+            self.engine_blocks.append(sys.getallocatedblocks() - self._blocks)
+            self._memory.record_blocks(AGENT, self.agent_blocks[-1])
+            self._memory.record_blocks(ENGINE, self.engine_blocks[-1])
+
+
+def _send_guess(
+    game: Game, session: Generator[None, str, None], guess: Optional[str]
+) -> Optional[bool]:
+    """
+    Args:
+        game: Game being played.
+        session: Started game session.
+        guess: Agent's guess, None if the agent ran out of time.
+    Returns:
+        None while the game goes on, otherwise whether it was forfeited.
+    """
+
+    if guess is None:
+        game.forfeit()
+        session.close()
+        return True
+
+    try:
+        session.send(guess)
+    except StopIteration:
+        return False
+    except IllegalGuessError as exception:
+        log.warning(exception)
+        return True
+
+    return None
+
+
+def play_game(
+    agent: "Agent",
+    target_word: Optional[str],
+    game_kwargs: Dict[str, Any],
+    budget: Optional[TimeBudget] = None,
+    memory: Optional[MemoryInstrumentation] = None,
+) -> GameRecord:
+    """
+    Play a single game.
+
+    Args:
+        agent: Wordle playing agent.
+        target_word: Target word, None plays an adversarial game whose
+            recorded target is a word consistent with every feedback.
+        game_kwargs: Game config keyword arguments, an instrumentation entry
+            also records agent and whole turn time.
+        budget: optional turn and game time limits, the game is forfeited
+            on the first turn that runs over. Games are also forfeited after
+            MAX_ILLEGAL_GUESSES illegal guesses in a row.
+        memory: optional memory recorder, already tracing.
+    Returns:
+        Game outcome.
+    """
+
+    game = (
+        AdversarialGame(**game_kwargs)
+        if target_word is None
+        else Game(target_word, **game_kwargs)
+    )
+    recorder = _TurnRecorder(game_kwargs.get("instrumentation"), memory)
+
+    if memory is not None:
+        memory.start_game()
+
+    # a subprocess preempted in an earlier game is replaced off the clock
+    if isinstance(agent, IsolatedAgent):
+        agent.start_game(game)
+
+    session = game.start_game()
+    next(session)
+
+    deadline = None if budget is None else budget.deadline(time.perf_counter())
+    forfeit: Optional[bool] = None
+
+    while forfeit is None:
+
+        start = recorder.start_turn(game)
+        timeout = None if budget is None else budget.turn_seconds(start, deadline)
+
+        forfeit = _send_guess(game, session, recorder.ask(agent, game, timeout))
+        recorder.end_turn()
+
+    history = game.history
+
+    return GameRecord(
+        target_word=game.candidate_view[0] if target_word is None else target_word,
+        # a forfeit scores as a loss
+        n_turns=game.max_guesses + 1 if forfeit else game.n_guesses,
+        success=game.success,
+        turn_times=recorder.turn_times,
+        guesses=[guess for guess, _ in history],
+        feedback_codes=[code for _, code in history],
+        forfeit=forfeit,
+        peak_memory=None if memory is None else memory.end_game(),
+        agent_blocks=recorder.agent_blocks,
+        engine_blocks=recorder.engine_blocks,
+    )
+
+
+def _ask_agent(
+    agent: "Agent", game: Game, timeout: Optional[float] = None
+) -> Optional[str]:
+    """
+    Ask an agent for its next guess within a time budget. Isolated agents
+    are preempted, in process agents can only be checked once they answer.
+
+    Args:
+        agent: Wordle playing agent.
+        game: Game with game state information.
+        timeout: optional seconds the agent may take.
+    Returns:
+        Guess word, None if the agent ran out of time.
+    """
+
+    if isinstance(agent, IsolatedAgent):
+        try:
+            return agent.play(game, timeout)
+        except TurnTimeout:
+            return None
+
+    if timeout is None:
+        return agent.play(game)
+
+    start = time.perf_counter()
+    guess = agent.play(game)
+
+    return guess if time.perf_counter() - start <= timeout else None
+
+
+def play_games(
+    agent: "Agent",
+    indexed_targets: List[Tuple[int, str]],
+    game_kwargs: Dict[str, Any],
+    seed: Optional[int] = None,
+    budget: Optional[TimeBudget] = None,
+) -> List[GameRecord]:
+    """
+    Play games one after another, e.g. a shard handed to a worker. Each game's
+    seed is derived from its position, so results do not depend on which
+    process plays it.
+
+    Args:
+        agent: Wordle playing agent.
+        indexed_targets: Target words with their position in the benchmark.
+        game_kwargs: Game config keyword arguments.
+        seed: optional benchmark seed.
+        budget: optional turn and game time limits.
+    Returns:
+        Game outcomes in input order.
+    """
+
+    records = []
+
+    for game_ind, target_word in indexed_targets:
+        seed_generators(None if seed is None else game_seed(seed, game_ind))
+        records.append(play_game(agent, target_word, game_kwargs, budget))
+
+    return records
+
+
+def play_batch(
+    agent: "BatchAgent",
+    target_words: List[str],
+    game_kwargs: Dict[str, Any],
+    seed: Optional[int] = None,
+) -> List[GameRecord]:
+    """
+    Play a batch of games in lockstep.
+    Each step's time is split evenly between the games it advanced. Games
+    given up after MAX_ILLEGAL_GUESSES illegal guesses are forfeited.
+
+    Args:
+        agent: Wordle playing batch agent.
+        target_words: Target words.
+        game_kwargs: Game config keyword arguments.
+        seed: optional seed applied to the random and numpy global generators.
+    Returns:
+        Game outcomes in input order.
+    """
+
+    log.info("Playing batch of %d games", len(target_words))
+
+    seed_generators(seed)
+
+    batch = BatchGame(target_words, **game_kwargs)
+    turn_times: List[List[float]] = [[] for _ in target_words]
+
+    active = batch.active
+
+    while len(active) > 0:
+
+        start = time.perf_counter()
+        batch.step(agent.play_batch(batch))
+        end = time.perf_counter()
+
+        for game_ind in active:
+            turn_times[game_ind].append((end - start) / len(active))
+
+        active = batch.active
+
+    word_list = batch.dictionary.word_list
+
+    return [
+        GameRecord(
+            target_word=target_word,
+            # a forfeit scores as a loss
+            n_turns=batch.max_guesses + 1 if forfeit else int(n_turns),
+            success=bool(success),
+            turn_times=game_turn_times,
+            guesses=[word_list[word_id] for word_id in guess_ids[:n_turns].tolist()],
+            feedback_codes=codes[:n_turns].tolist(),
+            forfeit=bool(forfeit),
+        )
+        for target_word, n_turns, success, forfeit, game_turn_times, guess_ids, codes in zip(
+            target_words,
+            batch.n_guesses,
+            batch.success,
+            batch.forfeit,
+            turn_times,
+            batch.guesses,
+            batch.feedback_codes,
+        )
+    ]
+
+
+def play_multi(
+    agent: "MultiAgent",
+    target_words: List[str],
+    game_kwargs: Dict[str, Any],
+    seed: Optional[int] = None,
+) -> List[GameRecord]:
+    """
+    Play one multi board game, recording each board as its own game.
+    Each turn's time is split evenly between the boards it was scored on.
+    Boards unsolved when the game is given up after MAX_ILLEGAL_GUESSES
+    illegal guesses are forfeited.
+
+    Args:
+        agent: Wordle playing multi board agent.
+        target_words: Target word of each board.
+        game_kwargs: Game config keyword arguments.
+        seed: optional seed applied to the random and numpy global generators.
+    Returns:
+        Board outcomes in input order.
+    """
+
+    seed_generators(seed)
+
+    game = MultiGame(target_words, **game_kwargs)
+    turn_times: List[List[float]] = [[] for _ in target_words]
+
+    while not game.finished:
+
+        active = game.active
+        n_guesses = game.n_guesses
+
+        start = time.perf_counter()
+        game.step(agent.play(game))
+        end = time.perf_counter()
+
+        if game.n_guesses > n_guesses:
+            for board in active:
+                turn_times[board].append((end - start) / len(active))
+
+    return _board_records(game, target_words, turn_times)
+
+
+def _board_records(
+    game: MultiGame, target_words: List[str], turn_times: List[List[float]]
+) -> List[GameRecord]:
+    """
+    Args:
+        game: Finished multi board game.
+        target_words: Target word of each board.
+        turn_times: Seconds spent on each turn of each board.
+    Returns:
+        Board outcomes in input order.
+    """
+
+    guesses = game.guesses
+    feedback_codes = game.feedback_codes
+    records = []
+
+    for board, target_word in enumerate(target_words):
+
+        solved_at = int(game.solved_at[board])
+        n_turns = solved_at if solved_at >= 0 else game.n_guesses
+        forfeit = game.forfeit and solved_at < 0
+
+        records.append(
+            GameRecord(
+                target_word=target_word,
+                # a forfeit scores as a loss
+                n_turns=game.max_guesses + 1 if forfeit else n_turns,
+                success=solved_at >= 0,
+                turn_times=turn_times[board],
+                guesses=guesses[:n_turns],
+                feedback_codes=feedback_codes[:n_turns, board].tolist(),
+                forfeit=forfeit,
+            )
+        )
+
+    return records
@@ -0,0 +1,224 @@
+"""
+Classes to record per game outcomes and aggregate them in constant memory.
+"""
+
+import dataclasses
+import json
+import math
+import pathlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from wordle_benchmark.instrumentation import (
+        Instrumentation,
+        LatencySummary,
+        MemoryInstrumentation,
+        MemorySummary,
+    )
+
+
+@dataclass
+class BenchmarkResults:  # pylint: disable=too-many-instance-attributes
+    """ Quantitative summarization of game outcomes """
+
+    average_n_turns: float
+    average_turn_time: float
+    percent_successes: float
+    std_turn_time: float
+    phase_latencies: Optional[Dict[str, "LatencySummary"]] = None
+    turn_latencies: Optional[Dict[str, Dict[int, "LatencySummary"]]] = None
+    n_games: int = 0
+    n_turns_histogram: Dict[int, int] = field(default_factory=dict)
+    max_n_turns: int = 0
+    n_forfeits: int = 0
+    setup_time: Optional[float] = None
+    cold_turn_time: float = math.nan
+    average_warm_turn_time: float = math.nan
+    std_warm_turn_time: float = math.nan
+    memory: Optional["MemorySummary"] = None
+
+
+@dataclass
+class GameRecord:  # pylint: disable=too-many-instance-attributes
+    """ Outcome of a single game """
+
+    target_word: str
+    n_turns: int
+    success: bool
+    turn_times: List[float]
+    guesses: List[str] = field(default_factory=list)
+    feedback_codes: List[int] = field(default_factory=list)
+    forfeit: bool = False
+    cold_start: bool = False
+    peak_memory: Optional[int] = None
+    agent_blocks: List[int] = field(default_factory=list)
+    engine_blocks: List[int] = field(default_factory=list)
+
+
+class RunningStats:
+    """ Welford's running mean and population standard deviation """
+
+    def __init__(self) -> None:
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def mean(self) -> float:  # pylint: disable=missing-function-docstring
+        return self._mean if self._count else math.nan
+
+    @property
+    def std(self) -> float:  # pylint: disable=missing-function-docstring
+        return math.sqrt(self._m2 / self._count) if self._count else math.nan
+
+    def add(self, value: float) -> None:
+        """
+        Args:
+            value: new sample.
+        """
+
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+
+
+class ResultsAggregator:
+    """ Constant memory reduction of game records to benchmark results """
+
+    def __init__(self) -> None:
+        self._n_turns = RunningStats()
+        self._turn_times = RunningStats()
+        self._cold_turn_times = RunningStats()
+        self._warm_turn_times = RunningStats()
+        self._n_turns_histogram: Counter = Counter()
+        self._n_successes = 0
+        self._n_forfeits = 0
+
+    def add(self, record: GameRecord) -> None:
+        """
+        Args:
+            record: outcome of a finished game.
+        """
+
+        self._n_turns.add(record.n_turns)
+        self._n_turns_histogram[record.n_turns] += 1
+        self._n_successes += record.success
+        self._n_forfeits += record.forfeit
+
+        turn_times = record.turn_times
+
+        # the first turn of a cold start includes the agent's first call
+        if record.cold_start and turn_times:
+            self._turn_times.add(turn_times[0])
+            self._cold_turn_times.add(turn_times[0])
+            turn_times = turn_times[1:]
+
+        for turn_time in turn_times:
+            self._turn_times.add(turn_time)
+            self._warm_turn_times.add(turn_time)
+
+    def add_all(self, records: Iterable[GameRecord]) -> "ResultsAggregator":
+        """
+        Args:
+            records: outcomes of finished games.
+        Returns:
+            This aggregator.
+        """
+
+        for record in records:
+            self.add(record)
+
+        return self
+
+    def results(
+        self,
+        instrumentation: Optional["Instrumentation"] = None,
+        setup_time: Optional[float] = None,
+        memory: Optional["MemoryInstrumentation"] = None,
+    ) -> BenchmarkResults:
+        """
+        Args:
+            instrumentation: optional per phase latency recorder.
+            setup_time: optional seconds the agent took to prepare.
+            memory: optional memory recorder.
+        Returns:
+            Benchmark results of every game added so far.
+        """
+
+        n_games = len(self._n_turns)
+
+        return BenchmarkResults(
+            average_n_turns=self._n_turns.mean,
+            average_turn_time=self._turn_times.mean,
+            percent_successes=self._n_successes / n_games if n_games else math.nan,
+            std_turn_time=self._turn_times.std,
+            phase_latencies=(
+                None if instrumentation is None else instrumentation.phase_summary()
+            ),
+            turn_latencies=(
+                None if instrumentation is None else instrumentation.turn_summary()
+            ),
+            n_games=n_games,
+            n_turns_histogram=dict(sorted(self._n_turns_histogram.items())),
+            max_n_turns=max(self._n_turns_histogram, default=0),
+            n_forfeits=self._n_forfeits,
+            setup_time=setup_time,
+            cold_turn_time=self._cold_turn_times.mean,
+            average_warm_turn_time=self._warm_turn_times.mean,
+            std_warm_turn_time=self._warm_turn_times.std,
+            memory=None if memory is None else memory.summary(),
+        )
+
+
+class JsonlSink:
+    """ Append game records to a JSON lines file as games finish """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        """
+        Args:
+            path: output file, appended to so interrupted runs keep their records.
+        """
+
+        self._path = pathlib.Path(path)
+        # pylint: disable=consider-using-with
+        self._file = open(self._path, "a", encoding="utf-8")
+
+    def __enter__(self) -> "JsonlSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, record: GameRecord) -> None:
+        """
+        Args:
+            record: outcome of a finished game, flushed immediately.
+        """
+
+        self._file.write(json.dumps(dataclasses.asdict(record)) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        """ Close the output file. """
+
+        self._file.close()
+
+    @staticmethod
+    def read(path: pathlib.Path) -> Iterator[GameRecord]:
+        """
+        Args:
+            path: JSON lines file written by a sink.
+        Returns:
+            Iterator of the recorded games.
+        """
+
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield GameRecord(**json.loads(line))
@@ -0,0 +1,2 @@
+# pylint: disable=missing-module-docstring
+from .wordle_cache import atomic_write_bytes, get_cache_dir
@@ -0,0 +1,48 @@
+"""
+Helpers to locate the on-disk cache shared by benchmark processes.
+"""
+
+import os
+import pathlib
+from typing import Optional
+
+CACHE_DIR_ENV_VAR = "WORDLE_BENCHMARK_CACHE"
+
+
+def get_cache_dir(cache_dir: Optional[pathlib.Path] = None) -> pathlib.Path:
+    """
+    Resolve and create the cache directory.
+
+    Args:
+        cache_dir: optional explicit directory, takes precedence over the
+            WORDLE_BENCHMARK_CACHE environment variable and ~/.cache default.
+    Returns:
+        Existing cache directory path.
+    """
+
+    if cache_dir is None:
+        env_dir = os.environ.get(CACHE_DIR_ENV_VAR)
+        cache_dir = (
+            pathlib.Path(env_dir)
+            if env_dir
+            else pathlib.Path.home() / ".cache" / "wordle_benchmark"
+        )
+
+    cache_dir = pathlib.Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    return cache_dir
+
+
+def atomic_write_bytes(path: pathlib.Path, data: bytes) -> None:
+    """
+    Write a file so concurrent readers never see it partially written.
+
+    Args:
+        path: destination file.
+        data: file contents.
+    """
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
@@ -1,2 +1,9 @@
 # pylint: disable=missing-module-docstring
-from .wordle_dictionary import Dictionary, RemoteDictionary
+from .wordle_dictionary import (
+    CustomDictionary,
+    Dictionary,
+    LocalDictionary,
+    RemoteDictionary,
+)
+from .wordle_index import LetterIndex
+from .wordle_packed import PackedWords, write_packed_dictionary
@@ -2,16 +2,58 @@
 Classes to represent English words.
 """
 
+import hashlib
+import io
 import json
+import logging
 import pathlib
 import random
 from abc import ABC
-from typing import List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
-import requests
+import numpy as np
 
+from wordle_benchmark.cache import atomic_write_bytes, get_cache_dir
+from wordle_benchmark.dictionary.wordle_index import LetterIndex
+from wordle_benchmark.dictionary.wordle_packed import (
+    PackedWords,
+    shuffle_order,
+    write_packed_dictionary,
+)
 
-class Dictionary(ABC):
+if TYPE_CHECKING:
+    import requests
+
+log = logging.getLogger(__name__)
+
+# shared HTTP connection pool, created on first download
+_SESSION: Optional["requests.Session"] = None
+
+
+def _get_session() -> "requests.Session":
+    """ Pooled HTTP session, requests is only imported when a download happens. """
+
+    global _SESSION  # pylint: disable=global-statement
+
+    if _SESSION is None:
+        import requests  # pylint: disable=import-outside-toplevel
+
+        _SESSION = requests.Session()
+
+    return _SESSION
+
+
+class Dictionary(ABC):  # pylint: disable=too-many-instance-attributes
     """ Dictionary ABC """
 
     def __init__(
@@ -26,24 +68,284 @@ class Dictionary(ABC):
         """
 
         self._word_len = word_len
-        self._word_list = word_list
 
-        self._filtered_word_list = Dictionary._filter_by_len(word_list, word_len)
-        self._randomized_order = Dictionary._randomize(self._filtered_word_list, seed)
+        filtered_word_list = Dictionary._filter_by_len(word_list, word_len)
+
+        # immutable store, a word's ID is its position in the randomized order
+        self._words: Tuple[str, ...] = tuple(
+            Dictionary._randomize(filtered_word_list, seed)
+        )
+        self._word_ids: Dict[str, int] = {}
+
+        for word_id, word in enumerate(self._words):
+            self._word_ids.setdefault(word, word_id)
+
+        self._init_derived_state(len(self._words))
+
+    def _init_derived_state(self, n_words: int) -> None:
+        """
+        Word ID range and empty caches of state derived from the words.
+
+        Args:
+            n_words: number of words in the dictionary.
+        """
+
+        self._all_word_ids = np.arange(n_words)
+        self._all_word_ids.flags.writeable = False
+
+        self._content_hash: Optional[str] = None
+        self._alphabet: Optional[List[str]] = None
+        self._encoded: Optional[np.ndarray] = None
+        self._index: Optional[LetterIndex] = None
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __contains__(self, value) -> bool:
+        return value in self._word_ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._words)
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    @property
+    def alphabet(self) -> List[str]:
+        """ Sorted distinct letters, position is the letter's encoded value. """
+
+        if self._alphabet is None:
+            self._alphabet, self._encoded = self._encode_words()
+
+        return self._alphabet.copy()
+
+    @property
+    def column_names(self) -> List[str]:
+        """ Names of the score columns available to column and top_k. """
+
+        return list(self._columns)
+
+    @property
+    def content_hash(self) -> str:
+        """ Hex digest identifying word length and word order, used as a cache key. """
+
+        if self._content_hash is None:
+            digest = hashlib.sha256(str(self._word_len).encode())
+            digest.update("\n".join(self.word_list).encode())
+            self._content_hash = digest.hexdigest()
+
+        return self._content_hash
+
+    @property
+    def encoded(self) -> np.ndarray:
+        """
+        Words as a read-only (n_words, word_len) integer array in dictionary order.
+        Letters are replaced with their index in the sorted dictionary alphabet.
+        """
+
+        if self._encoded is None:
+            self._alphabet, self._encoded = self._encode_words()
 
-    def __contains__(self, value):
-        return self.word_list.__contains__(value)
+        return self._encoded
 
-    def __iter__(self):
-        return self.word_list.__iter__()
+    @property
+    def index(self) -> LetterIndex:
+        """ Precomputed letter position and letter count word masks. """
+
+        if self._index is None:
+            self._index = LetterIndex(self.encoded, self.alphabet)
+
+        return self._index
 
     @property
     def word_len(self) -> int:  # pylint: disable=missing-function-docstring
         return self._word_len
 
     @property
-    def word_list(self) -> List[str]:  # pylint: disable=missing-function-docstring
-        return self._randomized_order.copy()
+    def word_ids(self) -> np.ndarray:
+        """ Read-only array of every word ID in dictionary order. """
+
+        return self._all_word_ids
+
+    @property
+    def word_list(self) -> Tuple[str, ...]:
+        """ Read-only view of the words in dictionary order, indexed by word ID. """
+
+        return self._words
+
+    def attach_column(
+        self,
+        name: str,
+        score: Callable[[str], float],
+        cache_dir: Optional[pathlib.Path] = None,
+    ) -> np.ndarray:
+        """
+        Score every word once, e.g. by frequency, persisting the scores so
+        later processes and runs load them instead. Attaching a name again
+        returns the existing column.
+
+        Args:
+            name: column name, also keys the cache so it must identify score.
+            score: word -> score, only called when the column is not cached.
+            cache_dir: directory to persist the column in, see get_cache_dir.
+        Returns:
+            Read-only float32 scores aligned to word IDs.
+        """
+
+        if name in self.column_names:
+            return self.column(name)
+
+        if not name.isidentifier():
+            raise ValueError(f"Column name must be an identifier, got {name!r}")
+
+        path = get_cache_dir(cache_dir) / f"column-{name}-{self.content_hash}.npy"
+        values: Optional[np.ndarray] = None
+
+        if path.exists():
+            values = np.load(path, mmap_mode="r")
+
+            if values.shape != (len(self),):
+                log.warning("Discarding %s column with bad shape at %s", name, path)
+                values = None
+
+        if values is None:
+            log.info("Scoring %d words for the %s column...", len(self), name)
+            computed = np.fromiter(
+                (score(word) for word in self.word_list),
+                dtype=np.float32,
+                count=len(self),
+            )
+
+            buffer = io.BytesIO()
+            np.save(buffer, computed)
+            atomic_write_bytes(path, buffer.getvalue())
+
+            values = np.load(path, mmap_mode="r")
+
+        self._columns[name] = values
+
+        return values
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Args:
+            name: attached column name, e.g. frequency.
+        Returns:
+            Read-only values aligned to word IDs.
+        Raises:
+            KeyError if no such column is attached.
+        """
+
+        return self._columns[name]
+
+    def top_k(
+        self, name: str, k: int, word_ids: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Highest scoring words without sorting the whole subset.
+
+        Args:
+            name: column name, see column_names.
+            k: number of words, fewer are returned if the subset is smaller.
+            word_ids: optional subset of word IDs, e.g. CandidateView.ids.
+        Returns:
+            Up to k word IDs, highest score first, ties by lowest word ID.
+        """
+
+        word_ids = self._all_word_ids if word_ids is None else np.asarray(word_ids)
+        scores = np.asarray(self.column(name))[word_ids]
+        k = min(k, len(word_ids))
+
+        if k <= 0:
+            return word_ids[:0]
+
+        # partial partition, only the k best are sorted
+        if k < len(word_ids):
+            best = np.argpartition(-scores, k - 1)[:k]
+            threshold = scores[best].min()
+
+            # keep every word tied at the threshold so ties break by word ID
+            best = np.flatnonzero(scores >= threshold)
+        else:
+            best = np.arange(len(word_ids))
+
+        ranked = best[np.lexsort((word_ids[best], -scores[best]))]
+
+        return word_ids[ranked[:k]]
+
+    def copy_word_list(self) -> List[str]:
+        """ New list of the words in dictionary order, safe to modify. """
+
+        return list(self.word_list)
+
+    def word(self, word_id: int) -> str:
+        """
+        Args:
+            word_id: Stable integer ID of a word.
+        Returns:
+            The word.
+        """
+
+        return self._words[word_id]
+
+    def word_id(self, word: str) -> int:
+        """
+        Args:
+            word: Word in the dictionary.
+        Returns:
+            Stable integer ID of the word.
+        Raises:
+            KeyError if the word is not in the dictionary.
+        """
+
+        return self._word_ids[word]
+
+    def _encode_words(self) -> Tuple[List[str], np.ndarray]:
+        """ Sorted alphabet and encoded word array. """
+
+        return Dictionary._encode(self.word_list, self._word_len)
+
+    @staticmethod
+    def _encode(
+        word_list: Sequence[str], word_len: int
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Encode equal length words as a letter index array.
+
+        Args:
+            word_list: list of words of length word_len.
+            word_len: length of every word.
+        Returns:
+            Sorted alphabet and read-only array of shape (len(word_list), word_len).
+        """
+
+        joined = "".join(word_list)
+
+        if joined.isascii():
+            raw = np.frombuffer(joined.encode("ascii"), dtype=np.uint8)
+        else:
+            raw = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32)
+
+        return Dictionary._encode_code_points(raw, len(word_list), word_len)
+
+    @staticmethod
+    def _encode_code_points(
+        raw: np.ndarray, n_words: int, word_len: int
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Args:
+            raw: code point of every letter, words concatenated.
+            n_words: number of words.
+            word_len: length of every word.
+        Returns:
+            Sorted alphabet and read-only array of shape (n_words, word_len).
+        """
+
+        alphabet, letter_inds = np.unique(raw, return_inverse=True)
+        dtype = np.uint8 if len(alphabet) < 256 else np.uint16
+
+        encoded = letter_inds.astype(dtype).reshape(n_words, word_len)
+        encoded.flags.writeable = False
+
+        return [chr(letter) for letter in alphabet], encoded
 
     @staticmethod
     def _filter_by_len(word_list: List[str], word_len: int) -> List[str]:
@@ -87,22 +389,280 @@ class Dictionary(ABC):
 class CustomDictionary(Dictionary):  # pylint: disable=too-few-public-methods
     """ CustomDictionary from lists """
 
-    def __init__(self) -> None:  # pylint: disable=super-init-not-called
-        raise NotImplementedError
+    def __init__(
+        self, word_list: List[str], word_len: int, seed: Optional[int] = None
+    ) -> None:
+        """
+        Args:
+            word_list: list of all valid words.
+            word_len: filter to apply to word length.
+            seed: optional randomization seed to apply.
+                NOTE! The default value is None and will result in no shuffle!
+        """
+
+        super().__init__(word_list=word_list, word_len=word_len, seed=seed)
+
+
+class LocalDictionary(Dictionary):  # pylint: disable=too-many-instance-attributes
+    """ LocalDictionary from a memory-mapped packed local file """
+
+    def __init__(  # pylint: disable=super-init-not-called
+        self, path: pathlib.Path, word_len: int, seed: Optional[int] = None
+    ) -> None:
+        """
+        Words stay in the shared memory map: lookups binary search the packed
+        index and strings are only decoded on demand.
+
+        Args:
+            path: packed dictionary file, see write_packed_dictionary.
+            word_len: filter to apply to word length.
+            seed: optional randomization seed to apply.
+                NOTE! The default value is None and will result in no shuffle!
+        """
+
+        self._packed = PackedWords(path)
+        self._word_len = word_len
+
+        # reuse the stored shuffle order when it was written with this seed
+        if seed is not None and seed == self._packed.seed:
+            self._order = self._packed.order(word_len)
+        else:
+            self._order = shuffle_order(len(self._packed.order(word_len)), seed)
+
+        # decoded on demand: every word, single words and looked up IDs
+        self._decoded_words: Optional[Tuple[str, ...]] = None
+        self._decoded: Dict[int, str] = {}
+        self._word_ids: Dict[str, int] = {}
+        self._word_ranks: Optional[np.ndarray] = None
+
+        self._init_derived_state(len(self._order))
+
+    def __contains__(self, value) -> bool:
+        return isinstance(value, str) and self._find(value) >= 0
+
+    def __getstate__(self):
+        # decoded strings are rebuilt on demand, the packed file is re-opened
+        state = self.__dict__.copy()
+        state.update(_decoded_words=None, _decoded={}, _word_ids={}, _word_ranks=None)
+        return state
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.word_list)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    @property
+    def content_hash(self) -> str:
+        """ Hex digest identifying word length and word order, used as a cache key. """
+
+        if self._content_hash is None:
+
+            rows = self._ascii_rows()
+
+            if rows is None:
+                return super().content_hash
+
+            # same bytes as joining the words with newlines, without decoding
+            lines = np.full((len(rows), self._word_len + 1), ord("\n"), dtype=np.uint8)
+            lines[:, :-1] = rows
+
+            digest = hashlib.sha256(str(self._word_len).encode())
+            digest.update(lines.tobytes()[:-1])
+            self._content_hash = digest.hexdigest()
 
+        return self._content_hash
 
-class LocalDictionary(Dictionary):  # pylint: disable=too-few-public-methods
-    """ LocalDictionary from local file """
+    @property
+    def word_list(self) -> Tuple[str, ...]:
+        """ Read-only view of the words in dictionary order, decoded on first use. """
+
+        if self._decoded_words is None:
+
+            rows = self._ascii_rows()
+
+            if rows is None:
+                stored_words = list(self._packed.iter_words(self._word_len))
+                self._decoded_words = tuple(
+                    stored_words[ind] for ind in self._order.tolist()
+                )
+            else:
+                text = rows.tobytes().decode("ascii")
+                self._decoded_words = tuple(
+                    text[start : start + self._word_len]
+                    for start in range(0, len(text), self._word_len)
+                )
+
+        return self._decoded_words
+
+    def word(self, word_id: int) -> str:
+        """
+        Args:
+            word_id: Stable integer ID of a word.
+        Returns:
+            The word, the same string object on every call.
+        """
+
+        if self._decoded_words is not None:
+            return self._decoded_words[word_id]
+
+        word = self._decoded.get(word_id)
 
-    def __init__(self) -> None:  # pylint: disable=super-init-not-called
-        raise NotImplementedError
+        if word is None:
+            record = self._packed.packed(self._word_len)[self._order[word_id]]
+            word = record.tobytes().rstrip(b"\0").decode("utf-8")
+            self._decoded[word_id] = word
+
+        return word
+
+    def word_id(self, word: str) -> int:
+        """
+        Args:
+            word: Word in the dictionary.
+        Returns:
+            Stable integer ID of the word.
+        Raises:
+            KeyError if the word is not in the dictionary.
+        """
+
+        word_id = self._find(word)
+
+        if word_id < 0:
+            raise KeyError(word)
+
+        return word_id
+
+    def _ascii_rows(self) -> Optional[np.ndarray]:
+        """
+        Words as (n_words, word_len) bytes in dictionary order, None unless
+        every word is ASCII, i.e. stored without padding.
+        """
+
+        packed = self._packed.packed(self._word_len)
+
+        if packed.shape[1] != self._word_len:
+            return None
+
+        return packed[self._order]
+
+    def _encode_words(self) -> Tuple[List[str], np.ndarray]:
+        """ Sorted alphabet and encoded word array, from the packed bytes. """
+
+        rows = self._ascii_rows()
+
+        if rows is None:
+            return super()._encode_words()
+
+        return Dictionary._encode_code_points(rows.ravel(), len(rows), self._word_len)
+
+    def _find(self, word: str) -> int:
+        """
+        Binary search the packed index, remembering words found.
+
+        Args:
+            word: Word to look up.
+        Returns:
+            Word ID, the lowest for duplicates, -1 if not in the dictionary.
+        """
+
+        word_id = self._word_ids.get(word)
+
+        if word_id is not None:
+            return word_id
+
+        if len(word) != self._word_len:
+            return -1
+
+        sorted_words, sorted_order = self._packed.sorted_index(self._word_len)
+        key = word.encode("utf-8")
+
+        start = int(np.searchsorted(sorted_words, key))
+        end = int(np.searchsorted(sorted_words, key, side="right"))
+
+        if start == end:
+            return -1
+
+        if self._word_ranks is None:
+            self._word_ranks = np.empty(len(self._order), dtype=np.int64)
+            self._word_ranks[self._order] = np.arange(len(self._order))
+
+        word_id = int(self._word_ranks[sorted_order[start:end]].min())
+        self._word_ids[word] = word_id
+
+        return word_id
+
+    @property
+    def column_names(self) -> List[str]:
+        """ Names of the stored and attached score columns. """
+
+        return self._packed.column_names + [
+            name
+            for name in super().column_names
+            if name not in self._packed.column_names
+        ]
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Args:
+            name: stored or attached column name, e.g. frequency.
+        Returns:
+            Read-only values aligned to word IDs.
+        Raises:
+            KeyError if no such column is stored or attached.
+        """
+
+        if name not in self._columns and name in self._packed.column_names:
+            values = self._packed.column(self._word_len, name)[self._order]
+            values.flags.writeable = False
+
+            # stored columns are gathered once, later lookups are hot path
+            self._columns[name] = values
+
+        return super().column(name)
+
+    @staticmethod
+    def convert_json(
+        json_path: pathlib.Path,
+        packed_path: pathlib.Path,
+        seed: Optional[int] = None,
+        columns: Optional[Dict[str, Dict[str, float]]] = None,
+    ) -> None:
+        """
+        Convert a JSON dictionary, as downloaded by RemoteDictionary, to the
+        packed format.
+
+        Args:
+            json_path: JSON file with key for words, arbitrary values.
+            packed_path: destination packed file.
+            seed: optional seed whose shuffle order is stored.
+            columns: optional column name -> {word: value}, missing words get 0.
+        """
+
+        text = pathlib.Path(json_path).read_text(encoding="utf-8")
+        word_list = RemoteDictionary._list_from_json(  # pylint: disable=protected-access
+            text
+        )
+
+        write_packed_dictionary(
+            word_list,
+            pathlib.Path(packed_path),
+            seed=seed,
+            columns={
+                name: [values.get(word, 0.0) for word in word_list]
+                for name, values in (columns or {}).items()
+            },
+        )
 
 
 class RemoteDictionary(Dictionary):  # pylint: disable=too-few-public-methods
     """ RemoteDictionary from remote source """
 
     def __init__(
-        self, remote_source: str, word_len: int, seed: Optional[int] = None
+        self,
+        remote_source: str,
+        word_len: int,
+        seed: Optional[int] = None,
+        cache_dir: Optional[pathlib.Path] = None,
     ) -> None:
         """
         Args:
@@ -110,38 +670,121 @@ class RemoteDictionary(Dictionary):  # pylint: disable=too-few-public-methods
             word_len: filter to apply to word length.
             seed: optional randomization seed to apply.
                 NOTE! The default value is None and will result in no shuffle!
+            cache_dir: directory of the download cache, see get_cache_dir.
         """
 
-        word_list = RemoteDictionary._get_remote_source(remote_source)
+        word_list = RemoteDictionary._get_remote_source(remote_source, cache_dir)
 
         super().__init__(word_list=word_list, word_len=word_len, seed=seed)
 
     @staticmethod
-    def _get_remote_source(remote_source: str) -> List[str]:
+    def _get_remote_source(
+        remote_source: str,
+        cache_dir: Optional[pathlib.Path] = None,
+        timeout: float = 30.0,
+    ) -> List[str]:
         """
         Download data from remote dictionary file.
+        Parsed word lists are cached on disk under the hash of the downloaded
+        content. A cached copy is revalidated with a conditional request and
+        reused if unchanged, or if the remote cannot be reached.
 
         Args:
             remote_source: URL of remote.
+            cache_dir: directory of the download cache, see get_cache_dir.
+            timeout: seconds to wait for the remote.
         Returns:
             Word list.
         """
 
-        return {".json": RemoteDictionary._list_from_json(remote_source)}[
+        import requests  # pylint: disable=import-outside-toplevel
+
+        parse = {".json": RemoteDictionary._list_from_json}[
             pathlib.Path(remote_source).suffix
         ]
 
+        cache_dir = get_cache_dir(cache_dir)
+        url_hash = hashlib.sha256(remote_source.encode()).hexdigest()
+        meta_path = cache_dir / f"remote-{url_hash}.json"
+
+        meta: Dict[str, Any] = {}
+        cached_path: Optional[pathlib.Path] = None
+
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            cached_path = cache_dir / f"words-{meta['content_hash']}.txt"
+
+            if not cached_path.exists():
+                meta, cached_path = {}, None
+
+        headers = {}
+
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            response = _get_session().get(
+                remote_source, headers=headers, timeout=timeout
+            )
+            response.raise_for_status()
+
+        except requests.RequestException as exception:
+            if cached_path is None:
+                raise
+
+            log.warning(
+                "Using cached %s, remote unavailable: %s", remote_source, exception
+            )
+            return RemoteDictionary._read_cached(cached_path)
+
+        if cached_path is not None and response.status_code == 304:
+            log.debug("Cached %s is up to date", remote_source)
+            return RemoteDictionary._read_cached(cached_path)
+
+        word_list = parse(response.text)
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        atomic_write_bytes(
+            cache_dir / f"words-{content_hash}.txt", "\n".join(word_list).encode()
+        )
+
+        meta = {
+            "remote_source": remote_source,
+            "content_hash": content_hash,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        atomic_write_bytes(meta_path, json.dumps(meta).encode())
+
+        return word_list
+
+    @staticmethod
+    def _read_cached(cached_path: pathlib.Path) -> List[str]:
+        """
+        Args:
+            cached_path: cached word list file, one word per line.
+        Returns:
+            Word list.
+        """
+
+        text = cached_path.read_text(encoding="utf-8")
+
+        return text.split("\n") if text else []
+
     @staticmethod
-    def _list_from_json(remote_source: str) -> List[str]:
+    def _list_from_json(text: str) -> List[str]:
         """
-        Download JSON dictionary with key for words, arbitrary values.
+        Parse JSON dictionary with key for words, arbitrary values.
 
         Args:
-            remote_source: URL of remote JSON.
+            text: contents of remote JSON.
         Returns:
             Word list.
         """
 
-        text = json.loads(requests.get(remote_source).text)
+        words = json.loads(text)
 
-        return [word.lower() for word in sorted(text.keys()) if word.isalpha()]
+        return [word.lower() for word in sorted(words.keys()) if word.isalpha()]
@@ -0,0 +1,97 @@
+"""
+Classes to index dictionary words by letter for fast candidate filtering.
+"""
+
+from typing import Dict, Sequence
+
+import numpy as np
+
+
+class LetterIndex:
+    """ Word masks per (letter, position) and per (letter, minimum count) """
+
+    def __init__(self, encoded: np.ndarray, alphabet: Sequence[str]) -> None:
+        """
+        Args:
+            encoded: Encoded dictionary words, shape (n_words, word_len).
+            alphabet: Letter for each encoded value.
+        """
+
+        n_words, word_len = encoded.shape
+        word_inds = np.arange(n_words)
+
+        self._n_words = n_words
+        self._word_len = word_len
+        self._letter_ids: Dict[str, int] = {
+            letter: ind for ind, letter in enumerate(alphabet)
+        }
+
+        # at_position[position, letter] marks words with letter at position
+        self._at_position = np.zeros((word_len, len(alphabet), n_words), dtype=bool)
+
+        for position in range(word_len):
+            self._at_position[position, encoded[:, position], word_inds] = True
+
+        # at_least[letter, count] marks words with at least count copies of letter
+        counts = self._at_position.sum(axis=0)
+        self._at_least = counts[:, None, :] >= np.arange(word_len + 1)[None, :, None]
+
+        self._none = np.zeros(n_words, dtype=bool)
+        self._all = np.ones(n_words, dtype=bool)
+
+        for mask in (self._at_position, self._at_least, self._none, self._all):
+            mask.flags.writeable = False
+
+    def __len__(self) -> int:
+        return self._n_words
+
+    def full(self) -> np.ndarray:
+        """ New writable mask selecting every word. """
+
+        return self._all.copy()
+
+    def at_position(self, letter: str, position: int) -> np.ndarray:
+        """
+        Args:
+            letter: Single character.
+            position: Letter position in word.
+        Returns:
+            Read-only mask of words with letter at position.
+        """
+
+        letter_id = self._letter_ids.get(letter)
+
+        if letter_id is None:
+            return self._none
+
+        return self._at_position[position, letter_id]
+
+    def at_least(self, letter: str, count: int) -> np.ndarray:
+        """
+        Args:
+            letter: Single character.
+            count: Minimum number of copies.
+        Returns:
+            Read-only mask of words with at least count copies of letter.
+        """
+
+        if count <= 0:
+            return self._all
+
+        letter_id = self._letter_ids.get(letter)
+
+        if letter_id is None or count > self._word_len:
+            return self._none
+
+        return self._at_least[letter_id, count]
+
+    def exactly(self, letter: str, count: int) -> np.ndarray:
+        """
+        Args:
+            letter: Single character.
+            count: Exact number of copies.
+        Returns:
+            New mask of words with exactly count copies of letter.
+        """
+
+        return self.at_least(letter, count) & ~self.at_least(letter, count + 1)
@@ -0,0 +1,395 @@
+"""
+Classes to read and write the packed binary dictionary format.
+
+A packed file is the magic bytes, a little-endian uint32 header length, a
+JSON header and 8 byte aligned sections. Words are grouped by length and
+stored as fixed-width, null padded UTF-8 bytes in input order, alongside
+the seeded shuffle order, a byte sorted copy of the words with their input
+positions for lookups, and optional float32 columns such as frequency.
+"""
+
+import json
+import mmap
+import pathlib
+import random
+import struct
+import tempfile
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"WRDLPACK"
+VERSION = 2
+ALIGNMENT = 8
+
+
+def _aligned(offset: int) -> int:
+    """ Round offset up to the section alignment. """
+
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def shuffle_order(n_words: int, seed: Optional[int]) -> np.ndarray:
+    """
+    Permutation applied by Dictionary._randomize to a list of n_words.
+
+    Args:
+        n_words: number of words.
+        seed: optional randomization seed, None keeps input order.
+    Returns:
+        Word positions in shuffled order.
+    """
+
+    order = list(range(n_words))
+
+    if seed is not None:
+        random.Random(seed).shuffle(order)
+
+    return np.array(order, dtype=np.uint32)
+
+
+def write_packed_dictionary(  # pylint: disable=too-many-locals
+    words: Iterable[str],
+    path: pathlib.Path,
+    seed: Optional[int] = None,
+    columns: Optional[Dict[str, Iterable[float]]] = None,
+) -> None:
+    """
+    Stream words into a packed dictionary file.
+    Words are spooled to temporary files per length, so the input is never
+    held in memory as Python strings.
+
+    Args:
+        words: words in the order to store them.
+        path: destination file.
+        seed: optional seed whose shuffle order is stored with each group.
+        columns: optional per word values, each aligned with words.
+    Raises:
+        ValueError if a column is shorter or longer than words.
+    """
+
+    columns = columns or {}
+    column_names = sorted(columns)
+    column_iters = [iter(columns[name]) for name in column_names]
+
+    # word length -> [count, max byte width, word spool, column spools]
+    spools: Dict[int, List[Any]] = {}
+
+    try:
+        for word in words:
+
+            encoded = word.encode("utf-8")
+
+            if len(word) not in spools:
+                spools[len(word)] = [
+                    0,
+                    0,
+                    tempfile.TemporaryFile(),
+                    [tempfile.TemporaryFile() for _ in column_names],
+                ]
+
+            group = spools[len(word)]
+            group[0] += 1
+            group[1] = max(group[1], len(encoded), 1)
+            group[2].write(encoded + b"\n")
+
+            for name, column_iter, column_spool in zip(
+                column_names, column_iters, group[3]
+            ):
+                value = next(column_iter, None)
+
+                if value is None:
+                    raise ValueError(f"Column {name} is shorter than the word list")
+
+                column_spool.write(struct.pack("<f", value))
+
+        for name, column_iter in zip(column_names, column_iters):
+            if next(column_iter, None) is not None:
+                raise ValueError(f"Column {name} is longer than the word list")
+
+        _assemble(path, seed, column_names, spools)
+
+    finally:
+        for _, _, word_spool, column_spools in spools.values():
+            word_spool.close()
+
+            for column_spool in column_spools:
+                column_spool.close()
+
+
+def _assemble(
+    path: pathlib.Path,
+    seed: Optional[int],
+    column_names: List[str],
+    spools: Dict[int, List[Any]],
+) -> None:
+    """
+    Lay out spooled groups into the packed file.
+
+    Args:
+        path: destination file.
+        seed: optional seed whose shuffle order is stored with each group.
+        column_names: names of the spooled columns.
+        spools: word length -> [count, max byte width, word spool, column spools].
+    """
+
+    groups, sections = _layout(seed, column_names, spools)
+    header = json.dumps(
+        {"version": VERSION, "seed": seed, "columns": column_names, "groups": groups}
+    ).encode("utf-8")
+
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    _write_sections(tmp_path, header, sections)
+    tmp_path.replace(path)
+
+
+def _layout(
+    seed: Optional[int], column_names: List[str], spools: Dict[int, List[Any]]
+) -> Tuple[Dict[str, Dict[str, Any]], List[Tuple[int, str, Any]]]:
+    """
+    Args:
+        seed: optional seed whose shuffle order is stored with each group.
+        column_names: names of the spooled columns.
+        spools: word length -> [count, max byte width, word spool, column spools].
+    Returns:
+        Header entry of each group, and the (offset, kind, source) of each
+        section in file order, offsets relative to the end of the header.
+    """
+
+    groups: Dict[str, Dict[str, Any]] = {}
+    sections: List[Tuple[int, str, Any]] = []
+    offset = 0
+
+    def _add_section(kind: str, source: Any, n_bytes: int) -> int:
+        nonlocal offset
+        section_offset = offset
+        sections.append((section_offset, kind, source))
+        offset = _aligned(offset + n_bytes)
+        return section_offset
+
+    for word_len, (count, width, word_spool, column_spools) in sorted(spools.items()):
+
+        group: Dict[str, Any] = {"count": count, "width": width}
+        group["words"] = _add_section("words", (word_spool, width), count * width)
+        group["order"] = _add_section("order", (count, seed), count * 4)
+        group["sorted_words"] = _add_section("sorted_words", word_len, count * width)
+        group["sorted_order"] = _add_section("sorted_order", word_len, count * 4)
+        group["columns"] = {
+            name: _add_section("column", column_spool, count * 4)
+            for name, column_spool in zip(column_names, column_spools)
+        }
+
+        groups[str(word_len)] = group
+
+    return groups, sections
+
+
+def _write_sections(
+    path: pathlib.Path, header: bytes, sections: List[Tuple[int, str, Any]]
+) -> None:
+    """
+    Args:
+        path: destination file.
+        header: JSON header.
+        sections: (offset, kind, source) of each section, see _layout.
+    """
+
+    data_start = _aligned(len(MAGIC) + 4 + len(header))
+
+    # the latest group's padded records, sorted once its words are written
+    records = np.zeros(0, dtype="S1")
+    sorted_order = np.zeros(0, dtype=np.uint32)
+
+    with open(path, "wb") as file:
+
+        file.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+        for section_offset, kind, source in sections:
+
+            file.write(b"\0" * (data_start + section_offset - file.tell()))
+
+            if kind == "words":
+                records = _copy_padded_words(file, *source)
+                sorted_order = np.argsort(records, kind="stable").astype(np.uint32)
+            elif kind == "order":
+                file.write(shuffle_order(*source).tobytes())
+            elif kind == "sorted_words":
+                file.write(records[sorted_order].tobytes())
+            elif kind == "sorted_order":
+                file.write(sorted_order.tobytes())
+            else:
+                source.seek(0)
+                file.write(source.read())
+
+
+def _copy_padded_words(
+    file: IO[bytes], word_spool: IO[bytes], width: int
+) -> np.ndarray:
+    """
+    Copy spooled newline separated words as fixed-width records.
+
+    Args:
+        file: destination file.
+        word_spool: spooled words, one per line.
+        width: record width in bytes.
+    Returns:
+        The records as a fixed-width bytes array, to sort for lookups.
+    """
+
+    word_spool.seek(0)
+    records = bytearray()
+
+    for line in word_spool:
+        records += line[:-1].ljust(width, b"\0")
+
+    file.write(records)
+
+    return np.frombuffer(bytes(records), dtype=f"S{width}")
+
+
+class PackedWords:
+    """ Read-only memory-mapped view of a packed dictionary file """
+
+    def __init__(self, path: pathlib.Path) -> None:
+        """
+        Args:
+            path: packed dictionary file.
+        """
+
+        self._path = pathlib.Path(path)
+
+        with open(self._path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self._path} is not a packed dictionary")
+
+        (header_len,) = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        self._header = json.loads(
+            self._mmap[header_start : header_start + header_len].decode("utf-8")
+        )
+        self._data_start = _aligned(header_start + header_len)
+
+        if self._header["version"] != VERSION:
+            raise ValueError(
+                f"Unsupported packed version {self._header['version']}, rewrite "
+                f"{self._path} with write_packed_dictionary"
+            )
+
+    def __getstate__(self):
+        # the mapping is re-opened by path in other processes
+        return {"path": self._path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])  # pylint: disable=unnecessary-dunder-call
+
+    @property
+    def column_names(self) -> List[str]:  # pylint: disable=missing-function-docstring
+        return list(self._header["columns"])
+
+    @property
+    def seed(self) -> Optional[int]:
+        """ Seed of the stored shuffle order. """
+
+        return self._header["seed"]
+
+    @property
+    def word_lens(self) -> List[int]:  # pylint: disable=missing-function-docstring
+        return sorted(int(word_len) for word_len in self._header["groups"])
+
+    def column(self, word_len: int, name: str) -> np.ndarray:
+        """
+        Args:
+            word_len: word length group.
+            name: column name.
+        Returns:
+            Read-only float32 values in stored word order.
+        """
+
+        group = self._group(word_len)
+
+        if group is None:
+            return np.zeros(0, dtype=np.float32)
+
+        return self._section(group["columns"][name], np.float32, group["count"])
+
+    def order(self, word_len: int) -> np.ndarray:
+        """
+        Args:
+            word_len: word length group.
+        Returns:
+            Read-only stored word positions in the shuffle order of seed.
+        """
+
+        group = self._group(word_len)
+
+        if group is None:
+            return np.zeros(0, dtype=np.uint32)
+
+        return self._section(group["order"], np.uint32, group["count"])
+
+    def packed(self, word_len: int) -> np.ndarray:
+        """
+        Args:
+            word_len: word length group.
+        Returns:
+            Read-only (n_words, width) uint8 view of the null padded words.
+        """
+
+        group = self._group(word_len)
+
+        if group is None:
+            return np.zeros((0, word_len), dtype=np.uint8)
+
+        flat = self._section(group["words"], np.uint8, group["count"] * group["width"])
+
+        return flat.reshape(group["count"], group["width"])
+
+    def sorted_index(self, word_len: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Lookup index of a length group, for binary search with searchsorted.
+
+        Args:
+            word_len: word length group.
+        Returns:
+            Read-only fixed-width bytes of the words in byte order, and the
+            stored position of each, duplicates by position.
+        """
+
+        group = self._group(word_len)
+
+        if group is None:
+            return np.zeros(0, dtype=f"S{word_len}"), np.zeros(0, dtype=np.uint32)
+
+        dtype = f"S{group['width']}"
+
+        return (
+            self._section(group["sorted_words"], dtype, group["count"]),
+            self._section(group["sorted_order"], np.uint32, group["count"]),
+        )
+
+    def iter_words(self, word_len: int) -> Iterator[str]:
+        """
+        Decode words of a length group one at a time.
+
+        Args:
+            word_len: word length group.
+        Returns:
+            Iterator of words in stored order.
+        """
+
+        for record in self.packed(word_len):
+            yield record.tobytes().rstrip(b"\0").decode("utf-8")
+
+    def _group(self, word_len: int) -> Optional[Dict[str, Any]]:
+        """ Header entry of a length group, if any words have that length. """
+
+        return self._header["groups"].get(str(word_len))
+
+    def _section(self, offset: int, dtype: Any, count: int) -> np.ndarray:
+        """ Zero-copy view of a section. """
+
+        return np.frombuffer(
+            self._mmap, dtype=dtype, count=count, offset=self._data_start + offset
+        )
@@ -1,3 +1,14 @@
 # pylint: disable=missing-module-docstring
+from .wordle_adversarial_game import AdversarialGame
+from .wordle_batch_game import BatchGame
+from .wordle_candidates import CandidateView
+from .wordle_events import GameObserver, LoggingObserver
+from .wordle_feedback import (
+    FeedbackMatrix,
+    decode_pattern,
+    encode_pattern,
+    pattern_code,
+)
 from .wordle_game import Game
-from .wordle_words import GuessWord, LetterState, TargetWord, Word
+from .wordle_multi_game import MultiGame
+from .wordle_words import GuessWord, LetterState, TargetWord, Word, guess_word_id
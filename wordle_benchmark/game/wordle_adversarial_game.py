@@ -0,0 +1,141 @@
+"""
+Classes to play Absurdle style games, where the target is only chosen as
+late as possible to make the guesser's life hard.
+"""
+
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+import numpy as np
+
+from wordle_benchmark.game.wordle_candidates import CandidateView
+from wordle_benchmark.game.wordle_feedback import PATTERN_BASE, compute_patterns
+from wordle_benchmark.game.wordle_game import Game, get_default_dictionary
+from wordle_benchmark.game.wordle_words import TargetWord
+
+if TYPE_CHECKING:
+
+    from wordle_benchmark.dictionary.wordle_dictionary import Dictionary
+    from wordle_benchmark.game.wordle_events import GameObserver
+    from wordle_benchmark.game.wordle_feedback import FeedbackMatrix
+    from wordle_benchmark.instrumentation import Instrumentation
+
+
+class AdversarialGame(Game):
+    """ Game without a fixed target, feedback keeps the most candidates alive """
+
+    __slots__ = ("_candidate_ids", "_kept_ids", "_mask_stale")
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        dictionary: Optional["Dictionary"] = None,
+        max_guesses: int = 6,
+        feedback: Optional["FeedbackMatrix"] = None,
+        instrumentation: Optional["Instrumentation"] = None,
+        hard_mode: bool = False,
+        observers: Optional[Sequence["GameObserver"]] = None,
+    ):
+        """
+        Args:
+            dictionary: Wordle dictionary, get_default_dictionary() by default.
+                Every word is a possible target.
+            max_guesses: max number guesses.
+            feedback: optional precomputed feedback table for the dictionary.
+            instrumentation: optional recorder of validation, scoring and
+                filtering time per turn.
+            hard_mode: whether guesses must keep revealed greens in place and
+                reuse revealed yellows.
+            observers: optional subscribers to game events. No target exists
+                before the first guess, so the start event reports "?" for
+                every letter. Later events report a word still consistent
+                with every feedback.
+        """
+
+        if dictionary is None:
+            dictionary = get_default_dictionary()
+
+        super().__init__(
+            "?" * dictionary.word_len,
+            dictionary=dictionary,
+            max_guesses=max_guesses,
+            feedback=feedback,
+            instrumentation=instrumentation,
+            hard_mode=hard_mode,
+            observers=observers,
+        )
+
+        # live candidate word IDs, the mask is only rebuilt when read
+        self._candidate_ids = dictionary.word_ids
+        self._kept_ids = self._candidate_ids
+        self._mask_stale = False
+
+    @property
+    def candidates(self) -> np.ndarray:
+        """ Read-only dictionary mask of words consistent with every guess so far. """
+
+        self._refresh_mask()
+
+        return super().candidates
+
+    @property
+    def candidate_view(self) -> CandidateView:
+        """ Lazy snapshot of the words consistent with every guess so far. """
+
+        self._refresh_mask()
+
+        return super().candidate_view
+
+    def _compare(self, guess: str) -> int:
+        """
+        Score a guess against every live candidate at once and answer with the
+        feedback shared by the most candidates, avoiding a win on ties.
+        Cost scales with the number of candidates, not the dictionary size.
+
+        Args:
+            guess: Word guessed by user, already validated.
+        Returns:
+            Pattern code.
+        """
+
+        dictionary = self._dictionary
+        guess_id = dictionary.word_id(guess)
+        candidate_ids = self._candidate_ids
+
+        if self._feedback is not None:
+            codes = self._feedback.table[guess_id, candidate_ids]
+        else:
+            encoded = dictionary.encoded
+            codes = compute_patterns(encoded[guess_id][None, :], encoded[candidate_ids])
+
+        # doubled so that losing the all green bucket only breaks ties
+        bucket_scores = 2 * np.bincount(codes, minlength=PATTERN_BASE ** self._word_len)
+        bucket_scores[self._all_green] -= 1
+        code = int(np.argmax(bucket_scores))
+
+        self._kept_ids = candidate_ids[codes == code]
+        self._target_word = TargetWord(dictionary.word(int(self._kept_ids[0])))
+
+        return code
+
+    def _narrow_candidates(self, guess: str, digits: List[int]) -> None:
+        """
+        Drop the candidates outside the chosen feedback bucket.
+
+        Args:
+            guess: Latest guess word.
+            digits: Feedback digit of each letter of the latest guess.
+        """
+
+        del guess, digits
+
+        self._candidate_ids = self._kept_ids
+        self._mask_stale = True
+        self._candidate_view = None
+        self._possible_words = None
+
+    def _refresh_mask(self) -> None:
+        """ Rebuild the candidate mask from the live candidate IDs, if stale. """
+
+        if self._mask_stale:
+            self._candidates[:] = False
+            self._candidates[self._candidate_ids] = True
+            self._mask_stale = False
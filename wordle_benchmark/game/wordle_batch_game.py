@@ -0,0 +1,260 @@
+"""
+Classes to play many Wordle games in lockstep for vectorized agents.
+"""
+
+import logging
+from typing import TYPE_CHECKING, Optional, Sequence, Union
+
+import numpy as np
+
+from wordle_benchmark.game.wordle_feedback import (
+    all_green_code,
+    compute_patterns,
+    pattern_dtype,
+)
+from wordle_benchmark.game.wordle_game import (
+    MAX_ILLEGAL_GUESSES,
+    get_default_dictionary,
+)
+from wordle_benchmark.game.wordle_words import guess_word_id
+
+if TYPE_CHECKING:
+
+    from wordle_benchmark.dictionary.wordle_dictionary import Dictionary
+    from wordle_benchmark.game.wordle_feedback import FeedbackMatrix
+
+log = logging.getLogger(__name__)
+
+
+class BatchGame:  # pylint: disable=too-many-instance-attributes
+    """ Logic for a batch of games advanced one turn at a time """
+
+    def __init__(
+        self,
+        target_words: Sequence[str],
+        dictionary: Optional["Dictionary"] = None,
+        max_guesses: int = 6,
+        feedback: Optional["FeedbackMatrix"] = None,
+        chunk_size: int = 64,
+    ):
+        """
+        Args:
+            target_words: target word of each game, all in the dictionary.
+            dictionary: Wordle dictionary, get_default_dictionary() by default.
+            max_guesses: max number guesses, as for Game.
+            feedback: optional precomputed feedback table for the dictionary.
+            chunk_size: number of games whose candidates are scored at a time
+                when no feedback table is given.
+        """
+
+        if dictionary is None:
+            dictionary = get_default_dictionary()
+
+        if feedback is not None and feedback.content_hash != dictionary.content_hash:
+            raise ValueError("Feedback table was built for a different dictionary")
+
+        missing = [word for word in target_words if word not in dictionary]
+
+        if missing:
+            raise ValueError(f"Target words not in the dictionary: {missing}")
+
+        n_games = len(target_words)
+        word_len = dictionary.word_len
+
+        self._dictionary = dictionary
+        self._feedback = feedback
+        self._max_guesses = max_guesses
+        self._chunk_size = chunk_size
+        self._all_green = all_green_code(word_len)
+
+        self._target_ids = np.array(
+            [dictionary.word_id(word) for word in target_words], dtype=np.int64
+        )
+
+        # one column per turn, Game accepts up to max_guesses + 1 guesses
+        self._guesses = np.full((n_games, max_guesses + 1), -1, dtype=np.int64)
+        self._feedback_codes = np.zeros(
+            (n_games, max_guesses + 1), dtype=pattern_dtype(word_len)
+        )
+        self._candidates = np.ones((n_games, len(dictionary)), dtype=bool)
+        self._n_guesses = np.zeros(n_games, dtype=np.int64)
+        self._finished = np.zeros(n_games, dtype=bool)
+        self._success = np.zeros(n_games, dtype=bool)
+        self._n_illegal = np.zeros(n_games, dtype=np.int64)
+        self._forfeit = np.zeros(n_games, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._target_ids)
+
+    @property
+    def active(self) -> np.ndarray:
+        """ Indices of unfinished games, the order guesses are expected in. """
+
+        return np.flatnonzero(~self._finished)
+
+    @property
+    def candidates(self) -> np.ndarray:
+        """ Read-only (n_games, n_words) mask of words still possible per game. """
+
+        return BatchGame._read_only(self._candidates)
+
+    @property
+    def dictionary(self) -> "Dictionary":  # pylint: disable=missing-function-docstring
+        return self._dictionary
+
+    @property
+    def feedback_codes(self) -> np.ndarray:
+        """ Read-only (n_games, max_guesses + 1) pattern codes, 0 past n_guesses. """
+
+        return BatchGame._read_only(self._feedback_codes)
+
+    @property
+    def finished(self) -> np.ndarray:
+        """ Read-only mask of finished games. """
+
+        return BatchGame._read_only(self._finished)
+
+    @property
+    def forfeit(self) -> np.ndarray:
+        """ Read-only mask of games given up after MAX_ILLEGAL_GUESSES illegal guesses. """
+
+        return BatchGame._read_only(self._forfeit)
+
+    @property
+    def guesses(self) -> np.ndarray:
+        """ Read-only (n_games, max_guesses + 1) guess word IDs, -1 past n_guesses. """
+
+        return BatchGame._read_only(self._guesses)
+
+    @property
+    def max_guesses(self) -> int:  # pylint: disable=missing-function-docstring
+        return self._max_guesses
+
+    @property
+    def n_guesses(self) -> np.ndarray:
+        """ Read-only number of guesses so far per game. """
+
+        return BatchGame._read_only(self._n_guesses)
+
+    @property
+    def success(self) -> np.ndarray:
+        """ Read-only mask of games whose most recent guess was correct. """
+
+        return BatchGame._read_only(self._success)
+
+    def step(self, guesses: Sequence[Union[str, int]]) -> None:
+        """
+        Register one guess per active game and advance the batch a turn.
+        Guesses outside the dictionary are ignored, as Game does, and the
+        game waits for another guess on the next step. A game is given up,
+        finished as a forfeit, after MAX_ILLEGAL_GUESSES illegal guesses in
+        a row.
+
+        Args:
+            guesses: Guess words or word IDs, ordered as the active property.
+        """
+
+        active = self.active
+
+        if len(guesses) != len(active):
+            raise ValueError(f"Expected {len(active)} guesses, got {len(guesses)}")
+
+        guess_ids = np.array(
+            [guess_word_id(guess, self._dictionary) for guess in guesses],
+            dtype=np.int64,
+        ).reshape(-1)
+        valid = guess_ids >= 0
+
+        if not valid.all():
+            log.warning("Ignoring %d guesses not in the dictionary", (~valid).sum())
+            self._count_illegal(active[~valid])
+
+        self._n_illegal[active[valid]] = 0
+        games, guess_ids = active[valid], guess_ids[valid]
+        codes = self._score(guess_ids, self._target_ids[games])
+
+        turns = self._n_guesses[games]
+        self._guesses[games, turns] = guess_ids
+        self._feedback_codes[games, turns] = codes
+        self._n_guesses[games] += 1
+
+        self._narrow_candidates(games, guess_ids, codes)
+
+        self._success[games] = codes == self._all_green
+        self._finished[games] = self._success[games] | (
+            self._n_guesses[games] > self._max_guesses
+        )
+
+    def _count_illegal(self, games: np.ndarray) -> None:
+        """
+        Count an illegal guess for each game, forfeiting those that reach
+        MAX_ILLEGAL_GUESSES in a row. A deterministic agent would repeat its
+        illegal guess forever.
+
+        Args:
+            games: Indices of games whose guess was ignored.
+        """
+
+        self._n_illegal[games] += 1
+        given_up = games[self._n_illegal[games] >= MAX_ILLEGAL_GUESSES]
+
+        if len(given_up) > 0:
+            log.warning(
+                "Gave up %d games after %d illegal guesses in a row",
+                len(given_up),
+                MAX_ILLEGAL_GUESSES,
+            )
+            self._forfeit[given_up] = True
+            self._finished[given_up] = True
+
+    def _narrow_candidates(
+        self, games: np.ndarray, guess_ids: np.ndarray, codes: np.ndarray
+    ) -> None:
+        """
+        Remove candidate words that would not have produced the observed codes.
+
+        Args:
+            games: Indices of games that registered a guess.
+            guess_ids: Guess word ID per game.
+            codes: Observed pattern code per game.
+        """
+
+        if self._feedback is not None:
+            self._candidates[games] &= self._feedback.table[guess_ids] == codes[:, None]
+            return
+
+        encoded = self._dictionary.encoded
+
+        for start in range(0, len(games), self._chunk_size):
+            chunk = slice(start, start + self._chunk_size)
+            patterns = compute_patterns(
+                encoded[guess_ids[chunk], None, :], encoded[None, :, :]
+            )
+            self._candidates[games[chunk]] &= patterns == codes[chunk, None]
+
+    def _score(self, guess_ids: np.ndarray, target_ids: np.ndarray) -> np.ndarray:
+        """
+        Pairwise pattern codes of guesses against targets.
+
+        Args:
+            guess_ids: Guess word IDs.
+            target_ids: Target word IDs, same length.
+        Returns:
+            Pattern code per pair.
+        """
+
+        if self._feedback is not None:
+            return self._feedback.table[guess_ids, target_ids]
+
+        encoded = self._dictionary.encoded
+
+        return compute_patterns(encoded[guess_ids], encoded[target_ids])
+
+    @staticmethod
+    def _read_only(array: np.ndarray) -> np.ndarray:
+        """ Read-only view of internal state. """
+
+        view = array.view()
+        view.flags.writeable = False
+
+        return view
@@ -0,0 +1,111 @@
+"""
+Classes to inspect the words still possible in a game without building a
+list of strings.
+"""
+
+from typing import TYPE_CHECKING, Iterator, List, Optional, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from wordle_benchmark.dictionary.wordle_dictionary import Dictionary
+
+
+class CandidateView:
+    """ Lazy snapshot of the words still possible, strings built on demand """
+
+    __slots__ = ("_dictionary", "_mask", "_ids", "_words")
+
+    def __init__(self, dictionary: "Dictionary", mask: np.ndarray):
+        """
+        Args:
+            dictionary: Wordle dictionary the mask is over.
+            mask: dictionary mask of possible words, not modified afterwards.
+        """
+
+        mask.flags.writeable = False
+
+        self._dictionary = dictionary
+        self._mask = mask
+        self._ids: Optional[np.ndarray] = None
+        self._words: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        if self._ids is not None:
+            return len(self._ids)
+
+        return int(np.count_nonzero(self._mask))
+
+    def __contains__(self, word: Union[str, int]) -> bool:
+        """
+        Args:
+            word: Word or word ID.
+        Returns:
+            Whether the word is still possible.
+        """
+
+        if isinstance(word, str):
+            return word in self._dictionary and bool(
+                self._mask[self._dictionary.word_id(word)]
+            )
+
+        return 0 <= word < len(self._mask) and bool(self._mask[word])
+
+    def __getitem__(self, ind: int) -> str:
+        """
+        Args:
+            ind: Position among the candidates, in dictionary order.
+        Returns:
+            The candidate word, e.g. view[0] for the first one.
+        """
+
+        return self._dictionary.word(int(self.ids[ind]))
+
+    def __iter__(self) -> Iterator[str]:
+        word_list = self._dictionary.word_list
+
+        for word_id in self.ids.tolist():
+            yield word_list[word_id]
+
+    def __repr__(self) -> str:
+        return f"CandidateView({len(self)} of {len(self._mask)} words)"
+
+    @property
+    def ids(self) -> np.ndarray:
+        """ Read-only sorted word IDs of the candidates. """
+
+        if self._ids is None:
+            self._ids = np.flatnonzero(self._mask)
+            self._ids.flags.writeable = False
+
+        return self._ids
+
+    @property
+    def mask(self) -> np.ndarray:
+        """ Read-only dictionary mask of the candidates. """
+
+        return self._mask
+
+    def top_k(self, column: str, k: int = 1) -> List[str]:
+        """
+        Args:
+            column: dictionary score column, see Dictionary.attach_column.
+            k: number of candidates.
+        Returns:
+            Up to k candidates with the highest scores, highest first.
+        """
+
+        word_list = self._dictionary.word_list
+
+        return [
+            word_list[word_id]
+            for word_id in self._dictionary.top_k(column, k, self.ids).tolist()
+        ]
+
+    def to_list(self) -> List[str]:
+        """ New list of the candidate words, built once per view. """
+
+        if self._words is None:
+            self._words = list(self)
+
+        return self._words.copy()
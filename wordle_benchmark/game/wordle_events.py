@@ -0,0 +1,68 @@
+"""
+Classes to observe game events without slowing down unobserved games.
+"""
+
+import logging
+from typing import TYPE_CHECKING
+
+from wordle_benchmark.game.wordle_feedback import decode_pattern
+
+if TYPE_CHECKING:
+    from wordle_benchmark.game.wordle_game import Game
+
+log = logging.getLogger(__name__)
+
+
+class GameObserver:
+    """ Receives game events, every hook does nothing unless overridden """
+
+    def on_game_start(self, game: "Game", target_word: str) -> None:
+        """
+        Args:
+            game: Game that started.
+            target_word: Target word of the game.
+        """
+
+    def on_guess(self, game: "Game", guess: str) -> None:
+        """
+        Args:
+            game: Game receiving the guess.
+            guess: Guess as sent, before validation.
+        """
+
+    def on_feedback(self, game: "Game", guess: str, code: int) -> None:
+        """
+        Args:
+            game: Game that scored the guess.
+            guess: Legal guess word.
+            code: Base-3 feedback pattern code.
+        """
+
+    def on_game_end(self, game: "Game", target_word: str) -> None:
+        """
+        Args:
+            game: Finished game, see game.success.
+            target_word: Target word of the game.
+        """
+
+
+class LoggingObserver(GameObserver):
+    """ Log game events, the candidate list only when DEBUG is enabled """
+
+    def on_game_start(self, game: "Game", target_word: str) -> None:
+        log.info('Starting game with target word "%s"', target_word)
+
+    def on_guess(self, game: "Game", guess: str) -> None:
+        log.info("Received guess %s", guess)
+
+    def on_feedback(self, game: "Game", guess: str, code: int) -> None:
+        log.info("Feedback for %s: %s", guess, decode_pattern(code, len(guess)))
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("These remain possible: %s", game.possible_words)
+
+    def on_game_end(self, game: "Game", target_word: str) -> None:
+        if game.success:
+            log.info("Correct! The word was %s", target_word)
+        else:
+            log.info("Uh oh! You lose! The word was %s", target_word)
@@ -0,0 +1,342 @@
+"""
+Classes to compute Wordle feedback patterns in bulk.
+
+A feedback pattern is stored as a base-3 integer code, one digit per letter
+position with the first letter as the least significant digit.
+"""
+
+import logging
+import os
+import pathlib
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from wordle_benchmark.cache import get_cache_dir
+from wordle_benchmark.game.wordle_words import LetterState
+
+if TYPE_CHECKING:
+    from wordle_benchmark.dictionary.wordle_dictionary import Dictionary
+
+log = logging.getLogger(__name__)
+
+
+PATTERN_BASE = 3
+
+BLACK_DIGIT = 0
+YELLOW_DIGIT = 1
+GREEN_DIGIT = 2
+
+STATE_TO_DIGIT: Dict[LetterState, int] = {
+    LetterState.BLACK: BLACK_DIGIT,
+    LetterState.YELLOW: YELLOW_DIGIT,
+    LetterState.GREEN: GREEN_DIGIT,
+}
+DIGIT_TO_STATE: Dict[int, LetterState] = {
+    digit: state for state, digit in STATE_TO_DIGIT.items()
+}
+
+
+def all_green_code(word_len: int) -> int:
+    """
+    Code of the winning pattern.
+
+    Args:
+        word_len: Length of word.
+    Returns:
+        Code with every digit GREEN.
+    """
+
+    return int(PATTERN_BASE ** word_len - 1)
+
+
+def pattern_dtype(word_len: int) -> np.dtype:
+    """
+    Smallest unsigned integer type that fits every pattern code.
+
+    Args:
+        word_len: Length of word.
+    Returns:
+        Numpy dtype, uint8 for standard five letter games.
+    """
+
+    n_codes = PATTERN_BASE ** word_len
+
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if n_codes <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+
+    raise ValueError(f"Word length {word_len} too long to encode feedback")
+
+
+def encode_pattern(letter_states: Sequence[LetterState]) -> int:
+    """
+    Encode per letter states as a single code.
+
+    Args:
+        letter_states: BLACK, YELLOW, GREEN state of each letter.
+    Returns:
+        Base-3 pattern code.
+    """
+
+    code = 0
+
+    for letter_state in reversed(letter_states):
+        code = code * PATTERN_BASE + STATE_TO_DIGIT[letter_state]
+
+    return code
+
+
+def decode_digits(code: int, word_len: int) -> List[int]:
+    """
+    Decode a pattern code into per letter digits.
+
+    Args:
+        code: Base-3 pattern code.
+        word_len: Length of word.
+    Returns:
+        BLACK_DIGIT, YELLOW_DIGIT, GREEN_DIGIT of each letter.
+    """
+
+    digits: List[int] = []
+    code = int(code)
+
+    for _ in range(word_len):
+        code, digit = divmod(code, PATTERN_BASE)
+        digits.append(digit)
+
+    return digits
+
+
+def decode_pattern(code: int, word_len: int) -> List[LetterState]:
+    """
+    Decode a pattern code into per letter states.
+
+    Args:
+        code: Base-3 pattern code.
+        word_len: Length of word.
+    Returns:
+        BLACK, YELLOW, GREEN state of each letter.
+    """
+
+    return [DIGIT_TO_STATE[digit] for digit in decode_digits(code, word_len)]
+
+
+def pattern_code(guess: str, target: str) -> int:
+    """
+    Feedback of a single guess as a code, without building per letter states.
+    Repeated letters follow the same rules as GuessWord.compare_to.
+
+    Args:
+        guess: Guess word.
+        target: Target word of the same length.
+    Returns:
+        Base-3 pattern code.
+    """
+
+    # target letters not already accounted for by a green
+    unmatched = Counter(
+        target_letter
+        for guess_letter, target_letter in zip(guess, target)
+        if guess_letter != target_letter
+    )
+    code = 0
+    place = 1
+
+    for guess_letter, target_letter in zip(guess, target):
+
+        if guess_letter == target_letter:
+            code += GREEN_DIGIT * place
+        elif unmatched[guess_letter] > 0:
+            unmatched[guess_letter] -= 1
+            code += YELLOW_DIGIT * place
+
+        place *= PATTERN_BASE
+
+    return code
+
+
+def compute_patterns(guesses: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Vectorized feedback for encoded words.
+    Arrays broadcast against each other on all but the last (letter) axis, so
+    (n, 1, L) and (1, m, L) give an (n, m) table while (n, L) and (n, L) give
+    pairwise codes.
+
+    Repeated letters follow the game rules: greens are assigned first, then
+    yellows left to right while unmatched copies remain in the target.
+
+    Args:
+        guesses: Encoded guess words, shape (..., L).
+        targets: Encoded target words, shape (..., L).
+    Returns:
+        Pattern codes with the broadcast shape minus the letter axis.
+    """
+
+    word_len = guesses.shape[-1]
+    greens = guesses == targets
+    codes = np.zeros(greens.shape[:-1], dtype=pattern_dtype(word_len))
+
+    # target letters not already used by a green, with used slots masked out
+    sentinel = np.iinfo(targets.dtype).max
+    unmatched = np.where(greens, sentinel, targets)
+
+    for ind in range(word_len):
+
+        letter = guesses[..., ind : ind + 1]
+        available = np.sum(unmatched == letter, axis=-1, dtype=np.uint8)
+
+        # copies of this letter earlier in the guess that already claimed a yellow
+        claimed = np.sum(
+            (guesses[..., :ind] == letter) & ~greens[..., :ind],
+            axis=-1,
+            dtype=np.uint8,
+        )
+
+        is_green = greens[..., ind]
+        is_yellow = ~is_green & (claimed < available)
+
+        codes += (is_yellow + 2 * is_green).astype(codes.dtype) * codes.dtype.type(
+            PATTERN_BASE ** ind
+        )
+
+    return codes
+
+
+class FeedbackMatrix:
+    """ Precomputed guess x target feedback codes for a dictionary """
+
+    def __init__(
+        self,
+        dictionary: "Dictionary",
+        cache_dir: Optional[pathlib.Path] = None,
+        chunk_size: int = 256,
+    ) -> None:
+        """
+        Args:
+            dictionary: Wordle dictionary, rows and columns follow its order.
+            cache_dir: directory to persist the table in, see get_cache_dir.
+            chunk_size: number of guess rows computed at a time.
+        """
+
+        self._dictionary = dictionary
+        self._path = (
+            get_cache_dir(cache_dir) / f"feedback-{dictionary.content_hash}.npy"
+        )
+        self._table = FeedbackMatrix._load_or_build(
+            self._path, dictionary.encoded, chunk_size
+        )
+
+    def __contains__(self, value):
+        return value in self._dictionary
+
+    def __getstate__(self):
+        # worker processes re-open the persisted table rather than copy it
+        state = self.__dict__.copy()
+        del state["_table"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._table = np.load(self._path, mmap_mode="r")
+
+    @property
+    def content_hash(self) -> str:  # pylint: disable=missing-function-docstring
+        return self._dictionary.content_hash
+
+    @property
+    def path(self) -> pathlib.Path:  # pylint: disable=missing-function-docstring
+        return self._path
+
+    @property
+    def table(self) -> np.ndarray:
+        """ Read-only (n_guesses, n_targets) table of pattern codes. """
+
+        return self._table
+
+    def pattern(self, guess: str, target: str) -> int:
+        """
+        Look up the feedback code of a guess against a target.
+
+        Args:
+            guess: Guess word in the dictionary.
+            target: Target word in the dictionary.
+        Returns:
+            Base-3 pattern code.
+        """
+
+        word_id = self._dictionary.word_id
+
+        return int(self._table[word_id(guess), word_id(target)])
+
+    def row(self, guess: str) -> np.ndarray:
+        """
+        Feedback codes of a guess against every target.
+
+        Args:
+            guess: Guess word in the dictionary.
+        Returns:
+            Read-only array of pattern codes in dictionary order.
+        """
+
+        return self._table[self._dictionary.word_id(guess)]
+
+    @staticmethod
+    def _build(encoded: np.ndarray, chunk_size: int) -> np.ndarray:
+        """
+        Compute the full pattern table.
+
+        Args:
+            encoded: Encoded dictionary words, shape (n_words, word_len).
+            chunk_size: number of guess rows computed at a time.
+        Returns:
+            Array of shape (n_words, n_words).
+        """
+
+        n_words, word_len = encoded.shape
+        table = np.empty((n_words, n_words), dtype=pattern_dtype(word_len))
+
+        for start in range(0, n_words, chunk_size):
+            guesses = encoded[start : start + chunk_size, None, :]
+            table[start : start + chunk_size] = compute_patterns(
+                guesses, encoded[None, :, :]
+            )
+
+        return table
+
+    @staticmethod
+    def _load_or_build(
+        path: pathlib.Path, encoded: np.ndarray, chunk_size: int
+    ) -> np.ndarray:
+        """
+        Memory-map a persisted table, computing and persisting it first if needed.
+
+        Args:
+            path: cache file location.
+            encoded: Encoded dictionary words, shape (n_words, word_len).
+            chunk_size: number of guess rows computed at a time.
+        Returns:
+            Read-only memory-mapped table.
+        """
+
+        n_words = len(encoded)
+
+        if path.exists():
+            table = np.load(path, mmap_mode="r")
+
+            if table.shape == (n_words, n_words):
+                log.debug("Loaded feedback table from %s", path)
+                return table
+
+            log.warning("Discarding feedback table with bad shape at %s", path)
+
+        log.info("Computing %d x %d feedback table...", n_words, n_words)
+        table = FeedbackMatrix._build(encoded, chunk_size)
+
+        # write then rename so concurrent processes never read a partial file
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+        np.save(tmp_path, table)
+        os.replace(tmp_path, path)
+
+        return np.load(path, mmap_mode="r")
@@ -2,26 +2,63 @@
 Classes to represent game logic.
 """
 
+import functools
 import logging
+import time
+from collections import Counter
 from enum import Enum, auto
-from typing import TYPE_CHECKING, Generator, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Generator, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from wordle_benchmark.dictionary.wordle_dictionary import RemoteDictionary
-from wordle_benchmark.game.wordle_words import GuessWord, LetterState, TargetWord
+from wordle_benchmark.game.wordle_candidates import CandidateView
+from wordle_benchmark.game.wordle_feedback import (
+    BLACK_DIGIT,
+    GREEN_DIGIT,
+    all_green_code,
+    decode_digits,
+    decode_pattern,
+    pattern_code,
+)
+from wordle_benchmark.game.wordle_words import GuessWord, TargetWord
+from wordle_benchmark.instrumentation.wordle_instrumentation import (
+    FILTERING,
+    SCORING,
+    VALIDATION,
+)
 
 if TYPE_CHECKING:
 
+    from wordle_benchmark.agent import AsyncAgent
     from wordle_benchmark.dictionary.wordle_dictionary import Dictionary
+    from wordle_benchmark.game.wordle_events import GameObserver
+    from wordle_benchmark.game.wordle_feedback import FeedbackMatrix
     from wordle_benchmark.game.wordle_words import MatchState
+    from wordle_benchmark.instrumentation import Instrumentation
 
 log = logging.getLogger(__name__)
 
 
-DEFAULT_DICTIONARY = RemoteDictionary(
-    "https://raw.githubusercontent.com/dwyl/english-words/master/words_dictionary.json",  # pylint: disable=line-too-long
-    word_len=5,
-    seed=42,
-)
+# consecutive illegal guesses after which a game gives up on the player
+MAX_ILLEGAL_GUESSES = 10
+
+DEFAULT_REMOTE_SOURCE = "https://raw.githubusercontent.com/dwyl/english-words/master/words_dictionary.json"  # pylint: disable=line-too-long
+
+
+@functools.lru_cache(maxsize=None)
+def get_default_dictionary() -> "Dictionary":
+    """ Default dictionary, built on first use from the download cache if possible. """
+
+    return RemoteDictionary(DEFAULT_REMOTE_SOURCE, word_len=5, seed=42)
+
+
+def __getattr__(name: str):
+    # DEFAULT_DICTIONARY stays importable without downloading at import time
+    if name == "DEFAULT_DICTIONARY":
+        return get_default_dictionary()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class GameState(Enum):
@@ -39,128 +76,295 @@ class IllegalGuessError(Exception):
 class Game:  # pylint: disable=too-many-instance-attributes
     """ Logic for game """
 
-    def __init__(
+    __slots__ = (
+        "_target_word",
+        "_dictionary",
+        "_feedback",
+        "_instrumentation",
+        "_observers",
+        "_max_guesses",
+        "_word_len",
+        "_all_green",
+        "_history",
+        "_hard_mode",
+        "_required_letters",
+        "_min_counts",
+        "_guess_counts",
+        "_candidates",
+        "_candidate_view",
+        "_possible_words",
+        "_game_state",
+    )
+
+    def __init__(  # pylint: disable=too-many-arguments
         self,
         target_word: str,
-        dictionary: "Dictionary" = DEFAULT_DICTIONARY,
+        dictionary: Optional["Dictionary"] = None,
         max_guesses: int = 6,
+        feedback: Optional["FeedbackMatrix"] = None,
+        instrumentation: Optional["Instrumentation"] = None,
+        hard_mode: bool = False,
+        observers: Optional[Sequence["GameObserver"]] = None,
     ):
         """
         Args:
             word: target word.
-            dictionary: Wordle dictionary.
+            dictionary: Wordle dictionary, get_default_dictionary() by default.
             max_guesses: max number guesses.
+            feedback: optional precomputed feedback table for the dictionary.
+                Guesses are scored by lookup instead of letter comparison.
+            instrumentation: optional recorder of validation, scoring and
+                filtering time per turn.
+            hard_mode: whether guesses must keep revealed greens in place and
+                reuse revealed yellows.
+            observers: optional subscribers to game events, e.g.
+                LoggingObserver(). Unobserved games skip event handling.
         """
 
+        if dictionary is None:
+            dictionary = get_default_dictionary()
+
+        if feedback is not None and feedback.content_hash != dictionary.content_hash:
+            raise ValueError("Feedback table was built for a different dictionary")
+
         self._target_word = TargetWord(target_word)
         self._dictionary = dictionary
+        self._feedback = feedback
+        self._instrumentation = instrumentation
+        self._observers = tuple(observers) if observers else ()
         self._max_guesses = max_guesses
         self._word_len = len(target_word)
-        self._guesses: List[List["MatchState"]] = []
+        self._all_green = all_green_code(self._word_len)
 
-        self._greens: List[Tuple[str, int]] = []
-        self._yellows: List[Tuple[str, int]] = []
-        self._blacks: List[str] = []
+        # dictionary's copy of each guess word with its feedback pattern code
+        self._history: List[Tuple[str, int]] = []
+
+        # hard mode constraints: letter required at a position, min copies of
+        # a letter, and the colored copies of each letter in the latest guess
+        self._hard_mode = hard_mode
+        self._required_letters: Dict[int, str] = {}
+        self._min_counts: Counter = Counter()
+        self._guess_counts: Counter = Counter()
+
+        # dictionary mask of words consistent with every guess so far
+        self._candidates = dictionary.index.full()
+        self._candidate_view: Optional[CandidateView] = None
+        self._possible_words: Optional[List[str]] = None
 
         self._game_state = GameState.UNSTARTED
 
+    @property
+    def candidates(self) -> np.ndarray:
+        """ Read-only dictionary mask of words consistent with every guess so far. """
+
+        candidates = self._candidates.view()
+        candidates.flags.writeable = False
+
+        return candidates
+
+    @property
+    def candidate_view(self) -> CandidateView:
+        """ Lazy snapshot of the words consistent with every guess so far. """
+
+        if self._candidate_view is None:
+            self._candidate_view = CandidateView(
+                self._dictionary, self._candidates.copy()
+            )
+
+        return self._candidate_view
+
+    @property
+    def dictionary(self) -> "Dictionary":  # pylint: disable=missing-function-docstring
+        return self._dictionary
+
+    @property
+    def feedback(self) -> Optional["FeedbackMatrix"]:
+        """ Precomputed feedback table, if the game was given one. """
+
+        return self._feedback
+
+    @property
+    def history(self) -> List[Tuple[str, int]]:
+        """ Guess word and feedback pattern code of every guess so far. """
+
+        return self._history.copy()
+
     @property
     def last_match(self) -> Optional[List["MatchState"]]:
-        """ Most recent match. """
+        """ Most recent match, decoded from its pattern code. """
 
-        if len(self._guesses) == 0:
+        if len(self._history) == 0:
             return None
 
-        return self._guesses[-1]
+        guess, code = self._history[-1]
+
+        return list(zip(guess, decode_pattern(code, self._word_len)))
+
+    @property
+    def hard_mode(self) -> bool:  # pylint: disable=missing-function-docstring
+        return self._hard_mode
+
+    @property
+    def max_guesses(self) -> int:  # pylint: disable=missing-function-docstring
+        return self._max_guesses
 
     @property
     def n_guesses(self) -> int:
         """ Number of guesses so far. """
 
-        return len(self._guesses)
+        return len(self._history)
 
     @property
     def possible_words(self) -> List[str]:
-        """ Words that are still legal based on the dictionary. """
-
-        possible_words = []
-
-        for word in self._dictionary.word_list:
+        """ Words that are still legal, see candidate_view to avoid building strings. """
 
-            # remove a word if it has a black character
-            if any(character in word for character in self._blacks):
-                continue
+        # straight from the mask, without the snapshot copy of candidate_view
+        if self._possible_words is None:
+            word_list = self._dictionary.word_list
+            self._possible_words = [
+                word_list[ind] for ind in np.flatnonzero(self.candidates).tolist()
+            ]
 
-            if not all(word[ind] == character for character, ind in self._greens):
-                continue
+        return self._possible_words.copy()
 
-            if not all(character in word for character, _ in self._yellows):
-                continue
-
-            if any(word[ind] == character for character, ind in self._yellows):
-                continue
-
-            possible_words.append(word)
+    @property
+    def state_key(self) -> Tuple[int, bool, Tuple[Tuple[str, int], ...]]:
+        """
+        Hashable key of everything an agent can observe: max guesses, hard
+        mode and each guess with its feedback code. Equal keys within one
+        dictionary mean equal game states, whatever the target word.
+        """
 
-        return possible_words
+        return self._max_guesses, self._hard_mode, tuple(self._history)
 
     @property
     def success(self) -> bool:
         """ Whether the most recent guess was correct. """
 
-        last_match = self.last_match
-
-        if last_match is None:
-            return False
-
-        return all(letter_state == LetterState.GREEN for _, letter_state in last_match)
+        return len(self._history) > 0 and self._history[-1][1] == self._all_green
 
     def _transition_to_started(self):
         """ State machine transition to started """
 
         assert self._game_state == GameState.UNSTARTED
 
-        log.info("Starting game...")
         self._game_state = GameState.STARTED
 
+        for observer in self._observers:
+            observer.on_game_start(self, str(self._target_word))
+
     def _transition_to_finished(self):
         """ State machine transition to finished. """
 
         assert self._game_state == GameState.STARTED
 
-        log.info("Ending game")
         self._game_state = GameState.FINISHED
 
-    def _handle_match(self, match_state: "MatchState", ind: int) -> None:
+        for observer in self._observers:
+            observer.on_game_end(self, str(self._target_word))
+
+    def forfeit(self) -> None:
+        """
+        End a started game before it is won or lost, e.g. when the agent runs
+        out of time. Close the game's session afterwards.
         """
-        Update knowledge of black, yellow, green letters after guess.
-        A match state represents a letter and it's black, yellow, green state.
+
+        self._transition_to_finished()
+
+    def _handle_match(self, character: str, digit: int, ind: int) -> None:
+        """
+        Update knowledge of revealed letters after guess.
 
         Args:
-            match_state: Tuple[str, LetterState].
+            character: Letter of the guess word.
+            digit: BLACK_DIGIT, YELLOW_DIGIT or GREEN_DIGIT feedback of the letter.
             ind: Letter position in guess word.
         """
 
-        character, letter_state = match_state
+        if digit == GREEN_DIGIT:
+            self._required_letters[ind] = character
 
-        assert character.isalpha(), "Character must be standard alphabet"
-        assert len(character) == 1, "A character should be length one"
+        if digit != BLACK_DIGIT:
+            self._guess_counts[character] += 1
+            self._min_counts[character] = max(
+                self._min_counts[character], self._guess_counts[character]
+            )
 
-        if letter_state == LetterState.BLACK:
-            self._blacks.append(character)
+    def _narrow_candidates(self, guess: str, digits: List[int]) -> None:
+        """
+        Remove candidate words that would not have produced this match.
 
-        elif letter_state == LetterState.YELLOW:
-            self._yellows.append((character, ind))
+        Args:
+            guess: Latest guess word.
+            digits: Feedback digit of each letter of the latest guess.
+        """
 
-        elif letter_state == LetterState.GREEN:
-            self._greens.append((character, ind))
+        index = self._dictionary.index
+        candidates = self._candidates
 
-        else:
-            raise ValueError("Unknown letter state")
+        # green letters sit at their position, every other letter does not
+        for ind, (character, digit) in enumerate(zip(guess, digits)):
+            if digit == GREEN_DIGIT:
+                candidates &= index.at_position(character, ind)
+            else:
+                candidates &= ~index.at_position(character, ind)
+
+        # a black copy of a letter caps its count at the green and yellow copies
+        n_colored = Counter(
+            character for character, digit in zip(guess, digits) if digit != BLACK_DIGIT
+        )
+        blacks = {
+            character for character, digit in zip(guess, digits) if digit == BLACK_DIGIT
+        }
+
+        for character in n_colored.keys() | blacks:
+            if character in blacks:
+                candidates &= index.exactly(character, n_colored[character])
+            else:
+                candidates &= index.at_least(character, n_colored[character])
 
-    def _register_guess(self, guess_word: "GuessWord") -> bool:
+        self._candidate_view = None
+        self._possible_words = None
+
+    def _compare(self, guess: str) -> int:
         """
-        Register guess and update game state if necessary.
+        Score a guess against the target, by table lookup when available.
+
+        Args:
+            guess: Word guessed by user, already validated.
+        Returns:
+            Pattern code.
+        """
+
+        target = str(self._target_word)
+
+        if self._feedback is None or target not in self._feedback:
+            return pattern_code(guess, target)
+
+        return self._feedback.pattern(guess, target)
+
+    def _lap(self, phase: str, start: int) -> int:
+        """
+        Record the time since start against a phase of the current turn.
+        Only called when the game is instrumented.
+
+        Args:
+            phase: phase name.
+            start: perf_counter_ns at the start of the phase.
+        Returns:
+            perf_counter_ns at the end of the phase.
+        """
+
+        end = time.perf_counter_ns()
+
+        if self._instrumentation is not None:
+            self._instrumentation.record(phase, len(self._history), end - start)
+
+        return end
+
+    def check_guess(self, guess_word: "GuessWord") -> None:
+        """
+        Check that a guess is legal in the current game state.
 
         Args:
             guess_word: Word guessed by user.
@@ -176,20 +380,80 @@ class Game:  # pylint: disable=too-many-instance-attributes
         if not guess_word.in_dictionary(self._dictionary):
             raise IllegalGuessError(f"{guess_word} is not in the dictionary")
 
+        if self._hard_mode:
+            self._check_hard_mode(str(guess_word))
+
+    def _check_hard_mode(self, guess: str) -> None:
+        """
+        Check a guess against the revealed letters, in time bounded by the
+        word length.
+
+        Args:
+            guess: Word guessed by user, already checked for length.
+        Raises:
+            IllegalGuessError if a revealed letter is not reused.
+        """
+
+        for ind, character in self._required_letters.items():
+            if guess[ind] != character:
+                raise IllegalGuessError(
+                    f"{guess} must have {character} in position {ind + 1}"
+                )
+
+        guess_counts = Counter(guess)
+
+        for character, min_count in self._min_counts.items():
+            if guess_counts[character] < min_count:
+                raise IllegalGuessError(f"{guess} must contain {min_count} {character}")
+
+    def _register_guess(self, guess_word: "GuessWord") -> bool:
+        """
+        Register guess and update game state if necessary.
+
+        Args:
+            guess_word: Word guessed by user.
+        Raises:
+            IllegalGuessError in the event of an illegal word.
+        """
+
+        timed = self._instrumentation is not None
+        start = time.perf_counter_ns() if timed else 0
+
+        self.check_guess(guess_word)
+
+        if timed:
+            start = self._lap(VALIDATION, start)
+
+        # keep the dictionary's copy of the word rather than a new string
+        dictionary = self._dictionary
+        guess = dictionary.word(dictionary.word_id(str(guess_word)))
+
         # black, yellow, green match outcome given guess
-        comparison: List["MatchState"] = guess_word.compare_to(self._target_word)
-        self._guesses.append(comparison)
+        code = self._compare(guess)
+
+        if timed:
+            start = self._lap(SCORING, start)
+
+        digits = decode_digits(code, self._word_len)
+        self._guess_counts.clear()
 
-        for ind, match in enumerate(comparison):
-            self._handle_match(match, ind)
+        for ind, (character, digit) in enumerate(zip(guess, digits)):
+            self._handle_match(character, digit, ind)
+
+        self._narrow_candidates(guess, digits)
+
+        if timed:
+            self._lap(FILTERING, start)
+
+        self._history.append((guess, code))
 
         # if all characters matched, that's the end of the game
         return self.success
 
     def start_game(self) -> Generator[None, str, None]:
         """
-        Initiate game, await user input.
-        NOTE: should be refactored to async await.
+        Initiate game, await user input. See play_async to await an async
+        agent instead.
 
         Sample use of a manual game:
             game = Game(word, max_guesses=max_guesses)
@@ -199,34 +463,89 @@ class Game:  # pylint: disable=too-many-instance-attributes
             while True:
                 session.send(input())
 
+        Raises:
+            IllegalGuessError from send after MAX_ILLEGAL_GUESSES illegal
+            guesses in a row, ending the game. A deterministic agent would
+            repeat its illegal guess forever.
         Returns:
             A generator. Use ".send()" to pass guesses.
         """
 
         self._transition_to_started()
-
-        log.debug("The target word is %s", self._target_word)
+        n_illegal = 0
 
         while not self._game_state == GameState.FINISHED:
 
-            log.info("Waiting for guess...")
             guess_word_str = yield
-            log.info("Received guess %s", guess_word_str)
+
+            for observer in self._observers:
+                observer.on_guess(self, guess_word_str)
+
             guess_word = GuessWord(guess_word_str)
 
             try:
                 end_game: bool = self._register_guess(guess_word)
             except IllegalGuessError as exception:
                 log.warning(exception)
-            else:
-                if end_game:
+                n_illegal += 1
+
+                if n_illegal >= MAX_ILLEGAL_GUESSES:
                     self._transition_to_finished()
-                    log.info("Correct! The word was %s", self._target_word)
-                    break
+                    raise IllegalGuessError(
+                        f"Gave up after {n_illegal} illegal guesses in a row"
+                    ) from exception
+            else:
+                n_illegal = 0
+
+                if self._observers:
+                    guess, code = self._history[-1]
 
-                log.debug("These remain possible: %s", self.possible_words)
+                    for observer in self._observers:
+                        observer.on_feedback(self, guess, code)
 
-                if len(self._guesses) > self._max_guesses:
+                if end_game or len(self._history) > self._max_guesses:
                     self._transition_to_finished()
-                    log.info("Uh oh! You lose!")
                     break
+
+    async def play_async(
+        self, agent: "AsyncAgent", turn_times: Optional[List[float]] = None
+    ) -> List[float]:
+        """
+        Play the game to completion, awaiting an async agent for each guess.
+        Other games keep running on the event loop while the agent waits.
+
+        Sample use:
+            turn_times = await Game(word).play_async(agent)
+
+        Args:
+            agent: Async Wordle playing agent.
+            turn_times: optional list the seconds spent on each turn are
+                appended to, still filled in if the game raises.
+        Raises:
+            IllegalGuessError after MAX_ILLEGAL_GUESSES illegal guesses in a
+            row, see start_game.
+        Returns:
+            Seconds spent on each turn.
+        """
+
+        if turn_times is None:
+            turn_times = []
+
+        session = self.start_game()
+        next(session)
+
+        finished = False
+
+        while not finished:
+
+            start = time.perf_counter()
+            guess = await agent.play(self)
+
+            try:
+                session.send(guess)
+            except StopIteration:
+                finished = True
+            finally:
+                turn_times.append(time.perf_counter() - start)
+
+        return turn_times
@@ -0,0 +1,222 @@
+"""
+Classes to play multi board Wordle variants, e.g. Quordle and Octordle, where
+every guess is scored against all unsolved boards at once.
+"""
+
+import logging
+from typing import TYPE_CHECKING, List, Optional, Sequence, Union
+
+import numpy as np
+
+from wordle_benchmark.game.wordle_feedback import all_green_code, compute_patterns
+from wordle_benchmark.game.wordle_game import (
+    MAX_ILLEGAL_GUESSES,
+    get_default_dictionary,
+)
+from wordle_benchmark.game.wordle_words import guess_word_id
+
+if TYPE_CHECKING:
+
+    from wordle_benchmark.dictionary.wordle_dictionary import Dictionary
+    from wordle_benchmark.game.wordle_feedback import FeedbackMatrix
+
+log = logging.getLogger(__name__)
+
+
+class MultiGame:  # pylint: disable=too-many-instance-attributes
+    """ Logic for one game over several target words, one board each """
+
+    def __init__(
+        self,
+        target_words: Sequence[str],
+        dictionary: Optional["Dictionary"] = None,
+        max_guesses: Optional[int] = None,
+        feedback: Optional["FeedbackMatrix"] = None,
+    ):
+        """
+        Args:
+            target_words: target word of each board, all in the dictionary.
+            dictionary: Wordle dictionary, get_default_dictionary() by default.
+            max_guesses: max number guesses, as for Game. Number of boards plus
+                five by default, e.g. 9 for four boards.
+            feedback: optional precomputed feedback table for the dictionary.
+        """
+
+        if dictionary is None:
+            dictionary = get_default_dictionary()
+
+        if feedback is not None and feedback.content_hash != dictionary.content_hash:
+            raise ValueError("Feedback table was built for a different dictionary")
+
+        missing = [word for word in target_words if word not in dictionary]
+
+        if missing:
+            raise ValueError(f"Target words not in the dictionary: {missing}")
+
+        n_boards = len(target_words)
+
+        self._dictionary = dictionary
+        self._feedback = feedback
+        self._max_guesses = n_boards + 5 if max_guesses is None else max_guesses
+        self._all_green = all_green_code(dictionary.word_len)
+
+        self._target_ids = np.array(
+            [dictionary.word_id(word) for word in target_words], dtype=np.int64
+        )
+
+        # one row per turn, -1 for boards solved on an earlier turn
+        self._guess_ids: List[int] = []
+        self._feedback_codes: List[np.ndarray] = []
+        self._candidates = np.ones((n_boards, len(dictionary)), dtype=bool)
+        self._solved_at = np.full(n_boards, -1, dtype=np.int64)
+        self._n_illegal = 0
+        self._forfeit = False
+
+    def __len__(self) -> int:
+        return len(self._target_ids)
+
+    @property
+    def active(self) -> np.ndarray:
+        """ Indices of unsolved boards. """
+
+        return np.flatnonzero(self._solved_at < 0)
+
+    @property
+    def candidates(self) -> np.ndarray:
+        """ Read-only (n_boards, n_words) mask of words still possible per board. """
+
+        candidates = self._candidates.view()
+        candidates.flags.writeable = False
+
+        return candidates
+
+    @property
+    def dictionary(self) -> "Dictionary":  # pylint: disable=missing-function-docstring
+        return self._dictionary
+
+    @property
+    def feedback_codes(self) -> np.ndarray:
+        """ (n_guesses, n_boards) pattern codes, -1 once a board is solved. """
+
+        if not self._feedback_codes:
+            return np.zeros((0, len(self)), dtype=np.int64)
+
+        return np.stack(self._feedback_codes)
+
+    @property
+    def finished(self) -> bool:
+        """ Whether every board is solved, the guesses ran out or the game was given up. """
+
+        return self.success or self._forfeit or self.n_guesses > self._max_guesses
+
+    @property
+    def forfeit(self) -> bool:
+        """ Whether the game was given up after MAX_ILLEGAL_GUESSES illegal guesses. """
+
+        return self._forfeit
+
+    @property
+    def guesses(self) -> List[str]:
+        """ Every guess word so far. """
+
+        return [self._dictionary.word(guess_id) for guess_id in self._guess_ids]
+
+    @property
+    def max_guesses(self) -> int:  # pylint: disable=missing-function-docstring
+        return self._max_guesses
+
+    @property
+    def n_guesses(self) -> int:
+        """ Number of guesses so far. """
+
+        return len(self._guess_ids)
+
+    @property
+    def solved_at(self) -> np.ndarray:
+        """ Number of guesses each board took, -1 while unsolved. """
+
+        solved_at = self._solved_at.view()
+        solved_at.flags.writeable = False
+
+        return solved_at
+
+    @property
+    def success(self) -> bool:
+        """ Whether every board is solved. """
+
+        return bool((self._solved_at >= 0).all())
+
+    def possible_words(self, board: int) -> List[str]:
+        """
+        Args:
+            board: Board index.
+        Returns:
+            Words that are still legal on a board.
+        """
+
+        word_list = self._dictionary.word_list
+
+        return [
+            word_list[ind] for ind in np.flatnonzero(self._candidates[board]).tolist()
+        ]
+
+    def step(self, guess: Union[str, int]) -> None:
+        """
+        Register a guess against every unsolved board. A guess outside the
+        dictionary is ignored, as Game does, and the game waits for another.
+        The game is given up, finished as a forfeit, after
+        MAX_ILLEGAL_GUESSES illegal guesses in a row.
+
+        Args:
+            guess: Guess word or word ID.
+        """
+
+        if self.finished:
+            raise ValueError("Game is already finished")
+
+        guess_id = guess_word_id(guess, self._dictionary)
+
+        if guess_id < 0:
+            log.warning("Ignoring guess %s not in the dictionary", guess)
+            self._n_illegal += 1
+
+            # a deterministic agent would repeat its illegal guess forever
+            if self._n_illegal >= MAX_ILLEGAL_GUESSES:
+                log.warning(
+                    "Gave up after %d illegal guesses in a row", self._n_illegal
+                )
+                self._forfeit = True
+
+            return
+
+        self._n_illegal = 0
+        boards = self.active
+        row = self._score_row(guess_id)
+        board_codes = row[self._target_ids[boards]]
+
+        self._candidates[boards] &= row[None, :] == board_codes[:, None]
+
+        codes = np.full(len(self), -1, dtype=np.int64)
+        codes[boards] = board_codes
+
+        self._guess_ids.append(guess_id)
+        self._feedback_codes.append(codes)
+        self._solved_at[boards[board_codes == self._all_green]] = self.n_guesses
+
+    def _score_row(self, guess_id: int) -> np.ndarray:
+        """
+        Pattern codes of a guess against every dictionary word, shared by the
+        boards' targets and candidate filters.
+
+        Args:
+            guess_id: Guess word ID.
+        Returns:
+            Pattern code per dictionary word.
+        """
+
+        if self._feedback is not None:
+            return self._feedback.table[guess_id]
+
+        encoded = self._dictionary.encoded
+
+        return compute_patterns(encoded[guess_id][None, :], encoded)
@@ -3,8 +3,9 @@ Classes to represent Wordle words we want to guess and our guesses.
 """
 
 from abc import ABC
+from collections import Counter
 from enum import Enum, auto
-from typing import TYPE_CHECKING, List, Tuple
+from typing import TYPE_CHECKING, List, Tuple, Union
 
 if TYPE_CHECKING:
     from wordle_benchmark.dictionary.wordle_dictionary import Dictionary
@@ -21,9 +22,29 @@ class LetterState(Enum):
 MatchState = Tuple[str, LetterState]
 
 
+def guess_word_id(guess: Union[str, int], dictionary: "Dictionary") -> int:
+    """
+    Resolve a guess given as a word or a word ID, as vectorized games accept.
+
+    Args:
+        guess: Guess word or word ID.
+        dictionary: Wordle dictionary of the game.
+    Returns:
+        Word ID, -1 if the guess is not in the dictionary.
+    """
+
+    if isinstance(guess, str):
+        guess = guess.lower()
+        return dictionary.word_id(guess) if guess in dictionary else -1
+
+    return int(guess) if 0 <= guess < len(dictionary) else -1
+
+
 class Word(ABC):
     """ Word ABC """
 
+    __slots__ = ("_word",)
+
     def __init__(self, word: str) -> None:
         """
         Args:
@@ -74,15 +95,19 @@ class Word(ABC):
 class TargetWord(Word):  # pylint: disable=too-few-public-methods
     """ Word we are trying to guess """
 
-    ...
+    __slots__ = ()
 
 
 class GuessWord(Word):
     """ Word we have guessed """
 
+    __slots__ = ()
+
     def compare_to(self, target_word: TargetWord) -> List[MatchState]:
         """
         Check matching letters between the guess and the target word.
+        A repeated guess letter is only YELLOW while unmatched copies remain in
+        the target, assigned left to right after greens.
 
         Args:
             target_word: Actual word being guessed.
@@ -90,10 +115,18 @@ class GuessWord(Word):
 
         match_list: List[MatchState] = []
 
+        # target letters not already accounted for by a green
+        unmatched = Counter(
+            target_letter
+            for self_letter, target_letter in zip(self, target_word)
+            if self_letter != target_letter
+        )
+
         for self_letter, target_letter in zip(self, target_word):
             if self_letter == target_letter:
                 match_list.append((self_letter, LetterState.GREEN))
-            elif self_letter in target_word:
+            elif unmatched[self_letter] > 0:
+                unmatched[self_letter] -= 1
                 match_list.append((self_letter, LetterState.YELLOW))
             else:
                 match_list.append((self_letter, LetterState.BLACK))
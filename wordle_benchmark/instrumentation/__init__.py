@@ -0,0 +1,3 @@
+# pylint: disable=missing-module-docstring
+from .wordle_instrumentation import Instrumentation, LatencyHistogram, LatencySummary
+from .wordle_memory import AllocationSite, MemoryInstrumentation, MemorySummary
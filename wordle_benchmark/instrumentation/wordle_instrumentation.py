@@ -0,0 +1,207 @@
+"""
+Classes to time the phases of each turn with bounded memory.
+"""
+
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, DefaultDict, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import cProfile
+
+# phases of a turn, in the order they run
+AGENT = "agent"
+VALIDATION = "validation"
+SCORING = "scoring"
+FILTERING = "filtering"
+TURN = "turn"
+
+PHASES = (AGENT, VALIDATION, SCORING, FILTERING, TURN)
+
+
+@dataclass
+class LatencySummary:
+    """ Latency percentiles of one phase, in seconds """
+
+    count: int
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+
+class LatencyHistogram:
+    """ Log-bucketed nanosecond latency histogram, percentiles within ~1% """
+
+    SUB_BUCKETS = 64
+
+    def __init__(self) -> None:
+        self._counts: DefaultDict[int, int] = defaultdict(int)
+        self._count = 0
+        self._total_ns = 0
+        self._max_ns = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def record(self, elapsed_ns: int) -> None:
+        """
+        Args:
+            elapsed_ns: duration in nanoseconds.
+        """
+
+        self._counts[self._bucket(elapsed_ns)] += 1
+        self._count += 1
+        self._total_ns += elapsed_ns
+        self._max_ns = max(self._max_ns, elapsed_ns)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Add the samples of another histogram to this one.
+
+        Args:
+            other: histogram to merge in.
+        """
+
+        # pylint: disable=protected-access
+        for bucket, count in other._counts.items():
+            self._counts[bucket] += count
+
+        self._count += other._count
+        self._total_ns += other._total_ns
+        self._max_ns = max(self._max_ns, other._max_ns)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Args:
+            percent: percentile in [0, 100].
+        Returns:
+            Approximate latency in seconds, 0 if nothing was recorded.
+        """
+
+        if self._count == 0:
+            return 0.0
+
+        rank = max(1, math.ceil(percent / 100 * self._count))
+        seen = 0
+
+        for bucket in sorted(self._counts):
+            seen += self._counts[bucket]
+
+            if seen >= rank:
+                return min(self._bucket_value(bucket), self._max_ns) / 1e9
+
+        return self._max_ns / 1e9
+
+    def summary(self) -> LatencySummary:
+        """ Percentile summary of the recorded samples. """
+
+        return LatencySummary(
+            count=self._count,
+            mean=self._total_ns / self._count / 1e9 if self._count else 0.0,
+            p50=self.percentile(50),
+            p90=self.percentile(90),
+            p99=self.percentile(99),
+            max=self._max_ns / 1e9,
+        )
+
+    @classmethod
+    def _bucket(cls, elapsed_ns: int) -> int:
+        """ Bucket index, SUB_BUCKETS buckets per power of two. """
+
+        return int(math.log2(max(elapsed_ns, 1)) * cls.SUB_BUCKETS)
+
+    @classmethod
+    def _bucket_value(cls, bucket: int) -> float:
+        """ Geometric midpoint of a bucket in nanoseconds. """
+
+        return 2 ** ((bucket + 0.5) / cls.SUB_BUCKETS)
+
+
+class Instrumentation:
+    """ Per phase and per turn latency recorder with optional profiler hooks """
+
+    def __init__(
+        self,
+        profiler: Optional["cProfile.Profile"] = None,
+        sampler: Optional[Callable[[str, int, int], None]] = None,
+    ) -> None:
+        """
+        Args:
+            profiler: optional profiler enabled only while the agent plays,
+                e.g. cProfile.Profile().
+            sampler: optional callback receiving (phase, turn, elapsed_ns)
+                for every recorded sample.
+        """
+
+        self._profiler = profiler
+        self._sampler = sampler
+        self._phases: DefaultDict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self._turns: DefaultDict[Tuple[str, int], LatencyHistogram] = defaultdict(
+            LatencyHistogram
+        )
+
+    def __getstate__(self):
+        # profilers and callbacks stay in the process that created them
+        state = self.__dict__.copy()
+        state["_profiler"] = None
+        state["_sampler"] = None
+        return state
+
+    def record(self, phase: str, turn: int, elapsed_ns: int) -> None:
+        """
+        Args:
+            phase: phase name, see PHASES.
+            turn: zero based turn index within the game.
+            elapsed_ns: duration in nanoseconds.
+        """
+
+        self._phases[phase].record(elapsed_ns)
+        self._turns[(phase, turn)].record(elapsed_ns)
+
+        if self._sampler is not None:
+            self._sampler(phase, turn, elapsed_ns)
+
+    def merge(self, other: "Instrumentation") -> None:
+        """
+        Add the samples of another recorder, e.g. from a worker process.
+
+        Args:
+            other: recorder to merge in.
+        """
+
+        # pylint: disable=protected-access
+        for phase, histogram in other._phases.items():
+            self._phases[phase].merge(histogram)
+
+        for key, histogram in other._turns.items():
+            self._turns[key].merge(histogram)
+
+    def start_profiler(self) -> None:
+        """ Enable the profiler, if any. """
+
+        if self._profiler is not None:
+            self._profiler.enable()
+
+    def stop_profiler(self) -> None:
+        """ Disable the profiler, if any. """
+
+        if self._profiler is not None:
+            self._profiler.disable()
+
+    def phase_summary(self) -> Dict[str, LatencySummary]:
+        """ Latency summary per phase. """
+
+        return {phase: histogram.summary() for phase, histogram in self._phases.items()}
+
+    def turn_summary(self) -> Dict[str, Dict[int, LatencySummary]]:
+        """ Latency summary per phase and turn index. """
+
+        summaries: Dict[str, Dict[int, LatencySummary]] = defaultdict(dict)
+
+        for (phase, turn), histogram in sorted(self._turns.items()):
+            summaries[phase][turn] = histogram.summary()
+
+        return dict(summaries)
@@ -0,0 +1,225 @@
+"""
+Classes to record memory use of the engine and agent, opt-in since tracing
+allocations slows every turn down.
+"""
+
+import os
+import sys
+import sysconfig
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from wordle_benchmark.instrumentation.wordle_instrumentation import AGENT
+
+try:
+    import resource
+except ImportError:
+    resource = None  # type: ignore  # pylint: disable=invalid-name
+
+# allocations outside the agent, i.e. game logic, dictionary and harness
+ENGINE = "engine"
+
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_AGENT_DIR = os.path.join(_PACKAGE_DIR, "agent")
+_LIBRARY_DIRS = tuple(
+    {sysconfig.get_paths()[name] for name in ("stdlib", "platstdlib", "purelib")}
+)
+
+
+@dataclass
+class AllocationSite:
+    """ Memory still allocated from one line of code """
+
+    location: str
+    size: int
+    count: int
+
+
+@dataclass
+class MemorySummary:  # pylint: disable=too-many-instance-attributes
+    """ Peak and steady state memory, in bytes, and allocations per turn """
+
+    peak_traced: int
+    steady_traced: int
+    peak_rss: Optional[int]
+    steady_rss: Optional[int]
+    mean_agent_blocks: float
+    mean_engine_blocks: float
+    top_sites: Dict[str, List[AllocationSite]] = field(default_factory=dict)
+
+
+def _rss_bytes() -> Optional[int]:
+    """ Current resident set size, if the platform reports it. """
+
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """ Peak resident set size of the process, if the platform reports it. """
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _site(traceback: tracemalloc.Traceback) -> Tuple[str, str]:
+    """
+    Attribute a traceback to its innermost frame outside the standard
+    library and installed packages, e.g. the agent line calling numpy.
+
+    Args:
+        traceback: allocation traceback, oldest frame first.
+    Returns:
+        Phase, AGENT or ENGINE, and "file:line" location.
+    """
+
+    # frozen and generated code, e.g. "<frozen abc>", counts as library code
+    frames = [
+        (
+            frame.filename
+            if frame.filename.startswith("<")
+            else os.path.abspath(frame.filename),
+            frame.lineno,
+        )
+        for frame in reversed(traceback)
+    ]
+    filename, lineno = next(
+        (
+            (filename, lineno)
+            for filename, lineno in frames
+            if filename.startswith(_PACKAGE_DIR)
+            or not filename.startswith(_LIBRARY_DIRS + ("<",))
+        ),
+        frames[0],
+    )
+    in_engine = filename.startswith(_PACKAGE_DIR) and not filename.startswith(
+        _AGENT_DIR
+    )
+
+    return ENGINE if in_engine else AGENT, f"{filename}:{lineno}"
+
+
+class MemoryInstrumentation:  # pylint: disable=too-many-instance-attributes
+    """ tracemalloc and RSS memory recorder, for in process games only """
+
+    def __init__(self, top_n: int = 10, n_frames: int = 8) -> None:
+        """
+        Args:
+            top_n: number of allocation sites reported per phase.
+            n_frames: frames kept per allocation to find the calling line
+                outside library code.
+        """
+
+        self._top_n = top_n
+        self._n_frames = n_frames
+        self._owns_tracing = False
+
+        self._peak_traced = 0
+        self._steady_traced = 0
+        self._steady_rss: Optional[int] = None
+        self._top_sites: Dict[str, List[AllocationSite]] = {}
+
+        # sum and count of net allocated blocks per turn and phase
+        self._blocks = {AGENT: [0, 0], ENGINE: [0, 0]}
+
+    def start(self) -> None:
+        """ Start tracing allocations, unless something else already is. """
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self._n_frames)
+            self._owns_tracing = True
+
+    def stop(self) -> None:
+        """
+        Record steady state memory and the top allocation sites still alive,
+        e.g. agent caches, then stop tracing if start began it.
+        """
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        self._steady_traced, peak = tracemalloc.get_traced_memory()
+        self._peak_traced = max(self._peak_traced, peak)
+        self._steady_rss = _rss_bytes()
+
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+        sites: Dict[Tuple[str, str], AllocationSite] = {}
+
+        for statistic in snapshot.statistics("traceback"):
+            phase, location = _site(statistic.traceback)
+            site = sites.setdefault((phase, location), AllocationSite(location, 0, 0))
+            site.size += statistic.size
+            site.count += statistic.count
+
+        for phase in (AGENT, ENGINE):
+            ranked = sorted(
+                (
+                    site
+                    for (site_phase, _), site in sites.items()
+                    if site_phase == phase
+                ),
+                key=lambda site: site.size,
+                reverse=True,
+            )
+            self._top_sites[phase] = ranked[: self._top_n]
+
+    def start_game(self) -> None:
+        """ Reset the traced peak, where supported, so it covers one game. """
+
+        _, peak = tracemalloc.get_traced_memory()
+        self._peak_traced = max(self._peak_traced, peak)
+
+        # Python 3.9+, earlier versions report the peak since tracing started
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+
+    def end_game(self) -> int:
+        """
+        Returns:
+            Peak traced memory during the game, in bytes.
+        """
+
+        _, peak = tracemalloc.get_traced_memory()
+        self._peak_traced = max(self._peak_traced, peak)
+
+        return peak
+
+    def record_blocks(self, phase: str, n_blocks: int) -> None:
+        """
+        Args:
+            phase: AGENT or ENGINE.
+            n_blocks: net allocated blocks during the phase of one turn.
+        """
+
+        blocks = self._blocks[phase]
+        blocks[0] += n_blocks
+        blocks[1] += 1
+
+    def summary(self) -> MemorySummary:
+        """ Memory summary of the traced games. """
+
+        def mean(phase: str) -> float:
+            total, count = self._blocks[phase]
+            return total / count if count else float("nan")
+
+        return MemorySummary(
+            peak_traced=self._peak_traced,
+            steady_traced=self._steady_traced,
+            peak_rss=_peak_rss_bytes(),
+            steady_rss=self._steady_rss,
+            mean_agent_blocks=mean(AGENT),
+            mean_engine_blocks=mean(ENGINE),
+            top_sites=dict(self._top_sites),
+        )